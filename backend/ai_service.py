@@ -2,7 +2,8 @@ import os
 import base64
 from typing import Any, Dict, Optional, List
 
-from backend.grafik_analiz import get_analysis_summary
+from backend.grafik_analiz import get_analysis_summary, get_analysis_summary_async
+from backend.concurrency import get_limiter
 
 # Optional: use python-dotenv if present
 try:
@@ -89,6 +90,12 @@ def run_ai_on_current_data() -> str:
     return generate_finance_advice(summary)
 
 
+async def run_ai_on_current_data_async() -> str:
+    """Özet 'analysis', Gemini çağrısı 'ai' havuzunda çalışır; yavaş AI diğer istekleri bloklamaz."""
+    summary = await get_analysis_summary_async()
+    return await get_limiter("ai").run(generate_finance_advice, summary)
+
+
 def _format_chart_data_rows(chart_data: List[Dict[str, Any]]) -> str:
     rows = []
     for row in chart_data[:50]:  # limit to keep prompt small
@@ -168,3 +175,13 @@ def generate_finance_chat_reply(
         "- Rutini koru, aylık sabit giderlerde pazarlık/indirim fırsatlarını değerlendir.\n"
         "- Fazlayı otomatik tasarruf/yatırım hesabına yönlendir."
     )
+
+
+async def generate_finance_chat_reply_async(
+    summary: Dict,
+    user_message: Optional[str] = None,
+    chart_data: Optional[List[Dict[str, Any]]] = None,
+    image: Optional[Dict[str, str]] = None,
+) -> str:
+    """generate_finance_chat_reply'nin async karşılığı ('ai' sınırlayıcısı ile)."""
+    return await get_limiter("ai").run(generate_finance_chat_reply, summary, user_message, chart_data, image)
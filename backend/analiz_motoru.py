@@ -0,0 +1,361 @@
+"""
+Artımlı analiz motoru.
+
+``get_analysis_summary`` için gereken günlük/aylık/kategori toplamlarını bellekte tutar.
+İlk kullanımda depolamadan bir kez kurulur: dönem özetleri hazırsa gün özetlerinden (işlem başına
+değil gün başına bir kayıt), değilse ham işlemlerden. Sonrasında ``ButceYonetici.islem_ekle`` ve
+``islem_sil`` her yazımda O(1) delta uygular. Özet, depolamaya dokunmadan bu toplamlardan üretilir.
+
+Yazanlar commit ile bildirimi (islem_eklendi / islem_silindi) ``yazim()`` bloğu içinde yapar.
+Kurulum, okumaya başlamadan ve ham taramayı bitirdikten sonra bu blokların bitmesini kısaca bekler;
+arada gelen bildirimler tamponlanır ve kurulum bitince belge ID'sine göre yalnızca taramanın
+görmediği eklemeler / gördüğü silmeler yeni toplamlara uygulanır. Tarama sırasında kilit tutulmaz.
+
+- ``yeniden_olustur()``: tam yeniden kurulum (ör. başka bir süreç veriyi değiştirdiyse)
+- ``dogrula()``: motorun özetini pandas tabanlı hesaplama ile karşılaştırır
+"""
+import itertools
+import threading
+from contextlib import contextmanager
+from datetime import date, datetime
+from typing import Any, Dict, Hashable, Iterator, List, Optional, Set, Tuple
+
+from backend.storage import TransactionRepository, get_repository
+from backend.ozet_onbellegi import get_ozet_onbellegi
+from backend.tahmin import get_tahmin_motoru
+from backend.kategori import BILINMIYOR, get_kategori_tablosu
+
+# Tüm kullanıcıları kapsayan toplamların anahtarı
+TUM_KULLANICILAR = "__tum__"
+
+# Toplamların sürüm numarası; yeniden kurulumlar arasında da tekrar etmez (tahmin önbelleği için)
+_SURUM = itertools.count(1)
+
+
+class _Toplamlar:
+    """Tek bir kapsam (kullanıcı veya tümü) için toplamlar. Listeler: [gelir, gider, adet]."""
+
+    __slots__ = ("gunluk", "aylik", "kategori", "kategori_aylik", "toplam_gelir", "toplam_gider", "satir", "surum")
+
+    def __init__(self):
+        self.gunluk: Dict[date, List[float]] = {}
+        self.aylik: Dict[Tuple[int, int], List[float]] = {}
+        # Kategori_Id anahtarlı (backend.kategori)
+        self.kategori: Dict[int, List[float]] = {}  # [tutar, adet]
+        self.kategori_aylik: Dict[int, Dict[Tuple[int, int], List[float]]] = {}  # tahmin için; [tutar, 0, adet]
+        self.toplam_gelir = 0.0
+        self.toplam_gider = 0.0
+        self.satir = 0
+        self.surum = next(_SURUM)
+
+    @staticmethod
+    def _kova_guncelle(kovalar: Dict[Any, List[float]], anahtar: Any, sutun: int, tutar: float, isaret: int) -> None:
+        kova = kovalar.get(anahtar)
+        if kova is None:
+            if isaret < 0:
+                return
+            kova = kovalar[anahtar] = [0.0, 0.0, 0]
+        kova[sutun] += isaret * tutar
+        kova[2] += isaret
+        if kova[2] <= 0:
+            del kovalar[anahtar]
+
+    def uygula(self, tarih: datetime, tip: Optional[str], tutar: float, kategori: int, isaret: int) -> None:
+        self.satir += isaret
+        self.surum = next(_SURUM)
+        if tip is None:
+            return
+        sutun = 0 if tip == "Gelir" else 1 if tip == "Gider" else None
+        if sutun is None:
+            # Bilinmeyen tip: pandas sürümünde gün/ay satırı oluşturur ama toplamlara katılmaz
+            self._kova_guncelle(self.gunluk, tarih.date(), 0, 0.0, isaret)
+            self._kova_guncelle(self.aylik, (tarih.year, tarih.month), 0, 0.0, isaret)
+            return
+        self._kova_guncelle(self.gunluk, tarih.date(), sutun, tutar, isaret)
+        self._kova_guncelle(self.aylik, (tarih.year, tarih.month), sutun, tutar, isaret)
+        if sutun == 0:
+            self.toplam_gelir += isaret * tutar
+        else:
+            self.toplam_gider += isaret * tutar
+            kategori_aylari = self.kategori_aylik.setdefault(kategori, {})
+            self._kova_guncelle(kategori_aylari, (tarih.year, tarih.month), 0, tutar, isaret)
+            if not kategori_aylari:
+                del self.kategori_aylik[kategori]
+            kova = self.kategori.get(kategori)
+            if kova is None:
+                if isaret < 0:
+                    return
+                kova = self.kategori[kategori] = [0.0, 0]
+            kova[0] += isaret * tutar
+            kova[1] += isaret
+            if kova[1] <= 0:
+                del self.kategori[kategori]
+
+    def gun_ekle(self, gun: date, gelir: float, gider: float, adet: int, kategoriler: Dict[int, Dict[str, Any]]) -> None:
+        """Bir günün dönem özetini (backend.storage.rollups 'day' kaydı) toplamlara ekler."""
+        self.satir += adet
+        self.surum = next(_SURUM)
+        for kovalar, anahtar in ((self.gunluk, gun), (self.aylik, (gun.year, gun.month))):
+            kova = kovalar.get(anahtar)
+            if kova is None:
+                kova = kovalar[anahtar] = [0.0, 0.0, 0]
+            kova[0] += gelir
+            kova[1] += gider
+            kova[2] += adet
+        self.toplam_gelir += gelir
+        self.toplam_gider += gider
+        for kimlik, kategori in kategoriler.items():
+            tutar, kategori_adet = float(kategori["Tutar"]), int(kategori["Adet"])
+            kova = self.kategori_aylik.setdefault(kimlik, {}).setdefault((gun.year, gun.month), [0.0, 0.0, 0])
+            kova[0] += tutar
+            kova[2] += kategori_adet
+            kova = self.kategori.setdefault(kimlik, [0.0, 0])
+            kova[0] += tutar
+            kova[1] += kategori_adet
+
+    def ozet(self, anahtar: Optional[Hashable] = None) -> Dict[str, Any]:
+        if self.satir <= 0:
+            return {
+                "message": "Veri bulunamadı",
+                "toplam_gelir": 0,
+                "toplam_gider": 0,
+                "gunluk_ozet": [],
+                "aylik_ozet": [],
+                "tahmin": {"gelir": 0, "gider": 0},
+                "kategori_dagilimi": {},
+            }
+        aylar = sorted(self.aylik.items())
+        tablo = get_kategori_tablosu()
+        tahmin = get_tahmin_motoru().tahmin(
+            {a: (v[0], v[1]) for a, v in aylar},
+            {k: {a: v[0] for a, v in kovalar.items()} for k, kovalar in self.kategori_aylik.items()},
+            anahtar=anahtar,
+            surum=self.surum,
+        )
+        return {
+            "toplam_gelir": float(self.toplam_gelir),
+            "toplam_gider": float(self.toplam_gider),
+            "tahmin": tahmin,
+            "gunluk_ozet": [
+                {"gun": gun.strftime("%Y-%m-%d"), "gelir": float(v[0]), "gider": float(v[1])}
+                for gun, v in sorted(self.gunluk.items())
+            ],
+            "aylik_ozet": [
+                {"ay": f"{yil:04d}-{ay:02d}-01", "gelir": float(v[0]), "gider": float(v[1])}
+                for (yil, ay), v in aylar
+            ],
+            "kategori_dagilimi": dict(sorted((tablo.ad(k), float(v[0])) for k, v in self.kategori.items())),
+        }
+
+
+class AnalizMotoru:
+    def __init__(self, repository: Optional[TransactionRepository] = None):
+        self._repository = repository
+        self._lock = threading.RLock()
+        self._kapsamlar: Dict[str, _Toplamlar] = {}
+        self._hazir = False
+        # Kurulum sürerken gelen bildirimler: (transaction_id, data, isaret); kurulum yokken None
+        self._tampon: Optional[List[Tuple[Optional[str], Dict[str, Any], int]]] = None
+        self._kurulum_lock = threading.Lock()
+        # Yazım blokları ile kurulum bariyeri
+        self._bariyer_kosul = threading.Condition()
+        self._bariyer = False
+        self._yazan = 0
+
+    @property
+    def repository(self) -> TransactionRepository:
+        return self._repository or get_repository()
+
+    @property
+    def hazir(self) -> bool:
+        return self._hazir
+
+    @contextmanager
+    def yazim(self) -> Iterator[None]:
+        """
+        Depolama commit'i ile ardından gelen islem_eklendi / islem_silindi çağrısını sarar. Bloklar
+        birbirini beklemez; yalnızca kurulumun kısa bariyerleri sırasında yeni blok başlamaz.
+        """
+        with self._bariyer_kosul:
+            while self._bariyer:
+                self._bariyer_kosul.wait()
+            self._yazan += 1
+        try:
+            yield
+        finally:
+            with self._bariyer_kosul:
+                self._yazan -= 1
+                if not self._yazan:
+                    self._bariyer_kosul.notify_all()
+
+    @contextmanager
+    def _bariyer_tut(self) -> Iterator[None]:
+        """Süren yazım bloklarının bitmesini bekler ve blok boyunca yenilerinin başlamasını engeller."""
+        with self._bariyer_kosul:
+            while self._bariyer:
+                self._bariyer_kosul.wait()
+            self._bariyer = True
+            while self._yazan:
+                self._bariyer_kosul.wait()
+        try:
+            yield
+        finally:
+            with self._bariyer_kosul:
+                self._bariyer = False
+                self._bariyer_kosul.notify_all()
+
+    @staticmethod
+    def _uygula(kapsamlar: Dict[str, _Toplamlar], data: Dict[str, Any], isaret: int) -> None:
+        tarih = data.get("Tarih")
+        if not isinstance(tarih, datetime):
+            return
+        tip = data.get("Islem_Tipi")
+        tutar = data.get("Tutar")
+        tutar = float(tutar) if tutar is not None else 0.0
+        kategori = get_kategori_tablosu().belge_kategorisi(data).id if tip == "Gider" else -1
+        for anahtar in (TUM_KULLANICILAR, data.get("User_Email") or ""):
+            AnalizMotoru._kapsam(kapsamlar, anahtar).uygula(tarih, tip, tutar, kategori, isaret)
+
+    def _bildir(self, data: Dict[str, Any], transaction_id: Optional[str], isaret: int) -> None:
+        with self._lock:
+            if self._tampon is not None:
+                self._tampon.append((transaction_id, data, isaret))
+            if self._hazir:
+                self._uygula(self._kapsamlar, data, isaret)
+
+    def islem_eklendi(self, data: Dict[str, Any], transaction_id: Optional[str] = None) -> None:
+        """
+        Yeni yazılan işlem belgesini toplamlara ekler (motor henüz kurulmadıysa yok sayılır).
+        Commit ile birlikte yazim() bloğu içinde çağrılmalıdır.
+        """
+        self._bildir(data, transaction_id, +1)
+
+    def islem_silindi(self, data: Dict[str, Any], transaction_id: Optional[str] = None) -> None:
+        """Silinen işlem belgesini toplamlardan çıkarır (yazim() bloğu içinde çağrılmalıdır)."""
+        self._bildir(data, transaction_id, -1)
+
+    @staticmethod
+    def _kapsam(kapsamlar: Dict[str, _Toplamlar], anahtar: str) -> _Toplamlar:
+        kapsam = kapsamlar.get(anahtar)
+        if kapsam is None:
+            kapsam = kapsamlar[anahtar] = _Toplamlar()
+        return kapsam
+
+    def _kur(self) -> None:
+        """_kurulum_lock tutularak çağrılır."""
+        repo = self.repository
+        try:
+            with self._bariyer_tut():
+                # Bariyerden önce commit edilen her yazım bildirimini yapmıştır ve okumada yer alır
+                with self._lock:
+                    self._tampon = []
+                # Gün özetleri tek okumada gelir; bariyer içinde okunduğundan sonraki her yazım tampona düşer
+                kayitlar = repo.rollups("day") if repo.rollups_hazir() else None
+            kapsamlar: Dict[str, _Toplamlar] = {}
+            gorulen: Optional[Set[str]] = None
+            if kayitlar is not None:
+                # Gelir/Gider dışındaki tipler özetlerde yer almaz (toplamlara zaten katılmazlar)
+                tablo = get_kategori_tablosu()
+                for kayit in kayitlar:
+                    gun = date.fromisoformat(kayit["Donem"])
+                    kategoriler = kayit.get("Kategoriler") or {}
+                    for kimlik, kategori in kategoriler.items():
+                        if kategori.get("Ad") and tablo.ad(kimlik) == BILINMIYOR:
+                            tablo.ogren(kimlik, kategori["Ad"])
+                    for anahtar in (TUM_KULLANICILAR, kayit.get("User_Email") or ""):
+                        self._kapsam(kapsamlar, anahtar).gun_ekle(
+                            gun,
+                            float(kayit.get("Gelir_Toplam", 0) or 0),
+                            float(kayit.get("Gider_Toplam", 0) or 0),
+                            int(kayit.get("Islem_Sayisi", 0) or 0),
+                            kategoriler,
+                        )
+            else:
+                gorulen = set()
+                for transaction_id, data in repo.stream():
+                    gorulen.add(transaction_id)
+                    self._uygula(kapsamlar, data, +1)
+                # Tarama sırasında commit edip henüz bildirmemiş yazımlar da tampona düşsün
+                with self._bariyer_tut():
+                    pass
+            with self._lock:
+                tampon, self._tampon = self._tampon, None
+                for transaction_id, data, isaret in tampon:
+                    if gorulen is not None and transaction_id is not None:
+                        # Tarama bu eklemeyi zaten saydıysa / bu silinen belgeyi hiç görmediyse atla
+                        if (transaction_id in gorulen) == (isaret > 0):
+                            continue
+                        if isaret > 0:
+                            gorulen.add(transaction_id)
+                        else:
+                            gorulen.discard(transaction_id)
+                    self._uygula(kapsamlar, data, isaret)
+                self._kapsamlar = kapsamlar
+                self._hazir = True
+        finally:
+            with self._lock:
+                self._tampon = None
+
+    def yeniden_olustur(self) -> None:
+        """Tüm toplamları depolamadan tek geçişte yeniden kurar ve önbellekteki özetleri düşürür."""
+        with self._kurulum_lock:
+            self._kur()
+        get_ozet_onbellegi().gecersiz_kil()
+
+    def ozet(self, user_email: Optional[str] = None) -> Dict[str, Any]:
+        """get_analysis_summary ile aynı biçimde özet döndürür. user_email verilirse yalnızca o kullanıcı."""
+        if not self._hazir:
+            with self._kurulum_lock:
+                if not self._hazir:
+                    self._kur()
+        with self._lock:
+            anahtar = TUM_KULLANICILAR if user_email is None else user_email
+            return (self._kapsamlar.get(anahtar) or _Toplamlar()).ozet(anahtar=("motor", anahtar))
+
+    def dogrula(self, tolerans: float = 1e-6) -> Dict[str, Any]:
+        """
+        Motorun özetini mevcut pandas hesaplamasıyla (tam tarama) karşılaştırır.
+        Dönüş: { tutarli: bool, farklar: [str, ...] }
+        """
+        from backend.grafik_analiz import get_analysis_summary_pandas
+
+        beklenen = get_analysis_summary_pandas()
+        gercek = self.ozet()
+        farklar: List[str] = []
+
+        def esit(a: Any, b: Any) -> bool:
+            if isinstance(a, (int, float)) and isinstance(b, (int, float)):
+                return abs(float(a) - float(b)) <= tolerans * max(1.0, abs(float(a)))
+            return a == b
+
+        def karsilastir(yol: str, a: Any, b: Any) -> None:
+            if isinstance(a, dict) and isinstance(b, dict):
+                for k in set(a) | set(b):
+                    if k not in a or k not in b:
+                        farklar.append(f"{yol}.{k}: yalnızca {'pandas' if k in a else 'motor'} tarafında")
+                    else:
+                        karsilastir(f"{yol}.{k}", a[k], b[k])
+            elif isinstance(a, list) and isinstance(b, list):
+                if len(a) != len(b):
+                    farklar.append(f"{yol}: uzunluk {len(a)} != {len(b)}")
+                for i, (x, y) in enumerate(zip(a, b)):
+                    karsilastir(f"{yol}[{i}]", x, y)
+            elif not esit(a, b):
+                farklar.append(f"{yol}: {a!r} != {b!r}")
+
+        karsilastir("ozet", beklenen, gercek)
+        return {"tutarli": not farklar, "farklar": farklar[:50]}
+
+
+_motor_lock = threading.Lock()
+_motor: Optional[AnalizMotoru] = None
+
+
+def get_analiz_motoru() -> AnalizMotoru:
+    """Süreç genelinde tek AnalizMotoru örneği (Singleton)."""
+    global _motor
+    if _motor is None:
+        with _motor_lock:
+            if _motor is None:
+                _motor = AnalizMotoru()
+    return _motor
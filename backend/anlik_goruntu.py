@@ -0,0 +1,344 @@
+"""
+Analizler için yerel sütunlu anlık görüntü (snapshot) önbelleği (Arrow IPC / Feather v2).
+
+SNAPSHOT_CACHE=1 iken ``_fetch_transactions_df`` işlem geçmişini her seferinde depolamadan (ağ
+üzerinden) çekmek yerine kapsam (kullanıcı ya da tümü) başına yerel bir görüntüden okur:
+
+- İlk okumada geçmiş bir kez çekilip SNAPSHOT_DIR altına sıkıştırılmamış Arrow IPC dosyası (taban)
+  olarak yazılır; okumalar dosyayı bellek eşlemeli (mmap) ve yalnızca istenen sütunlarla açar
+- Sonraki okumalarda yalnızca değişiklik kaydı (``degisiklikler``) sorulur; yeni yazımlar ve silmeler
+  küçük delta dosyalarına eklenir. Okurken deltalar tabanın üzerine uygulanır (aynı belgenin son
+  hali geçerlidir, silinenler düşer)
+- Delta sayısı SNAPSHOT_MAX_DELTAS'a (varsayılan 8) ulaşınca taban ve deltalar yeni bir tabana
+  sıkıştırılır; eski dosyalar silinir
+- Görüntü başka bir depolama kaynağına aitse ya da dosyalar okunamıyorsa baştan kurulur
+
+Soğuk açılışta panel süresi ağdan çekmeye değil yerel disk okumasına bağlıdır. pyarrow
+requirements.txt'tedir; kurulu değilse önbellek uyarıyla devre dışı kalır. Dizin tek bir
+süreç içindir; çok süreçli çalıştırmada her süreç ayrı bir SNAPSHOT_DIR kullanmalıdır.
+"""
+import hashlib
+import json
+import os
+import threading
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from backend.storage import Degisiklik, TransactionRepository, get_repository
+
+# Görüntüdeki sütunlar (id + _fetch_transactions_df sütunları); Tarih UTC, saat dilimsiz
+SUTUNLAR = ["id", "Tarih", "Kategori", "Kategori_Id", "Tutar", "Islem_Tipi", "Aciklama", "Kaynak"]
+_METIN_SUTUNLARI = ("id", "Kategori", "Islem_Tipi", "Aciklama", "Kaynak")
+_SIL = "_sil"  # delta dosyalarında silme işareti
+TUM_KULLANICILAR = "__tum__"
+
+
+def _pyarrow():
+    try:
+        import pyarrow as pa  # type: ignore
+        import pyarrow.compute as pc  # type: ignore
+        import pyarrow.feather as feather  # type: ignore
+    except ImportError as e:
+        raise RuntimeError("Anlık görüntü önbelleği için pyarrow gerekli: pip install pyarrow") from e
+    return pa, pc, feather
+
+
+def _isaret_kodla(isaret: Any) -> Dict[str, Any]:
+    if isinstance(isaret, datetime):
+        return {"datetime": isaret.isoformat()}
+    return {"int": int(isaret)}
+
+
+def _isaret_coz(kayit: Dict[str, Any]) -> Any:
+    if "datetime" in kayit:
+        return datetime.fromisoformat(kayit["datetime"])
+    return int(kayit["int"])
+
+
+def _utc_naif(tarih: Optional[datetime]) -> Optional[datetime]:
+    if tarih is not None and tarih.tzinfo is not None:
+        return tarih.astimezone(timezone.utc).replace(tzinfo=None)
+    return tarih
+
+
+def _arrow_tablosu(df: pd.DataFrame, silinenler: Iterable[str] = (), delta: bool = False):
+    """_belgelerden_df çıktısını görüntü şemasında Arrow tablosuna çevirir (delta ise silme satırlarıyla)."""
+    pa, _, _ = _pyarrow()
+    silinenler = list(silinenler)
+    bos = [None] * len(silinenler)
+    tarih = pd.to_datetime(pd.Series(df["Tarih"]))
+    if getattr(tarih.dt, "tz", None) is not None:
+        tarih = tarih.dt.tz_convert("UTC").dt.tz_localize(None)
+
+    def metin(sutun: str) -> List[Optional[str]]:
+        degerler = pd.Series(df[sutun], dtype=object)
+        return [None if b else str(v) for v, b in zip(degerler.tolist(), degerler.isna().tolist())]
+
+    def sayi(sutun: str, tur) -> np.ndarray:
+        return np.concatenate([pd.Series(df[sutun]).to_numpy(dtype=tur), np.zeros(len(silinenler), dtype=tur)])
+
+    sutunlar = {
+        "id": pa.array(metin("id") + silinenler, type=pa.string()),
+        "Tarih": pa.array(
+            np.concatenate([tarih.to_numpy(dtype="datetime64[us]"), np.full(len(silinenler), "NaT", dtype="datetime64[us]")]),
+            type=pa.timestamp("us"),
+            from_pandas=True,
+        ),
+        "Kategori_Id": pa.array(sayi("Kategori_Id", np.int64), type=pa.int64()),
+        "Tutar": pa.array(sayi("Tutar", np.float64), type=pa.float64()),
+    }
+    for sutun in _METIN_SUTUNLARI[1:]:
+        sutunlar[sutun] = pa.array(metin(sutun) + bos, type=pa.string())
+    if delta:
+        sutunlar[_SIL] = pa.array([False] * len(df) + [True] * len(silinenler), type=pa.bool_())
+    return pa.table({s: sutunlar[s] for s in SUTUNLAR + ([_SIL] if delta else [])})
+
+
+class _Kapsam:
+    __slots__ = ("user_email", "dizin", "lock")
+
+    def __init__(self, user_email: Optional[str], dizin: str):
+        self.user_email = user_email
+        self.dizin = dizin
+        self.lock = threading.Lock()
+
+
+class AnlikGoruntuOnbellegi:
+    def __init__(self, dizin: str, max_delta: int = 8, repository: Optional[TransactionRepository] = None):
+        _pyarrow()  # bağımlılık yoksa hemen hata ver
+        self.dizin = dizin
+        self.max_delta = max_delta
+        self._repository = repository
+        self._lock = threading.Lock()
+        self._kapsamlar: Dict[str, _Kapsam] = {}
+        self.tam_yukleme = 0
+        self.delta_yazimi = 0
+        self.sikistirma = 0
+        self.okuma = 0
+
+    @property
+    def repository(self) -> TransactionRepository:
+        return self._repository or get_repository()
+
+    def _kaynak(self) -> str:
+        repo = self.repository
+        return f"{repo.name}:{getattr(repo, 'path', '')}"
+
+    def _kapsam(self, user_email: Optional[str]) -> _Kapsam:
+        anahtar = TUM_KULLANICILAR if user_email is None else user_email
+        with self._lock:
+            kapsam = self._kapsamlar.get(anahtar)
+            if kapsam is None:
+                ad = hashlib.sha1(anahtar.encode("utf-8")).hexdigest()[:16]
+                kapsam = self._kapsamlar[anahtar] = _Kapsam(user_email, os.path.join(self.dizin, ad))
+            return kapsam
+
+    # --- Meta (taban, deltalar, değişiklik işareti); atomik olarak değiştirilir ---
+    def _meta_oku(self, kapsam: _Kapsam) -> Optional[Dict[str, Any]]:
+        try:
+            with open(os.path.join(kapsam.dizin, "meta.json"), "r", encoding="utf-8") as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if meta.get("kaynak") != self._kaynak() or meta.get("user_email") != kapsam.user_email:
+            return None
+        dosyalar = [meta["taban"]] + meta["deltalar"]
+        if not all(os.path.exists(os.path.join(kapsam.dizin, d)) for d in dosyalar):
+            return None
+        return meta
+
+    def _meta_yaz(self, kapsam: _Kapsam, meta: Dict[str, Any]) -> None:
+        yol = os.path.join(kapsam.dizin, "meta.json")
+        with open(yol + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        os.replace(yol + ".tmp", yol)
+
+    def _dosya_yaz(self, kapsam: _Kapsam, meta: Dict[str, Any], onek: str, tablo) -> str:
+        _, _, feather = _pyarrow()
+        meta["sira"] = meta.get("sira", 0) + 1
+        ad = f"{onek}-{meta['sira']:06d}.arrow"
+        # Sıkıştırmasız: okurken bellek eşlemesiyle kopyasız açılabilsin
+        feather.write_feather(tablo, os.path.join(kapsam.dizin, ad + ".tmp"), compression="uncompressed")
+        os.replace(os.path.join(kapsam.dizin, ad + ".tmp"), os.path.join(kapsam.dizin, ad))
+        return ad
+
+    def _eskileri_sil(self, kapsam: _Kapsam, meta: Dict[str, Any]) -> None:
+        gecerli = {"meta.json", meta["taban"], *meta["deltalar"]}
+        for ad in os.listdir(kapsam.dizin):
+            if ad not in gecerli:
+                try:
+                    os.remove(os.path.join(kapsam.dizin, ad))
+                except OSError:
+                    pass
+
+    # --- Kurulum, delta ve sıkıştırma ---
+    def _tam_yukle(self, kapsam: _Kapsam) -> Dict[str, Any]:
+        from backend.grafik_analiz import _belgelerden_df
+
+        repo = self.repository
+        os.makedirs(kapsam.dizin, exist_ok=True)
+        # İşaret çekmeden önce alınır; çekme sırasındaki yazımlar sonraki okumada delta olarak gelir
+        isaret = repo.degisiklik_isareti()
+        df = _belgelerden_df(repo.query_range(user_email=kapsam.user_email))
+        meta: Dict[str, Any] = {"kaynak": self._kaynak(), "user_email": kapsam.user_email, "deltalar": []}
+        meta["taban"] = self._dosya_yaz(kapsam, meta, "taban", _arrow_tablosu(df))
+        meta["isaret"] = _isaret_kodla(isaret)
+        self._meta_yaz(kapsam, meta)
+        self._eskileri_sil(kapsam, meta)
+        with self._lock:
+            self.tam_yukleme += 1
+        return meta
+
+    def _esitle(self, kapsam: _Kapsam, meta: Dict[str, Any]) -> Dict[str, Any]:
+        """Son işaretten sonraki değişiklikleri tek delta dosyası olarak ekler."""
+        from backend.grafik_analiz import _belgelerden_df
+
+        degisiklikler, isaret = self.repository.degisiklikler(_isaret_coz(meta["isaret"]), user_email=kapsam.user_email)
+        if not degisiklikler:
+            return meta
+        # Aynı belgenin delta içindeki son hali geçerlidir
+        son: Dict[str, Degisiklik] = {}
+        for degisiklik in degisiklikler:
+            son.pop(degisiklik[1], None)
+            son[degisiklik[1]] = degisiklik
+        eklenenler = [(doc_id, data) for tur, doc_id, data in son.values() if tur == "ekle" and data is not None]
+        silinenler = [doc_id for tur, doc_id, _ in son.values() if tur == "sil"]
+        df = _belgelerden_df(eklenenler)
+        # Tarihi geçersiz olduğu için alınmayan eklemeler de eski hallerini düşürsün
+        alinan = set(df["id"].tolist()) if len(df) else set()
+        silinenler += [doc_id for doc_id, _ in eklenenler if doc_id not in alinan]
+        meta["deltalar"] = meta["deltalar"] + [self._dosya_yaz(kapsam, meta, "delta", _arrow_tablosu(df, silinenler, delta=True))]
+        meta["isaret"] = _isaret_kodla(isaret)
+        self._meta_yaz(kapsam, meta)
+        with self._lock:
+            self.delta_yazimi += 1
+        return meta
+
+    def _birlestir(self, kapsam: _Kapsam, meta: Dict[str, Any], sutunlar: Optional[List[str]] = None):
+        """Taban ve deltaları (yeniden eskiye; görülen id'ler eski dosyalardan düşer) tek tabloda birleştirir."""
+        pa, pc, feather = _pyarrow()
+        taban = feather.read_table(os.path.join(kapsam.dizin, meta["taban"]), columns=sutunlar, memory_map=True)
+        if not meta["deltalar"]:
+            return taban
+        parcalar = []
+        gorulen = pa.array([], type=pa.string())
+        delta_sutunlari = None if sutunlar is None else sutunlar + [_SIL]
+        for ad in reversed(meta["deltalar"]):
+            delta = feather.read_table(os.path.join(kapsam.dizin, ad), columns=delta_sutunlari, memory_map=True)
+            if len(gorulen):
+                delta = delta.filter(pc.invert(pc.is_in(delta["id"], value_set=gorulen)))
+            gorulen = pa.concat_arrays([gorulen, delta["id"].combine_chunks()])
+            parcalar.append(delta.filter(pc.invert(delta[_SIL])).select(taban.column_names))
+        taban = taban.filter(pc.invert(pc.is_in(taban["id"], value_set=gorulen)))
+        return pa.concat_tables([taban] + parcalar[::-1])
+
+    def _sikistir(self, kapsam: _Kapsam, meta: Dict[str, Any]) -> Dict[str, Any]:
+        tablo = self._birlestir(kapsam, meta).combine_chunks()
+        meta["taban"] = self._dosya_yaz(kapsam, meta, "taban", tablo)
+        meta["deltalar"] = []
+        self._meta_yaz(kapsam, meta)
+        self._eskileri_sil(kapsam, meta)
+        with self._lock:
+            self.sikistirma += 1
+        return meta
+
+    def _hazirla(self, kapsam: _Kapsam) -> Dict[str, Any]:
+        meta = self._meta_oku(kapsam)
+        if meta is None:
+            return self._tam_yukle(kapsam)
+        try:
+            meta = self._esitle(kapsam, meta)
+            if len(meta["deltalar"]) >= self.max_delta:
+                meta = self._sikistir(kapsam, meta)
+        except Exception as e:
+            print(f"⚠️ Anlık görüntü güncellenemedi, yeniden kuruluyor: {e}")
+            return self._tam_yukle(kapsam)
+        return meta
+
+    def df(
+        self,
+        user_email: Optional[str] = None,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        sutunlar: Optional[List[str]] = None,
+    ) -> pd.DataFrame:
+        """
+        Kapsamın işlemleri (_fetch_transactions_df biçiminde); start/end Tarih filtresi [start, end).
+        sutunlar verilirse yalnızca onlar (ve id, Tarih) diskten okunur.
+        """
+        pa, pc, _ = _pyarrow()
+        if sutunlar is not None:
+            sutunlar = [s for s in SUTUNLAR if s in ("id", "Tarih") or s in sutunlar]
+        kapsam = self._kapsam(user_email)
+        with kapsam.lock:
+            meta = self._hazirla(kapsam)
+            tablo = self._birlestir(kapsam, meta, sutunlar)
+        start, end = _utc_naif(start), _utc_naif(end)
+        tarih_turu = tablo.schema.field("Tarih").type
+        if start is not None:
+            tablo = tablo.filter(pc.greater_equal(tablo["Tarih"], pa.scalar(start, type=tarih_turu)))
+        if end is not None:
+            tablo = tablo.filter(pc.less(tablo["Tarih"], pa.scalar(end, type=tarih_turu)))
+        df = tablo.to_pandas()
+        if "Kategori" in df.columns:
+            df["Kategori"] = df["Kategori"].astype("category")
+        with self._lock:
+            self.okuma += 1
+        return df
+
+    def sikistir(self, user_email: Optional[str] = None) -> None:
+        """Kapsamın görüntüsünü değişiklikleri alıp hemen tek tabana sıkıştırır."""
+        kapsam = self._kapsam(user_email)
+        with kapsam.lock:
+            meta = self._hazirla(kapsam)
+            if meta["deltalar"]:
+                self._sikistir(kapsam, meta)
+
+    def istatistik(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "dizin": self.dizin,
+                "kapsam_sayisi": len(self._kapsamlar),
+                "okuma": self.okuma,
+                "tam_yukleme": self.tam_yukleme,
+                "delta_yazimi": self.delta_yazimi,
+                "sikistirma": self.sikistirma,
+            }
+
+
+_goruntu_lock = threading.Lock()
+_goruntu: Optional[AnlikGoruntuOnbellegi] = None
+_goruntu_hatasi = False
+
+
+def anlik_goruntu_acik() -> bool:
+    return os.getenv("SNAPSHOT_CACHE", "").strip().lower() in ("1", "true", "yes", "on")
+
+
+def get_anlik_goruntu() -> Optional[AnlikGoruntuOnbellegi]:
+    """
+    SNAPSHOT_CACHE açıksa süreç genelinde tek anlık görüntü önbelleği (Singleton), kapalıysa, depolama
+    zaten bellek içiyse ya da pyarrow kurulu değilse None.
+    """
+    global _goruntu, _goruntu_hatasi
+    if not anlik_goruntu_acik() or _goruntu_hatasi:
+        return None
+    if _goruntu is None:
+        with _goruntu_lock:
+            if _goruntu is None and not _goruntu_hatasi:
+                if get_repository().name == "memory":
+                    _goruntu_hatasi = True
+                    return None
+                try:
+                    _goruntu = AnlikGoruntuOnbellegi(
+                        os.getenv("SNAPSHOT_DIR", "snapshots"),
+                        max_delta=int(os.getenv("SNAPSHOT_MAX_DELTAS", "8")),
+                    )
+                except RuntimeError as e:
+                    _goruntu_hatasi = True
+                    print(f"❌ {e}")
+                    return None
+    return _goruntu
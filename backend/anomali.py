@@ -0,0 +1,262 @@
+"""
+Kategori bazlı harcama anomalisi tespiti.
+
+Her (kullanıcı, Kategori_Id) için gider tutarlarının logaritması (log1p) üzerinde üstel ağırlıklı
+hareketli ortalama ve varyans (EWMA) tutulur. Her yeni gider önce mevcut istatistiğe göre
+puanlanır (z = (x - ortalama) / sapma), sonra istatistiğe katılır; ikisi de O(1)'dir ve depolama
+okumaz. Yeterince gözlemi olan bir kategoride z eşiği aşan gider anomali sayılır; ButceYonetici
+bunu gözlemci bildirimi olarak yayınlar.
+
+Geçmiş, süreç açılışında arka planda tek geçişte ve vektörel olarak yüklenir: EWMA'nın kapalı
+biçimi (her gözlemin ağırlığı a(1-a)^(n-1-k), ilki (1-a)^(n-1)) ile ortalama ve ikinci moment
+np.bincount ile grup başına toplanır. Sonuç, aynı sırayla tek tek gözlem eklemekle aynıdır
+(varyans = E[x²] - E[x]², başlangıçta 0). Yükleme sürerken gelen giderler ayrıca tutulur ve
+yükleme bitince (yüklemede görülmedilerse) yeni istatistiğe yeniden uygulanır.
+
+Silinen işlemler istatistikten çıkarılmaz; bir sonraki yüklemeye (POST /anomalies/rebuild veya
+yeniden başlatma) kadar etkileri azalarak sürer.
+"""
+import math
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from backend.kategori import get_kategori_tablosu
+from backend.storage import TransactionRepository, get_repository
+
+# (user_email, Kategori_Id)
+Anahtar = Tuple[Optional[str], int]
+
+
+class _Istatistik:
+    __slots__ = ("ortalama", "varyans", "adet")
+
+    def __init__(self, ortalama: float = 0.0, varyans: float = 0.0, adet: int = 0):
+        self.ortalama = ortalama
+        self.varyans = varyans
+        self.adet = adet
+
+
+class AnomaliDedektoru:
+    """
+    alfa: EWMA ağırlığı (büyüdükçe yakın geçmiş baskın olur). esik: anomali için en küçük z.
+    min_gozlem: kategoride bundan az gider varken puanlama yapılmaz. min_sapma: log ölçeğinde
+    sapma tabanı; hep aynı tutarın ödendiği kategorilerde (kira vb.) küçük oynamalar anomali sayılmaz.
+    """
+
+    def __init__(
+        self,
+        alfa: float = 0.1,
+        esik: float = 3.0,
+        min_gozlem: int = 5,
+        min_sapma: float = 0.25,
+        repository: Optional[TransactionRepository] = None,
+    ):
+        self.alfa = alfa
+        self.esik = esik
+        self.min_gozlem = min_gozlem
+        self.min_sapma = min_sapma
+        self._repository = repository
+        self._lock = threading.Lock()
+        self._istatistikler: Dict[Anahtar, _Istatistik] = {}
+        self._doldurma_suruyor = False
+        self._bekleyen: List[Tuple[Optional[str], Anahtar, float]] = []
+        self._isci: Optional[threading.Thread] = None
+        self.gozlem = 0
+        self.anomali = 0
+        self.doldurma_sayisi = 0
+        self.son_doldurma: Optional[str] = None
+        self.son_sure_ms: Optional[float] = None
+        self.son_kayit: Optional[int] = None
+        self.hata: Optional[str] = None
+
+    @property
+    def repository(self) -> TransactionRepository:
+        return self._repository or get_repository()
+
+    def _uygula(self, anahtar: Anahtar, x: float) -> _Istatistik:
+        ist = self._istatistikler.get(anahtar)
+        if ist is None:
+            ist = self._istatistikler[anahtar] = _Istatistik(x, 0.0, 1)
+            return ist
+        fark = x - ist.ortalama
+        artis = self.alfa * fark
+        ist.ortalama += artis
+        ist.varyans = (1.0 - self.alfa) * (ist.varyans + fark * artis)
+        ist.adet += 1
+        return ist
+
+    def gozlemle(
+        self, user_email: Optional[str], kategori_id: int, tutar: float, transaction_id: Optional[str] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Gideri puanlar ve istatistiğe ekler. Anomaliyse { z, tutar, tipik, gozlem } döner, değilse None.
+        """
+        if tutar is None or tutar <= 0:
+            return None
+        x = math.log1p(float(tutar))
+        anahtar = (user_email, int(kategori_id))
+        sonuc = None
+        with self._lock:
+            self.gozlem += 1
+            ist = self._istatistikler.get(anahtar)
+            if ist is not None and ist.adet >= self.min_gozlem:
+                z = (x - ist.ortalama) / max(math.sqrt(ist.varyans), self.min_sapma)
+                if z >= self.esik:
+                    self.anomali += 1
+                    sonuc = {
+                        "z": round(z, 2),
+                        "tutar": float(tutar),
+                        "tipik": round(math.expm1(ist.ortalama), 2),
+                        "gozlem": ist.adet,
+                    }
+            self._uygula(anahtar, x)
+            if self._doldurma_suruyor:
+                self._bekleyen.append((transaction_id, anahtar, x))
+        return sonuc
+
+    def _gecmis(self) -> Tuple[List[Any], List[Optional[str]], np.ndarray, np.ndarray]:
+        """Depolamadaki giderleri Tarih sırasıyla sütun sütun okur: (id, kullanıcı, Kategori_Id, tutar)."""
+        ids: List[Any] = []
+        kullanicilar: List[Optional[str]] = []
+        kimlikler: List[Any] = []
+        hamlar: List[Any] = []
+        tutarlar: List[Any] = []
+        for transaction_id, data in self.repository.stream():
+            if data.get("Islem_Tipi") != "Gider":
+                continue
+            ids.append(transaction_id)
+            kullanicilar.append(data.get("User_Email"))
+            kimlikler.append(data.get("Kategori_Id"))
+            hamlar.append(data.get("Kategori"))
+            tutarlar.append(data.get("Tutar"))
+        kategori = get_kategori_tablosu().belge_kimlikleri(kimlikler, hamlar)
+        tutar = pd.to_numeric(pd.Series(tutarlar, dtype=object), errors="coerce").to_numpy(dtype=np.float64)
+        return ids, kullanicilar, kategori, tutar
+
+    def _vektorel_istatistikler(
+        self, kullanicilar: List[Optional[str]], kategori: np.ndarray, tutar: np.ndarray
+    ) -> Dict[Anahtar, _Istatistik]:
+        gecerli = tutar > 0  # NaN da elenir
+        df = pd.DataFrame({
+            "u": pd.Series(kullanicilar, dtype=object)[gecerli].to_numpy(),
+            "k": kategori[gecerli],
+            "x": np.log1p(tutar[gecerli]),
+        })
+        if df.empty:
+            return {}
+        gruplar = df.groupby(["u", "k"], sort=False, dropna=False)
+        g = gruplar.ngroup().to_numpy()
+        sira = gruplar.cumcount().to_numpy()
+        adet = np.bincount(g)
+        x = df["x"].to_numpy()
+        # Kapalı biçim EWMA (adjust=False): son gözlemden geriye (1-a)^k ile sönümlenen ağırlıklar
+        kalan = adet[g] - 1 - sira
+        agirlik = self.alfa * np.power(1.0 - self.alfa, kalan)
+        ilk = sira == 0
+        agirlik[ilk] = np.power(1.0 - self.alfa, kalan[ilk])
+        ortalama = np.bincount(g, weights=agirlik * x)
+        varyans = np.maximum(np.bincount(g, weights=agirlik * x * x) - ortalama * ortalama, 0.0)
+        anahtarlar = gruplar.size().index  # ngroup sırasıyla (sort=False)
+        return {
+            (u if isinstance(u, str) else None, int(k)): _Istatistik(float(m), float(v), int(n))
+            for (u, k), m, v, n in zip(anahtarlar, ortalama.tolist(), varyans.tolist(), adet.tolist())
+        }
+
+    def doldur(self) -> int:
+        """
+        İstatistikleri depodaki tüm giderlerden (vektörel) yeniden kurar. Dönüş: okunan gider sayısı.
+        """
+        t0 = time.perf_counter()
+        with self._lock:
+            self._doldurma_suruyor = True
+            self._bekleyen = []
+        try:
+            ids, kullanicilar, kategori, tutar = self._gecmis()
+            istatistikler = self._vektorel_istatistikler(kullanicilar, kategori, tutar)
+        except Exception as e:
+            with self._lock:
+                self._doldurma_suruyor = False
+                self._bekleyen = []
+                self.hata = str(e)
+            raise
+        with self._lock:
+            bekleyen, self._bekleyen = self._bekleyen, []
+            self._doldurma_suruyor = False
+            okunan = {i for i, _, _ in bekleyen if i is not None}.intersection(ids)
+            self._istatistikler = istatistikler
+            for transaction_id, anahtar, x in bekleyen:
+                if transaction_id is None or transaction_id not in okunan:
+                    self._uygula(anahtar, x)
+            self.doldurma_sayisi += 1
+            self.son_doldurma = datetime.now().isoformat(timespec="seconds")
+            self.son_sure_ms = round((time.perf_counter() - t0) * 1000, 1)
+            self.son_kayit = len(ids)
+            self.hata = None
+        return len(ids)
+
+    def _calis(self) -> None:
+        try:
+            self.doldur()
+        except Exception as e:
+            print(f"❌ Anomali istatistikleri yüklenemedi: {e}")
+
+    def baslat(self) -> None:
+        """Geçmişi arka planda yükler (istek yolu beklemez; bu sırada gelen giderler kaybolmaz)."""
+        with self._lock:
+            if self._isci is None or not self._isci.is_alive():
+                self._isci = threading.Thread(target=self._calis, name="anomali-doldurma", daemon=True)
+                self._isci.start()
+
+    def sifirla(self) -> None:
+        with self._lock:
+            self._istatistikler.clear()
+
+    def istatistik(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "alfa": self.alfa,
+                "esik": self.esik,
+                "min_gozlem": self.min_gozlem,
+                "seri": len(self._istatistikler),
+                "gozlem": self.gozlem,
+                "anomali": self.anomali,
+                "dolduruluyor": self._doldurma_suruyor,
+                "doldurma_sayisi": self.doldurma_sayisi,
+                "son_doldurma": self.son_doldurma,
+                "son_sure_ms": self.son_sure_ms,
+                "son_kayit": self.son_kayit,
+                "hata": self.hata,
+            }
+
+
+def anomali_tespiti_acik() -> bool:
+    return os.getenv("ANOMALY_DETECTION", "1").strip().lower() in ("1", "true", "yes", "on")
+
+
+_dedektor_lock = threading.Lock()
+_dedektor: Optional[AnomaliDedektoru] = None
+
+
+def get_anomali_dedektoru() -> Optional[AnomaliDedektoru]:
+    """
+    Süreç genelinde tek anomali dedektörü (Singleton); ANOMALY_DETECTION=0 ise None.
+    ANOMALY_ALPHA, ANOMALY_Z, ANOMALY_MIN_COUNT ortam değişkenleri.
+    """
+    global _dedektor
+    if not anomali_tespiti_acik():
+        return None
+    if _dedektor is None:
+        with _dedektor_lock:
+            if _dedektor is None:
+                _dedektor = AnomaliDedektoru(
+                    alfa=float(os.getenv("ANOMALY_ALPHA", "0.1")),
+                    esik=float(os.getenv("ANOMALY_Z", "3.0")),
+                    min_gozlem=int(os.getenv("ANOMALY_MIN_COUNT", "5")),
+                )
+    return _dedektor
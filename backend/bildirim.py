@@ -0,0 +1,154 @@
+"""
+Gözlemci bildirimleri için asenkron, birleştiren dağıtıcı.
+
+ButceYonetici bildirimleri doğrudan Gozlemci.update ile değil bu dağıtıcı üzerinden yayınlar:
+
+- Bildirimler sınırlı bir kuyruğa (NOTIFICATION_QUEUE_SIZE, varsayılan 10000) konur; tek bir arka plan
+  iş parçacığı gözlemcilere iletir. İstek yolu yalnızca kuyruğa ekleme maliyeti öder; kuyruk doluysa
+  bildirim düşürülür ve sayılır.
+- Durum anahtarı verilen bildirimler (ör. kullanıcı+ay limit eşiği, kullanıcı bakiye seviyesi)
+  yalnızca durum yükseldiğinde yayınlanır; aynı eşikteki tekrar eklemeler sessizce birleştirilir.
+- İletilen bildirimler depolamaya (notifications) parti halinde yazılır.
+"""
+import os
+import queue
+import threading
+from typing import Any, Dict, Hashable, List, Optional, Sequence, Tuple
+
+from backend.storage import get_repository
+
+# (gözlemciler, bildirim)
+_Is = Tuple[Sequence[Any], Any]
+
+
+class BildirimDagitici:
+    def __init__(self, max_kuyruk: int = 10000, parti: int = 100, bekleme_sn: float = 0.05):
+        self.parti = parti
+        self.bekleme_sn = bekleme_sn
+        self._kuyruk: "queue.Queue[_Is]" = queue.Queue(maxsize=max_kuyruk)
+        self._lock = threading.Lock()
+        self._durumlar: Dict[Hashable, int] = {}
+        self._isci: Optional[threading.Thread] = None
+        self.kuyruga_alinan = 0
+        self.birlestirilen = 0
+        self.dusurulen = 0
+        self.iletilen = 0
+        self.kaydedilen = 0
+
+    def _baslat(self) -> None:
+        if self._isci is not None and self._isci.is_alive():
+            return
+        with self._lock:
+            if self._isci is None or not self._isci.is_alive():
+                self._isci = threading.Thread(target=self._calis, name="bildirim-dagitici", daemon=True)
+                self._isci.start()
+
+    def durum_degisti(self, anahtar: Hashable, durum: int) -> bool:
+        """
+        anahtar için yeni durumu kaydeder; durum öncekinden yüksekse True döner.
+        Düşüşler (ör. silme sonrası eşiğin altına inme) sessizce kaydedilir, böylece eşik
+        yeniden aşılınca tekrar bildirilir.
+        """
+        with self._lock:
+            onceki = self._durumlar.get(anahtar, 0)
+            self._durumlar[anahtar] = durum
+            return durum > onceki
+
+    def sifirla(self, anahtar_oneki: Optional[Tuple[Any, ...]] = None) -> None:
+        """Öneki eşleşen (tuple) anahtarların durumunu unutur, ör. (user_email, "limit"). Önek verilmezse tümü."""
+        with self._lock:
+            if anahtar_oneki is None:
+                self._durumlar.clear()
+                return
+            n = len(anahtar_oneki)
+            for anahtar in [a for a in self._durumlar if isinstance(a, tuple) and a[:n] == anahtar_oneki]:
+                del self._durumlar[anahtar]
+
+    def yayinla(self, gozlemciler: Sequence[Any], bildirim: Any, anahtar: Optional[Hashable] = None, durum: int = 1) -> bool:
+        """
+        Bildirimi kuyruğa ekler (bloklamaz). anahtar verilirse yalnızca durum yükseldiyse eklenir.
+        Dönüş: kuyruğa alındıysa True.
+        """
+        if anahtar is not None and not self.durum_degisti(anahtar, durum):
+            with self._lock:
+                self.birlestirilen += 1
+            return False
+        self._baslat()
+        try:
+            self._kuyruk.put_nowait((tuple(gozlemciler), bildirim))
+        except queue.Full:
+            with self._lock:
+                self.dusurulen += 1
+            print(f"⚠️ Bildirim kuyruğu dolu, bildirim düşürüldü: {getattr(bildirim, 'mesaj', bildirim)}")
+            return False
+        with self._lock:
+            self.kuyruga_alinan += 1
+        return True
+
+    def _calis(self) -> None:
+        while True:
+            isler: List[_Is] = [self._kuyruk.get()]
+            # Kısa bir süre daha bekleyip gelenleri aynı partiye al
+            try:
+                while len(isler) < self.parti:
+                    isler.append(self._kuyruk.get(timeout=self.bekleme_sn))
+            except queue.Empty:
+                pass
+            try:
+                self._ilet(isler)
+            finally:
+                for _ in isler:
+                    self._kuyruk.task_done()
+
+    def _ilet(self, isler: List[_Is]) -> None:
+        kayitlar = []
+        for gozlemciler, bildirim in isler:
+            for gozlemci in gozlemciler:
+                try:
+                    gozlemci.update(bildirim)
+                except Exception as exc:
+                    print(f"❌ Gözlemci bildirimi iletilemedi: {exc}")
+            kayitlar.append({
+                "User_Email": bildirim.user_id,
+                "Mesaj": bildirim.mesaj,
+                "Tarih": bildirim.tarih,
+                "Okundu": bildirim.okundu_mu,
+            })
+        with self._lock:
+            self.iletilen += len(isler)
+        try:
+            get_repository().add_notifications(kayitlar)
+            with self._lock:
+                self.kaydedilen += len(kayitlar)
+        except Exception as exc:
+            print(f"❌ Bildirimler kaydedilemedi: {exc}")
+
+    def bosalt(self) -> None:
+        """Kuyruktaki tüm bildirimler iletilip kaydedilene kadar bekler (testler ve kapanış için)."""
+        if self._isci is not None:
+            self._kuyruk.join()
+
+    def istatistik(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "kuyrukta": self._kuyruk.qsize(),
+                "kuyruga_alinan": self.kuyruga_alinan,
+                "birlestirilen": self.birlestirilen,
+                "dusurulen": self.dusurulen,
+                "iletilen": self.iletilen,
+                "kaydedilen": self.kaydedilen,
+            }
+
+
+_dagitici_lock = threading.Lock()
+_dagitici: Optional[BildirimDagitici] = None
+
+
+def get_bildirim_dagitici() -> BildirimDagitici:
+    """Süreç genelinde tek bildirim dağıtıcısı (Singleton)."""
+    global _dagitici
+    if _dagitici is None:
+        with _dagitici_lock:
+            if _dagitici is None:
+                _dagitici = BildirimDagitici(max_kuyruk=int(os.getenv("NOTIFICATION_QUEUE_SIZE", "10000")))
+    return _dagitici
@@ -0,0 +1,81 @@
+"""
+Bağımlılık başına sınırlı eşzamanlılık.
+
+Her dış bağımlılık (depolama, analiz, AI) kendi iş parçacığı havuzunda çalışır. Böylece async
+endpoint'ler olay döngüsünü bloklamaz, yavaşlayan bir bağımlılık (ör. Gemini) yalnızca kendi
+havuzunu doldurur ve diğer istekleri aç bırakmaz. Havuz boyutları ortam değişkenleriyle ayarlanır:
+
+- STORAGE_CONCURRENCY (varsayılan 32)
+- ANALYSIS_CONCURRENCY (varsayılan 4)
+- AI_CONCURRENCY (varsayılan 8)
+"""
+import asyncio
+import functools
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, TypeVar
+
+T = TypeVar("T")
+
+
+class DependencyLimiter:
+    """Tek bir bağımlılık için en fazla max_concurrency eşzamanlı çağrı çalıştıran havuz."""
+
+    def __init__(self, name: str, max_concurrency: int):
+        self.name = name
+        self.max_concurrency = max_concurrency
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix=f"{name}-")
+        self._lock = threading.Lock()
+        self._aktif = 0
+        self._bekleyen = 0
+        self._tamamlanan = 0
+
+    def _sarmala(self, fn: Callable[[], T]) -> T:
+        with self._lock:
+            self._bekleyen -= 1
+            self._aktif += 1
+        try:
+            return fn()
+        finally:
+            with self._lock:
+                self._aktif -= 1
+                self._tamamlanan += 1
+
+    async def run(self, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """fn'i bu bağımlılığın havuzunda çalıştırır; havuz doluysa sırada bekler."""
+        with self._lock:
+            self._bekleyen += 1
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self._sarmala, functools.partial(fn, *args, **kwargs))
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "max": self.max_concurrency,
+                "aktif": self._aktif,
+                "bekleyen": self._bekleyen,
+                "tamamlanan": self._tamamlanan,
+            }
+
+
+_limiters_lock = threading.Lock()
+_limiters: Dict[str, DependencyLimiter] = {}
+
+_VARSAYILAN_SINIRLAR = {"storage": 32, "analysis": 4, "ai": 8}
+
+
+def get_limiter(name: str) -> DependencyLimiter:
+    """'storage', 'analysis' veya 'ai' bağımlılığının süreç genelindeki sınırlayıcısı."""
+    limiter = _limiters.get(name)
+    if limiter is not None:
+        return limiter
+    with _limiters_lock:
+        if name not in _limiters:
+            varsayilan = _VARSAYILAN_SINIRLAR.get(name, 8)
+            _limiters[name] = DependencyLimiter(name, int(os.getenv(f"{name.upper()}_CONCURRENCY", varsayilan)))
+        return _limiters[name]
+
+
+def limiter_stats() -> Dict[str, Dict[str, Any]]:
+    return {name: limiter.stats() for name, limiter in list(_limiters.items())}
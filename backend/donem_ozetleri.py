@@ -0,0 +1,278 @@
+"""
+Dönem özetlerinden (rollups) okuma ve arka plan sıkıştırma işi.
+
+Depolama her yazımda kullanıcı başına gün / hafta / ay / yıl özetlerini günceller (backend.storage).
+Buradaki okuyucular ham işlemlere dokunmadan, ihtiyaç duyulan seviyeyi okur:
+
+- ``seri(seviye, ...)``: tarih aralığı için seviyedeki dönem toplamları. Aralığın tam kapsadığı
+  dönemler o seviyeden, kenarlardaki yarım dönemler bir alt seviyeden (yıl için ay, sonra gün)
+  okunup dönemine eklenir; sonuç ham işlemlerden hesaplananla aynıdır. Kullanıcı verilmezse
+  kullanıcılar okurken toplanır (tüm kullanıcılar için ayrı, sıcak bir kayıt tutulmaz).
+- ``rollup_ozeti(...)``: ``get_analysis_summary`` biçiminde özet; gunluk_ozet istenen kova
+  seviyesinden, aylık özet ve tahmin ay seviyesinden, toplamlar ve kategori dağılımı yıl
+  seviyesinden okunur.
+- ``RollupDerleyici``: özetleri periyodik olarak (ROLLUP_COMPACTION_SEC, varsayılan 3600 sn; 0 ise
+  yalnızca açılışta gerekirse) ham işlemlerden yeniden derler. Özetler henüz hazır değilse (eski
+  veritabanı) ilk derleme açılışta yapılır; o zamana kadar okuyucular ham işlemlere döner.
+"""
+import os
+import threading
+import time
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from backend.storage import ROLLUP_SEVIYELERI, RollupSatiri, TransactionRepository, donem_baslangici, get_repository
+from backend.analiz_motoru import get_analiz_motoru
+from backend.ozet_onbellegi import get_ozet_onbellegi
+from backend.tahmin import get_tahmin_motoru
+from backend.kategori import BILINMIYOR, get_kategori_tablosu
+
+Donem = Tuple[date, RollupSatiri]
+
+
+def donem_sonu(baslangic: date, seviye: str) -> date:
+    """Dönemden sonraki ilk gün (dönem [baslangic, donem_sonu) aralığıdır)."""
+    if seviye == "day":
+        return baslangic + timedelta(days=1)
+    if seviye == "week":
+        return baslangic + timedelta(days=7)
+    if seviye == "month":
+        return date(baslangic.year + baslangic.month // 12, baslangic.month % 12 + 1, 1)
+    return date(baslangic.year + 1, 1, 1)
+
+
+def gun_hizali_mi(*tarihler: Optional[datetime]) -> bool:
+    """Tarihler gün başına denk geliyor mu (özetler gün çözünürlüğündedir)."""
+    return all(
+        t is None or (t.hour, t.minute, t.second, t.microsecond) == (0, 0, 0, 0)
+        for t in tarihler
+    )
+
+
+def _gun(tarih: Optional[datetime]) -> Optional[date]:
+    return tarih.date() if isinstance(tarih, datetime) else tarih
+
+
+# Yarım (kenar) dönemlerin okunduğu bir alt seviye: yıl kenarı ay + gün, ay/hafta kenarı gün özetlerinden
+_ALT_SEVIYE = {"week": "day", "month": "day", "year": "month"}
+
+
+def _kayit_satiri(kayit: Dict[str, Any], tablo) -> RollupSatiri:
+    kategoriler: Dict[int, List[Any]] = {}
+    for kimlik, kategori in (kayit.get("Kategoriler") or {}).items():
+        # Başka süreçte yazılmış kategori: kanonik adından tabloya öğretilir
+        if kategori.get("Ad") and tablo.ad(kimlik) == BILINMIYOR:
+            tablo.ogren(kimlik, kategori["Ad"])
+        kategoriler[kimlik] = [float(kategori.get("Tutar", 0) or 0), int(kategori.get("Adet", 0) or 0)]
+    return [
+        float(kayit.get("Gelir_Toplam", 0) or 0),
+        float(kayit.get("Gider_Toplam", 0) or 0),
+        int(kayit.get("Islem_Sayisi", 0) or 0),
+        kategoriler,
+    ]
+
+
+def _topla(toplam: Dict[date, RollupSatiri], donem: date, satir: RollupSatiri) -> None:
+    hedef = toplam.get(donem)
+    if hedef is None:
+        toplam[donem] = satir
+        return
+    hedef[0] += satir[0]
+    hedef[1] += satir[1]
+    hedef[2] += satir[2]
+    for kimlik, (tutar, adet) in satir[3].items():
+        kova = hedef[3].get(kimlik)
+        if kova is None:
+            hedef[3][kimlik] = [tutar, adet]
+        else:
+            kova[0] += tutar
+            kova[1] += adet
+
+
+def seri(
+    seviye: str,
+    user_email: Optional[str] = None,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    repository: Optional[TransactionRepository] = None,
+    kategoriler: bool = True,
+) -> List[Donem]:
+    """
+    [start, end) gün aralığındaki dönem toplamları, dönem sırasıyla: [(dönem başı, [gelir, gider,
+    adet, {kategori_id: [tutar, adet]}]), ...]. Boş dönemler yer almaz. kategoriler=False ise
+    kategori toplamları okunmaz.
+    """
+    if seviye not in ROLLUP_SEVIYELERI:
+        raise ValueError(f"Bilinmeyen dönem seviyesi: {seviye} ({', '.join(ROLLUP_SEVIYELERI)} olmalı)")
+    repo = repository or get_repository()
+    tam: Optional[Tuple[Optional[date], Optional[date]]] = (start, end)
+    kenarlar: List[Tuple[date, date]] = []
+    if seviye != "day" and (start is not None or end is not None):
+        # Aralığın tam kapsadığı dönemler: [tam_bas, tam_son)
+        tam_bas = start
+        if start is not None and donem_baslangici(start, seviye) != start:
+            tam_bas = donem_sonu(donem_baslangici(start, seviye), seviye)
+        tam_son = donem_baslangici(end, seviye) if end is not None else None
+        if tam_bas is not None and tam_son is not None and tam_bas >= tam_son:
+            tam, kenarlar = None, [(start, end)]
+        else:
+            tam = (tam_bas, tam_son)
+            kenarlar = [(a, b) for a, b in ((start, tam_bas), (tam_son, end)) if a is not None and b is not None and a < b]
+
+    toplam: Dict[date, RollupSatiri] = {}
+    if tam is not None:
+        tablo = get_kategori_tablosu()
+        for kayit in repo.rollups(seviye, user_email=user_email, start=tam[0], end=tam[1], kategoriler=kategoriler):
+            _topla(toplam, date.fromisoformat(kayit["Donem"]), _kayit_satiri(kayit, tablo))
+    for bas, son in kenarlar:
+        for donem, satir in seri(_ALT_SEVIYE[seviye], user_email, bas, son, repo, kategoriler):
+            _topla(toplam, donem_baslangici(donem, seviye), satir)
+    return [(donem, satir) for donem, satir in sorted(toplam.items()) if satir[2] > 0]
+
+
+def rollup_ozeti(
+    user_email: Optional[str] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    kova: str = "day",
+    repository: Optional[TransactionRepository] = None,
+) -> Dict[str, Any]:
+    """
+    get_analysis_summary ile aynı biçimde özet; yalnızca dönem özetlerinden okunur. kova (day/week/
+    month) gunluk_ozet'in seviyesidir; gün dışı kovalarda 'gun' alanı dönemin ilk günüdür.
+    Tarihler gün çözünürlüğünde değerlendirilir (bkz. gun_hizali_mi).
+    """
+    repo = repository or get_repository()
+    bas, son = _gun(start), _gun(end)
+    aylik = seri("month", user_email, bas, son, repo)
+    if not aylik:
+        return {
+            "message": "Veri bulunamadı",
+            "toplam_gelir": 0,
+            "toplam_gider": 0,
+            "gunluk_ozet": [],
+            "aylik_ozet": [],
+            "tahmin": {"gelir": 0, "gider": 0},
+            "kategori_dagilimi": {},
+        }
+    gunluk = aylik if kova == "month" else seri(kova, user_email, bas, son, repo, kategoriler=False)
+    yillik = seri("year", user_email, bas, son, repo)
+
+    kategori_aylik: Dict[int, Dict[Tuple[int, int], float]] = {}
+    for donem, satir in aylik:
+        for kimlik, (tutar, _) in satir[3].items():
+            kategori_aylik.setdefault(kimlik, {})[(donem.year, donem.month)] = tutar
+    tahmin = get_tahmin_motoru().tahmin(
+        {(donem.year, donem.month): (satir[0], satir[1]) for donem, satir in aylik},
+        kategori_aylik,
+    )
+
+    kategori: Dict[int, float] = {}
+    for _, satir in yillik:
+        for kimlik, (tutar, _) in satir[3].items():
+            kategori[kimlik] = kategori.get(kimlik, 0.0) + tutar
+    tablo = get_kategori_tablosu()
+    return {
+        "toplam_gelir": float(sum(s[0] for _, s in yillik)),
+        "toplam_gider": float(sum(s[1] for _, s in yillik)),
+        "tahmin": tahmin,
+        "gunluk_ozet": [
+            {"gun": donem.strftime("%Y-%m-%d"), "gelir": float(s[0]), "gider": float(s[1])} for donem, s in gunluk
+        ],
+        "aylik_ozet": [
+            {"ay": donem.strftime("%Y-%m-01"), "gelir": float(s[0]), "gider": float(s[1])} for donem, s in aylik
+        ],
+        "kategori_dagilimi": dict(sorted((tablo.ad(k), float(v)) for k, v in kategori.items())),
+    }
+
+
+class RollupDerleyici:
+    """Dönem özetlerini arka planda periyodik olarak yeniden derleyen (sıkıştıran) iş."""
+
+    def __init__(self, aralik_sn: float = 3600.0, repository: Optional[TransactionRepository] = None):
+        self.aralik_sn = aralik_sn
+        self._repository = repository
+        self._lock = threading.Lock()
+        self._dur = threading.Event()
+        self._isci: Optional[threading.Thread] = None
+        self.derleme_sayisi = 0
+        self.son_derleme: Optional[str] = None
+        self.son_sure_ms: Optional[float] = None
+        self.son_kayit: Optional[int] = None
+        self.hata: Optional[str] = None
+
+    @property
+    def repository(self) -> TransactionRepository:
+        return self._repository or get_repository()
+
+    def derle(self) -> int:
+        """
+        Özetleri şimdi yeniden derler. Kurulmuş analiz motoru da (gün özetlerinden) yeniden kurulur;
+        başka süreçlerin yazımlarından kalan sapmalar böylece düzelir. Dönüş: yazılan özet kaydı sayısı.
+        """
+        t0 = time.perf_counter()
+        try:
+            kayit = self.repository.rebuild_rollups()
+        except Exception as e:
+            with self._lock:
+                self.hata = str(e)
+            raise
+        motor = get_analiz_motoru()
+        if motor.hazir:
+            motor.yeniden_olustur()
+        else:
+            get_ozet_onbellegi().gecersiz_kil()
+        with self._lock:
+            self.derleme_sayisi += 1
+            self.son_derleme = datetime.now().isoformat(timespec="seconds")
+            self.son_sure_ms = round((time.perf_counter() - t0) * 1000, 1)
+            self.son_kayit = kayit
+            self.hata = None
+        return kayit
+
+    def _calis(self) -> None:
+        try:
+            if not self.repository.rollups_hazir():
+                self.derle()
+        except Exception as e:
+            print(f"❌ Dönem özetleri derlenemedi: {e}")
+        while self.aralik_sn > 0 and not self._dur.wait(self.aralik_sn):
+            try:
+                self.derle()
+            except Exception as e:
+                print(f"❌ Dönem özetleri derlenemedi: {e}")
+
+    def baslat(self) -> None:
+        with self._lock:
+            if self._isci is None or not self._isci.is_alive():
+                self._dur.clear()
+                self._isci = threading.Thread(target=self._calis, name="rollup-derleyici", daemon=True)
+                self._isci.start()
+
+    def durdur(self) -> None:
+        self._dur.set()
+
+    def istatistik(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "aralik_sn": self.aralik_sn,
+                "derleme_sayisi": self.derleme_sayisi,
+                "son_derleme": self.son_derleme,
+                "son_sure_ms": self.son_sure_ms,
+                "son_kayit": self.son_kayit,
+                "hata": self.hata,
+            }
+
+
+_derleyici_lock = threading.Lock()
+_derleyici: Optional[RollupDerleyici] = None
+
+
+def get_rollup_derleyici() -> RollupDerleyici:
+    """Süreç genelinde tek RollupDerleyici örneği (Singleton)."""
+    global _derleyici
+    if _derleyici is None:
+        with _derleyici_lock:
+            if _derleyici is None:
+                _derleyici = RollupDerleyici(aralik_sn=float(os.getenv("ROLLUP_COMPACTION_SEC", "3600")))
+    return _derleyici
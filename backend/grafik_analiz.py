@@ -1,46 +1,102 @@
+import numpy as np
 import pandas as pd
-from typing import Dict, Any
+from datetime import datetime
+from typing import Dict, Any, Iterable, List, Optional
 
-from backend.firebase_config import get_db
+from backend.storage import Belge, get_repository
+from backend.donem_ozetleri import gun_hizali_mi, rollup_ozeti
+from backend.anlik_goruntu import get_anlik_goruntu
+from backend.analiz_motoru import get_analiz_motoru
+from backend.concurrency import get_limiter
+from backend.ozet_onbellegi import get_ozet_onbellegi, ozet_anahtari
+from backend.tahmin import get_tahmin_motoru
+from backend.kategori import get_kategori_tablosu
 
+_SUTUNLAR = ["id", "Tarih", "Kategori", "Kategori_Id", "Tutar", "Islem_Tipi", "Aciklama", "Kaynak"]
+# get_analysis_summary_pandas'ın kullandığı sütunlar (anlık görüntüden yalnızca bunlar okunur)
+_OZET_SUTUNLARI = ["Tarih", "Kategori", "Kategori_Id", "Tutar", "Islem_Tipi"]
+
+# gunluk_ozet seyreltme: kova boyutları ve nokta sınırları (grafik yükü için)
+KOVALAR = ("day", "week", "month")
+VARSAYILAN_NOKTA = 1000
+MIN_NOKTA = 10
+MAX_NOKTA = 5000
+
+
+def _belgelerden_df(docs: Iterable[Belge]) -> pd.DataFrame:
+    """
+    Belgeleri sütun sütun toplar ve tüm dönüşümleri tek vektörel geçişte yapar:
+    Tarih -> datetime64, Tutar -> float64, Kategori_Id -> int64 (kanonik kategori kimliği),
+    Kategori -> category (kanonik ad); id belge kimliğidir. Satır başına yalnızca ham alan değerleri
+    listelere eklenir.
+    """
+    idler, tarihler, tipler, aciklamalar, kaynaklar, tutarlar, kategoriler, kategori_idleri = [], [], [], [], [], [], [], []
+    for doc_id, data in docs:
+        idler.append(doc_id)
+        tarihler.append(data.get("Tarih"))  # Firestore Timestamp or datetime
+        tipler.append(data.get("Islem_Tipi"))
+        aciklamalar.append(data.get("Aciklama"))
+        kaynaklar.append(data.get("Kaynak"))
+        tutarlar.append(data.get("Tutar"))
+        kategoriler.append(data.get("Kategori") or data.get("kategori"))
+        kategori_idleri.append(data.get("Kategori_Id"))
+
+    if not tarihler:
+        return pd.DataFrame(columns=_SUTUNLAR)  # empty
 
-def _fetch_transactions_df() -> pd.DataFrame:
     try:
-        db = get_db()
-        docs = db.collection("transactions").stream()
-
-        rows = []
-        for d in docs:
-            data = d.to_dict() or {}
-            # Normalize fields and provide defaults if missing
-            tarih = data.get("Tarih")  # Firestore Timestamp or datetime
-            islem_tipi = data.get("Islem_Tipi")
-            aciklama = data.get("Aciklama")
-            kaynak = data.get("Kaynak")
-            tutar = data.get("Tutar")
-
-            # Kategori belirleme: Eğer gider ve Kategori boşsa Aciklama'yı kategori olarak kullan
-            kategori_raw = data.get("Kategori") or data.get("kategori")
-            if (not kategori_raw) and islem_tipi == "Gider" and aciklama:
-                kategori_raw = aciklama
-            kategori = (kategori_raw or "Bilinmiyor")
-
-            rows.append({
-                "Tarih": pd.to_datetime(tarih) if tarih is not None else pd.NaT,
-                "Kategori": kategori,
-                "Tutar": float(tutar) if tutar is not None else 0.0,
-                "Islem_Tipi": islem_tipi,
-                "Aciklama": aciklama,
-                "Kaynak": kaynak,
-            })
-
-        if not rows:
-            return pd.DataFrame(columns=["Tarih", "Kategori", "Tutar", "Islem_Tipi", "Aciklama", "Kaynak"])  # empty
-
-        df = pd.DataFrame(rows)
-        df = df.dropna(subset=["Tarih"]).copy()
-        df["Tarih"] = pd.to_datetime(df["Tarih"])  # ensure dtype
-        return df
+        tarih = pd.to_datetime(pd.Series(tarihler, dtype=object), errors="coerce")
+    except (TypeError, ValueError):
+        # Saat dilimli ve dilimsiz değerler karışıksa UTC'ye hizala
+        tarih = pd.to_datetime(pd.Series(tarihler, dtype=object), errors="coerce", utc=True)
+    gecerli = tarih.notna().to_numpy()
+
+    tip = np.asarray(tipler, dtype=object)
+    aciklama = np.asarray(aciklamalar, dtype=object)
+    kategori = np.asarray(kategoriler, dtype=object)
+    # Kategori belirleme: Eğer gider ve Kategori boşsa Aciklama'yı kategori olarak kullan. Yazımda
+    # kanonikleştirilmiş belgeler Kategori_Id taşır; eskiler her farklı metin için bir kez çözülür.
+    kategori_bos = ~pd.Series(kategori, dtype=object).fillna("").astype(bool).to_numpy()
+    aciklama_dolu = pd.Series(aciklama, dtype=object).fillna("").astype(bool).to_numpy()
+    kategori = np.where(kategori_bos & (tip == "Gider") & aciklama_dolu, aciklama, kategori)
+    tablo = get_kategori_tablosu()
+    kategori_id = tablo.belge_kimlikleri(kategori_idleri, kategori)
+    tekil_id, kategori_kod = np.unique(kategori_id, return_inverse=True)
+    kategori_adi = np.asarray(tablo.adlar(tekil_id.tolist()), dtype=object)[kategori_kod]
+
+    tutar = pd.to_numeric(pd.Series(tutarlar, dtype=object), errors="coerce").fillna(0.0).to_numpy(dtype=np.float64)
+
+    df = pd.DataFrame({
+        "id": np.asarray(idler, dtype=object)[gecerli],
+        "Tarih": tarih[gecerli].reset_index(drop=True),
+        "Kategori": pd.Categorical(kategori_adi[gecerli]),
+        "Kategori_Id": kategori_id[gecerli],
+        "Tutar": tutar[gecerli],
+        "Islem_Tipi": tip[gecerli],
+        "Aciklama": aciklama[gecerli],
+        "Kaynak": np.asarray(kaynaklar, dtype=object)[gecerli],
+    })
+    return df
+
+
+def _fetch_transactions_df(
+    user_email: Optional[str] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    sutunlar: Optional[List[str]] = None,
+) -> pd.DataFrame:
+    """
+    İşlemleri DataFrame olarak döndürür. SNAPSHOT_CACHE açıksa yerel anlık görüntüden (yalnızca
+    sutunlar okunur), değilse ya da görüntü okunamazsa depolamadan.
+    """
+    goruntu = get_anlik_goruntu()
+    if goruntu is not None:
+        try:
+            return goruntu.df(user_email, start, end, sutunlar)
+        except Exception as e:
+            print(f"⚠️ Anlık görüntü okunamadı, depolamadan çekiliyor: {e}")
+    try:
+        return _belgelerden_df(get_repository().query_range(start=start, end=end, user_email=user_email))
     except Exception as e:
         error_msg = str(e).lower()
         if "network" in error_msg or "connection" in error_msg or "timeout" in error_msg:
@@ -50,13 +106,72 @@ def _fetch_transactions_df() -> pd.DataFrame:
         raise
 
 
+def _hesapla_ozet(user_email: Optional[str], start: Optional[datetime], end: Optional[datetime], kova: str = "day") -> Dict[str, Any]:
+    # Tarih aralığı yoksa artımlı motor; aralık varsa dönem özetleri (hazırsa) ya da aralığın taraması
+    ozet: Optional[Dict[str, Any]] = None
+    if start is None and end is None:
+        try:
+            ozet = get_analiz_motoru().ozet(user_email)
+        except Exception as e:
+            print(f"⚠️ Analiz motoru kullanılamadı, tam taramaya dönülüyor: {e}")
+    elif gun_hizali_mi(start, end):
+        try:
+            repo = get_repository()
+            if repo.rollups_hazir():
+                return rollup_ozeti(user_email, start, end, kova, repo)
+        except Exception as e:
+            print(f"⚠️ Dönem özetleri okunamadı, aralık taramasına dönülüyor: {e}")
+    if ozet is None:
+        ozet = get_analysis_summary_pandas(user_email, start, end)
+    if kova == "day":
+        return ozet
+    return {**ozet, "gunluk_ozet": gunluk_seyrelt(ozet.get("gunluk_ozet") or [], kova, None)}
+
+
+def get_analysis_summary(
+    user_email: Optional[str] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    kova: str = "day",
+) -> Dict[str, Any]:
+    """
+    Analiz özetini döndürür. Sonuç (kullanıcı, tarih aralığı, kova) anahtarıyla süreç genelindeki
+    özet önbelleğinde tutulur. Tüm geçmiş için artımlı analiz motoru (bellekteki günlük/aylık/kategori
+    toplamları), tarih aralığı verilirse depolamadaki dönem özetleri (backend.donem_ozetleri; yalnızca
+    gereken seviyeler okunur) kullanılır. Özetler henüz derlenmediyse aralık pandas ile taranır.
+    kova (day/week/month) gunluk_ozet'in seviyesidir.
+    """
+    if kova not in KOVALAR:
+        raise ValueError(f"kova {', '.join(KOVALAR)} olmalı")
+    return get_ozet_onbellegi().al(
+        ozet_anahtari(user_email, start, end, kova),
+        lambda: _hesapla_ozet(user_email, start, end, kova),
+    )
+
+
+async def get_analysis_summary_async(
+    user_email: Optional[str] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    kova: str = "day",
+) -> Dict[str, Any]:
+    """get_analysis_summary'nin async karşılığı; önbellek kaçırılırsa 'analysis' havuzunda hesaplanır."""
+    onbellekte = get_ozet_onbellegi().bak(ozet_anahtari(user_email, start, end, kova))
+    if onbellekte is not None:
+        return onbellekte
+    return await get_limiter("analysis").run(get_analysis_summary, user_email, start, end, kova)
+
 
-def get_analysis_summary() -> Dict[str, Any]:
+def get_analysis_summary_pandas(
+    user_email: Optional[str] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+) -> Dict[str, Any]:
     """
-    Firestore'dan veriyi çekip DataFrame'e dönüştürür, mevcut analiz ve tahmin mantığını uygular
-    ve sonuçları JSON uyumlu bir sözlük olarak döndürür.
+    Depolamadan veriyi çekip DataFrame'e dönüştürür, mevcut analiz ve tahmin mantığını uygular
+    ve sonuçları JSON uyumlu bir sözlük olarak döndürür. Analiz motorunun referans hesaplamasıdır.
     """
-    df = _fetch_transactions_df()
+    df = _fetch_transactions_df(user_email, start, end, _OZET_SUTUNLARI)
     if df.empty:
         return {
             "message": "Veri bulunamadı",
@@ -68,19 +183,10 @@ def get_analysis_summary() -> Dict[str, Any]:
             "kategori_dagilimi": {},
         }
 
-    # Günlük özet: Her gün için gelir ve gider toplamları
-    sadece_giderler = df[df['Islem_Tipi'] == 'Gider'].copy()
-    # Kategori normalizasyonu: boş/None -> Bilinmiyor, trim ve Title Case
-    if not sadece_giderler.empty:
-        sadece_giderler['Kategori'] = (
-            sadece_giderler['Kategori']
-            .fillna('Bilinmiyor')
-            .astype(str)
-            .str.strip()
-            .replace({'': 'Bilinmiyor'})
-            .str.title()
-        )
-    
+    # Giderler; kategoriler _belgelerden_df'de kanonikleştirildi, gruplama Kategori_Id üzerinden
+    sadece_giderler = df[df['Islem_Tipi'] == 'Gider']
+    tablo = get_kategori_tablosu()
+
     # Tarih sütununu normalize et (sadece tarih, saat bilgisi yok)
     df['Tarih_Gun'] = pd.to_datetime(df['Tarih']).dt.normalize()
     
@@ -100,56 +206,119 @@ def get_analysis_summary() -> Dict[str, Any]:
     if 'Gider' not in aylik_ozet.columns:
         aylik_ozet['Gider'] = 0
 
-    son_3_ay_gelir_ort = float(aylik_ozet['Gelir'].tail(3).mean()) if not aylik_ozet.empty else 0.0
-    son_3_ay_gider_ort = float(aylik_ozet['Gider'].tail(3).mean()) if not aylik_ozet.empty else 0.0
+    # Tahmin: geriye dönük test edilen modeller arasından en iyisi (gider kategori bazında)
+    kategori_aylik: Dict[int, Dict[Any, float]] = {}
+    if not sadece_giderler.empty:
+        kategori_ay = sadece_giderler.groupby(
+            ['Kategori_Id', sadece_giderler['Tarih'].dt.year, sadece_giderler['Tarih'].dt.month]
+        )['Tutar'].sum()
+        for (kategori, yil, ay), tutar in kategori_ay.items():
+            kategori_aylik.setdefault(int(kategori), {})[(int(yil), int(ay))] = float(tutar)
+    tahmin = get_tahmin_motoru().tahmin(
+        {(idx.year, idx.month): (float(row['Gelir']), float(row['Gider'])) for idx, row in aylik_ozet.iterrows()},
+        kategori_aylik,
+    )
 
     toplam_gelir = float(df[df['Islem_Tipi'] == 'Gelir']['Tutar'].sum())
     toplam_gider = float(df[df['Islem_Tipi'] == 'Gider']['Tutar'].sum())
 
     kategori_toplam = (
-        sadece_giderler.groupby("Kategori")["Tutar"].sum()
+        sadece_giderler.groupby("Kategori_Id")["Tutar"].sum()
         if not sadece_giderler.empty else pd.Series(dtype=float)
     )
-    kategori_dagilimi = {str(k): float(v) for k, v in kategori_toplam.to_dict().items()}
-
-    # Günlük özetin JSON'a uygun hali (TÜM günler, sınırlama yok)
-    gunluk_list = []
-    if not gunluk_ozet.empty:
-        # Tüm günleri göster (sıralı)
-        for idx, row in gunluk_ozet.iterrows():
-            # idx bir Timestamp olabilir, normalize et
-            if isinstance(idx, pd.Timestamp):
-                tarih_str = idx.strftime('%Y-%m-%d')
-            else:
-                tarih_str = pd.to_datetime(idx).strftime('%Y-%m-%d')
-            gunluk_list.append({
-                "gun": tarih_str,
-                "gelir": float(row.get('Gelir', 0.0)),
-                "gider": float(row.get('Gider', 0.0)),
-            })
-        # Tarihe göre sırala
-        gunluk_list.sort(key=lambda x: x['gun'])
-    
+    kategori_dagilimi = dict(sorted(
+        zip(tablo.adlar(kategori_toplam.index.tolist()), kategori_toplam.to_numpy(dtype=np.float64).tolist())
+    ))
+
+    # Günlük özetin JSON'a uygun hali (tüm günler, tarihe göre sıralı; seyreltme endpoint'te yapılır)
+    gunluk_ozet = gunluk_ozet.sort_index()
+    gunluk_list = _seri_listesi(
+        "gun", pd.DatetimeIndex(gunluk_ozet.index).strftime('%Y-%m-%d'), gunluk_ozet['Gelir'], gunluk_ozet['Gider']
+    )
     # Aylık özetin JSON'a uygun hali (tahmin için) - Ayın ilk günü olarak göster
-    aylik_list = []
-    if not aylik_ozet.empty:
-        for idx, row in aylik_ozet.iterrows():
-            # Ayın ilk günü olarak göster (daha anlamlı)
-            ay_baslangic = idx.replace(day=1)
-            aylik_list.append({
-                "ay": ay_baslangic.strftime('%Y-%m-%d'),
-                "gelir": float(row.get('Gelir', 0.0)),
-                "gider": float(row.get('Gider', 0.0)),
-            })
+    aylik_list = _seri_listesi(
+        "ay", pd.DatetimeIndex(aylik_ozet.index).strftime('%Y-%m-01'), aylik_ozet['Gelir'], aylik_ozet['Gider']
+    )
 
     return {
         "toplam_gelir": toplam_gelir,
         "toplam_gider": toplam_gider,
-        "tahmin": {
-            "gelir": son_3_ay_gelir_ort,
-            "gider": son_3_ay_gider_ort,
-        },
+        "tahmin": tahmin,
         "gunluk_ozet": gunluk_list,  # Günlük veri (chart için)
         "aylik_ozet": aylik_list,  # Aylık veri (tahmin için)
         "kategori_dagilimi": kategori_dagilimi,
     }
+
+
+def _seri_listesi(anahtar: str, tarihler: Iterable[str], gelir: Iterable[float], gider: Iterable[float]) -> List[Dict[str, Any]]:
+    """Sütunlardan [{anahtar, gelir, gider}, ...] listesini satır yinelemeden kurar."""
+    gelirler = np.asarray(gelir, dtype=np.float64).tolist()
+    giderler = np.asarray(gider, dtype=np.float64).tolist()
+    return [{anahtar: t, "gelir": g, "gider": c} for t, g, c in zip(list(tarihler), gelirler, giderler)]
+
+
+def _minmax_indeksleri(degerler: np.ndarray, kova_sayisi: int) -> np.ndarray:
+    """
+    Seriyi eşit genişlikte kova_sayisi kovaya böler ve her kovanın en küçük ve en büyük
+    değerinin indekslerini döndürür (tepe ve dipler korunur). Tamamen vektöreldir.
+    """
+    n = len(degerler)
+    genislik = -(-n // kova_sayisi)
+    kova_sayisi = -(-n // genislik)
+    matris = np.full(kova_sayisi * genislik, np.nan)
+    matris[:n] = degerler
+    matris = matris.reshape(kova_sayisi, genislik)
+    baslangic = np.arange(kova_sayisi) * genislik
+    return np.concatenate([baslangic + np.nanargmin(matris, axis=1), baslangic + np.nanargmax(matris, axis=1)])
+
+
+def gunluk_seyrelt(gunluk: List[Dict[str, Any]], kova: str = "day", nokta: Optional[int] = VARSAYILAN_NOKTA) -> List[Dict[str, Any]]:
+    """
+    gunluk_ozet listesini grafik için küçültür:
+    1. kova "week"/"month" ise günler hafta (pazartesi) / ay başına toplanır; "gun" kovanın ilk günüdür
+    2. kalan nokta sayısı ``nokta``yı aşarsa gelir ve gider serilerinin her biri için kova başına
+       min/max noktaları seçilir (ilk ve son nokta her zaman kalır); seçilen günlerin değerleri
+       değiştirilmeden döner, böylece serinin şekli (tepeler/dipler) korunur.
+    Sonuç en fazla ``nokta`` elemanlıdır.
+    """
+    if kova not in KOVALAR:
+        raise ValueError(f"kova {', '.join(KOVALAR)} olmalı")
+    if not gunluk:
+        return []
+    gunler = np.array([g["gun"] for g in gunluk], dtype="datetime64[D]")
+    gelir = np.array([g["gelir"] for g in gunluk], dtype=np.float64)
+    gider = np.array([g["gider"] for g in gunluk], dtype=np.float64)
+
+    if kova != "day":
+        if kova == "week":
+            # 1970-01-01 perşembe; (gün + 3) % 7 pazartesi için 0 olur
+            baslangic = gunler - ((gunler.astype(np.int64) + 3) % 7).astype("timedelta64[D]")
+        else:
+            baslangic = gunler.astype("datetime64[M]").astype("datetime64[D]")
+        gunler, ters = np.unique(baslangic, return_inverse=True)
+        gelir = np.bincount(ters, weights=gelir, minlength=len(gunler))
+        gider = np.bincount(ters, weights=gider, minlength=len(gunler))
+
+    n = len(gunler)
+    if nokta is not None and n > nokta:
+        # Her seri için kova başına 2 nokta; iki seri ve uç noktalar bütçeye sığsın
+        kova_sayisi = max((nokta - 2) // 4, 1)
+        secilen = np.unique(np.concatenate([
+            [0, n - 1],
+            _minmax_indeksleri(gelir, kova_sayisi),
+            _minmax_indeksleri(gider, kova_sayisi),
+        ]))
+        gunler, gelir, gider = gunler[secilen], gelir[secilen], gider[secilen]
+
+    return _seri_listesi("gun", np.datetime_as_string(gunler, unit="D").tolist(), gelir, gider)
+
+
+def grafik_ozeti(ozet: Dict[str, Any], kova: str = "day", nokta: Optional[int] = VARSAYILAN_NOKTA) -> Dict[str, Any]:
+    """Özetin gunluk_ozet'i seyreltilmiş kopyası (önbellekteki özet değiştirilmez)."""
+    gunluk = ozet.get("gunluk_ozet") or []
+    seyrek = gunluk_seyrelt(gunluk, kova, nokta)
+    return {
+        **ozet,
+        "gunluk_ozet": seyrek,
+        "gunluk_seyreltme": {"kova": kova, "nokta": len(seyrek), "kaynak_nokta": len(gunluk)},
+    }
@@ -0,0 +1,317 @@
+"""
+Sunucu tarafı grafik çizimi (GET /charts/{kind}).
+
+Grafikler matplotlib'in Agg arka ucuyla, pyplot'un global durumuna dokunmadan (doğrudan Figure
+nesnesiyle) ayrı işçi süreçlerinde çizilir; çizim GIL'i ve sunucunun thread havuzlarını meşgul
+etmez. İşçilere yalnızca grafiğin ihtiyaç duyduğu sade veri (liste/sözlük) gönderilir.
+
+Çıktılar (PNG/SVG baytları) grafik verisi + seçeneklerin özetiyle (sha256) anahtarlanan, bayt
+sınırlı bir LRU önbellekte tutulur. Aynı anahtar için süren bir çizim varsa yeni istek onu bekler.
+Anahtar aynı zamanda yanıtın ETag'idir.
+
+Bu modül işçi süreçlerde de içe aktarıldığından (spawn) üst düzeyde yalnızca standart kütüphane
+kullanır; matplotlib işçide tembel yüklenir.
+"""
+import asyncio
+import hashlib
+import io
+import json
+import multiprocessing
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import date, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+GRAFIK_TURLERI = ("categories", "monthly", "daily")
+BICIMLER = {"png": "image/png", "svg": "image/svg+xml"}
+MIN_PIKSEL, MAX_PIKSEL = 200, 4000
+VARSAYILAN_GENISLIK, VARSAYILAN_YUKSEKLIK = 1200, 600
+DPI = 100
+# Pastada ayrı dilim olarak gösterilecek en fazla kategori; kalanlar "Diğer" diliminde toplanır
+MAX_DILIM = 8
+
+# seaborn "pastel" paleti (CLI'daki pasta grafiğiyle aynı renkler; işçide seaborn yüklenmez)
+_PASTEL = ["#a1c9f4", "#ffb482", "#8de5a1", "#ff9f9b", "#d0bbff", "#debb9b", "#fab0e4", "#cfcfcf", "#fffea3", "#b9f2f0"]
+_BASLIKLAR = {
+    "categories": "Genel Harcama Dağılımı",
+    "monthly": "Bütçe Dengesi ve Gelecek Tahmini",
+    "daily": "Gelir / Gider",
+}
+
+
+def cizim_verisi(tur: str, ozet: Dict[str, Any]) -> Dict[str, Any]:
+    """Analiz özetinden grafiğin kullandığı alanları çıkarır (önbellek anahtarı da bundan üretilir)."""
+    if tur == "categories":
+        dagilim = sorted((ozet.get("kategori_dagilimi") or {}).items(), key=lambda kv: -kv[1])
+        dilimler = [[str(ad), round(float(tutar), 2)] for ad, tutar in dagilim if tutar > 0]
+        if len(dilimler) > MAX_DILIM:
+            diger = round(sum(t for _, t in dilimler[MAX_DILIM - 1:]), 2)
+            dilimler = dilimler[:MAX_DILIM - 1] + [["Diğer", diger]]
+        return {"dilimler": dilimler}
+    if tur == "monthly":
+        tahmin = ozet.get("tahmin") or {}
+        return {
+            "noktalar": [
+                [str(s["ay"])[:10], round(float(s.get("gelir") or 0), 2), round(float(s.get("gider") or 0), 2)]
+                for s in ozet.get("aylik_ozet") or []
+            ],
+            "tahmin": [round(float(tahmin.get("gelir") or 0), 2), round(float(tahmin.get("gider") or 0), 2)],
+        }
+    if tur == "daily":
+        return {
+            "noktalar": [
+                [str(s["gun"])[:10], round(float(s.get("gelir") or 0), 2), round(float(s.get("gider") or 0), 2)]
+                for s in ozet.get("gunluk_ozet") or []
+            ],
+        }
+    raise ValueError(f"kind {', '.join(GRAFIK_TURLERI)} olmalı")
+
+
+def grafik_anahtari(tur: str, veri: Dict[str, Any], secenekler: Dict[str, Any]) -> str:
+    govde = json.dumps([tur, veri, secenekler], sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(govde.encode("utf-8")).hexdigest()
+
+
+# ---------------------------------------------------------------------------
+# İşçi sürecinde çalışan kısım
+# ---------------------------------------------------------------------------
+
+def _isci_hazirla() -> None:
+    """İşçi başlangıcı: Agg seçilir ve matplotlib önceden yüklenir (ilk istek içe aktarma ödemez)."""
+    import matplotlib
+
+    matplotlib.use("Agg")
+    # SVG içindeki kimlikler her çizimde aynı olsun (aynı veri -> aynı bayt)
+    matplotlib.rcParams["svg.hashsalt"] = "cebimdekiveri"
+    from matplotlib.figure import Figure  # noqa: F401
+    from matplotlib.backends.backend_agg import FigureCanvasAgg  # noqa: F401
+
+
+def _gun(s: str) -> date:
+    return date.fromisoformat(s)
+
+
+def _sonraki_ay(g: date) -> date:
+    return date(g.year + g.month // 12, g.month % 12 + 1, 1)
+
+
+def _bos(ax) -> None:
+    ax.text(0.5, 0.5, "Veri bulunamadı", ha="center", va="center", fontsize=14, color="gray", transform=ax.transAxes)
+    ax.set_axis_off()
+
+
+def _pasta(ax, veri: Dict[str, Any]) -> None:
+    dilimler = veri["dilimler"]
+    if not dilimler:
+        _bos(ax)
+        return
+    ax.pie(
+        [t for _, t in dilimler],
+        labels=[ad for ad, _ in dilimler],
+        autopct="%1.1f%%",
+        startangle=140,
+        explode=[0.05] * len(dilimler),
+        colors=[_PASTEL[i % len(_PASTEL)] for i in range(len(dilimler))],
+    )
+    ax.axis("equal")
+
+
+def _gelir_gider(ax, noktalar: List[list], isaretci: Optional[str]) -> Tuple[list, list, list]:
+    x = [_gun(n[0]) for n in noktalar]
+    gelir = [n[1] for n in noktalar]
+    gider = [n[2] for n in noktalar]
+    ax.plot(x, gelir, marker=isaretci, color="green", linewidth=2, label="Gerçekleşen Gelir")
+    ax.plot(x, gider, marker=isaretci, color="red", linewidth=2, label="Gerçekleşen Gider")
+    ax.fill_between(x, gelir, gider, where=[a >= b for a, b in zip(gelir, gider)], interpolate=True, color="green", alpha=0.05)
+    ax.fill_between(x, gelir, gider, where=[a < b for a, b in zip(gelir, gider)], interpolate=True, color="red", alpha=0.05)
+    ax.grid(True, alpha=0.3)
+    return x, gelir, gider
+
+
+def _aylik(ax, veri: Dict[str, Any]) -> None:
+    noktalar = veri["noktalar"]
+    if not noktalar:
+        _bos(ax)
+        return
+    x, gelir, gider = _gelir_gider(ax, noktalar, "o")
+    tahmin_gelir, tahmin_gider = veri["tahmin"]
+    son, gelecek = x[-1], _sonraki_ay(x[-1])
+    ax.plot([son, gelecek], [gelir[-1], tahmin_gelir], color="green", linestyle="--", marker=">",
+            markersize=8, alpha=0.7, label="Gelir Tahmini")
+    ax.plot([son, gelecek], [gider[-1], tahmin_gider], color="red", linestyle="--", marker=">",
+            markersize=8, alpha=0.7, label="Gider Tahmini")
+    ax.annotate(f"Gelecek Tahmini:\n{int(tahmin_gider)} TL", (gelecek, tahmin_gider),
+                textcoords="offset points", xytext=(10, 0), ha="left", color="red", fontweight="bold",
+                bbox=dict(boxstyle="round,pad=0.3", fc="white", ec="red", lw=1))
+    ax.set_xlim(x[0] - timedelta(days=10), gelecek + timedelta(days=45))
+    ax.legend()
+
+
+def _gunluk(ax, veri: Dict[str, Any]) -> None:
+    noktalar = veri["noktalar"]
+    if not noktalar:
+        _bos(ax)
+        return
+    _gelir_gider(ax, noktalar, "o" if len(noktalar) <= 60 else None)
+    ax.legend()
+
+
+_CIZIMLER = {"categories": _pasta, "monthly": _aylik, "daily": _gunluk}
+
+
+def grafik_ciz(tur: str, veri: Dict[str, Any], secenekler: Dict[str, Any]) -> bytes:
+    """Grafiği çizip PNG/SVG baytlarını döndürür (işçi sürecinde çağrılır; pyplot kullanılmaz)."""
+    _isci_hazirla()
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+    fig = Figure(figsize=(secenekler["genislik"] / DPI, secenekler["yukseklik"] / DPI), dpi=DPI)
+    FigureCanvasAgg(fig)
+    ax = fig.add_subplot(1, 1, 1)
+    _CIZIMLER[tur](ax, veri)
+    ax.set_title(_BASLIKLAR[tur], fontsize=13)
+    if tur != "categories":
+        fig.autofmt_xdate()
+    fig.tight_layout()
+    tampon = io.BytesIO()
+    # Tarih vb. üst veri yazılmaz; aynı girdi aynı baytları üretir
+    metadata = {"Date": None} if secenekler["bicim"] == "svg" else {"Software": None}
+    fig.savefig(tampon, format=secenekler["bicim"], metadata=metadata)
+    return tampon.getvalue()
+
+
+# ---------------------------------------------------------------------------
+# Sunucu tarafı: süreç havuzu + önbellek
+# ---------------------------------------------------------------------------
+
+class GrafikCizici:
+    """
+    Grafikleri süreç havuzunda çizer ve sonuçları bayt sınırlı LRU önbellekte tutar. Havuz ilk
+    istekte (spawn bağlamıyla; sunucunun thread'leri varken fork güvenli değildir) kurulur; bir işçi
+    çökerse havuz atılır ve sonraki istekte yeniden kurulur.
+    """
+
+    def __init__(self, isci: int = 2, max_bayt: int = 32 * 1024 * 1024):
+        self.isci = max(1, isci)
+        self.max_bayt = max_bayt
+        self._lock = threading.Lock()
+        self._havuz: Optional[ProcessPoolExecutor] = None
+        self._onbellek: "OrderedDict[str, bytes]" = OrderedDict()
+        self._bayt = 0
+        self._bekleyen: Dict[str, Future] = {}
+        self._istek = 0
+        self._isabet = 0
+        self._ortak = 0
+        self._cizim = 0
+        self._hata = 0
+
+    def _havuz_al(self) -> ProcessPoolExecutor:
+        if self._havuz is None:
+            self._havuz = ProcessPoolExecutor(
+                max_workers=self.isci,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_isci_hazirla,
+            )
+        return self._havuz
+
+    def _sakla(self, anahtar: str, icerik: bytes) -> None:
+        if len(icerik) > self.max_bayt:
+            return
+        self._onbellek[anahtar] = icerik
+        self._bayt += len(icerik)
+        while self._bayt > self.max_bayt:
+            _, eski = self._onbellek.popitem(last=False)
+            self._bayt -= len(eski)
+
+    def _bitti(self, anahtar: str, future: Future) -> None:
+        with self._lock:
+            self._bekleyen.pop(anahtar, None)
+            if future.cancelled() or future.exception() is not None:
+                self._hata += 1
+                if isinstance(future.exception(), BrokenProcessPool) and self._havuz is not None:
+                    self._havuz.shutdown(wait=False, cancel_futures=True)
+                    self._havuz = None
+                return
+            self._cizim += 1
+            self._sakla(anahtar, future.result())
+
+    def ciz(self, tur: str, ozet: Dict[str, Any], bicim: str = "png",
+            genislik: int = VARSAYILAN_GENISLIK, yukseklik: int = VARSAYILAN_YUKSEKLIK) -> Tuple[str, Future]:
+        """
+        (anahtar, Future[bytes]) döndürür. Önbellekteyse Future hazırdır; aynı anahtar için süren bir
+        çizim varsa onun Future'ı paylaşılır.
+        """
+        if tur not in GRAFIK_TURLERI:
+            raise ValueError(f"kind {', '.join(GRAFIK_TURLERI)} olmalı")
+        if bicim not in BICIMLER:
+            raise ValueError(f"format {', '.join(BICIMLER)} olmalı")
+        veri = cizim_verisi(tur, ozet)
+        secenekler = {"bicim": bicim, "genislik": int(genislik), "yukseklik": int(yukseklik)}
+        anahtar = grafik_anahtari(tur, veri, secenekler)
+        with self._lock:
+            self._istek += 1
+            icerik = self._onbellek.get(anahtar)
+            if icerik is not None:
+                self._onbellek.move_to_end(anahtar)
+                self._isabet += 1
+                hazir: Future = Future()
+                hazir.set_result(icerik)
+                return anahtar, hazir
+            future = self._bekleyen.get(anahtar)
+            if future is not None:
+                self._ortak += 1
+                return anahtar, future
+            try:
+                future = self._havuz_al().submit(grafik_ciz, tur, veri, secenekler)
+            except BrokenProcessPool:
+                self._havuz = None
+                future = self._havuz_al().submit(grafik_ciz, tur, veri, secenekler)
+            self._bekleyen[anahtar] = future
+        future.add_done_callback(lambda f: self._bitti(anahtar, f))
+        return anahtar, future
+
+    async def ciz_async(self, tur: str, ozet: Dict[str, Any], bicim: str = "png",
+                        genislik: int = VARSAYILAN_GENISLIK, yukseklik: int = VARSAYILAN_YUKSEKLIK) -> Tuple[str, bytes]:
+        anahtar, future = self.ciz(tur, ozet, bicim, genislik, yukseklik)
+        return anahtar, await asyncio.wrap_future(future)
+
+    def kapat(self) -> None:
+        with self._lock:
+            havuz, self._havuz = self._havuz, None
+        if havuz is not None:
+            havuz.shutdown(wait=True, cancel_futures=True)
+
+    def istatistik(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "isci": self.isci,
+                "havuz_acik": self._havuz is not None,
+                "istek": self._istek,
+                "isabet": self._isabet,
+                "ortak": self._ortak,
+                "cizim": self._cizim,
+                "hata": self._hata,
+                "kayit": len(self._onbellek),
+                "bayt": self._bayt,
+                "max_bayt": self.max_bayt,
+                "bekleyen": len(self._bekleyen),
+            }
+
+
+_cizici: Optional[GrafikCizici] = None
+_cizici_lock = threading.Lock()
+
+
+def get_grafik_cizici() -> GrafikCizici:
+    """Süreç genelinde tek grafik çizici (Singleton). CHART_WORKERS, CHART_CACHE_MB ortam değişkenleri."""
+    global _cizici
+    if _cizici is None:
+        with _cizici_lock:
+            if _cizici is None:
+                isci = int(os.getenv("CHART_WORKERS", str(min(2, os.cpu_count() or 1))))
+                max_mb = float(os.getenv("CHART_CACHE_MB", "32"))
+                _cizici = GrafikCizici(isci=isci, max_bayt=int(max_mb * 1024 * 1024))
+    return _cizici
@@ -0,0 +1,247 @@
+"""
+ButceYonetici.islemler için kompakt işlem deposu.
+
+İşlemler satır başına bir Gelir/Gider nesnesi (ve her birinin __dict__'i) yerine paralel tipli
+dizilerde tutulur: tutar ve zaman ``array('d')``/``array('q')``, tip ve bayraklar ``array('b')``,
+kategori/kaynak, kullanıcı ve açıklama ise tekilleştirilmiş (intern) metin tablosuna ``array('i')`` kodlarıyla.
+Belge ID'sinden satıra sözlük indeksi tutulur; silme O(1) mezar taşıdır (satır boşaltılır) ve
+boş satırlar belli bir orana ulaşınca depo sıkıştırılır.
+
+Depo liste gibi ``len()`` ve ``for`` ile kullanılabilir; yineleme sırasında Gelir/Gider nesneleri
+anlık üretilir. Henüz kaydedilmemiş (ID'si olmayan) işlemler ayrı bir bekleme listesinde nesne
+olarak durur; ``kaydedildi()`` ile dizilere taşınır.
+"""
+from array import array
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+_EPOCH = datetime(1970, 1, 1)
+
+# Bayrak bitleri
+_GELIR = 1
+_ISARETLI = 2  # Gelir.duzenliMi / Gider.zorunluMu
+_UTC = 4  # zaman dilimi bilgili tarih (UTC'ye çevrilerek saklanır)
+
+
+class IslemDeposu:
+    # Mezar taşı oranı bunu aşınca (ve en az SIKISTIRMA_ALT_SINIRI boş satır varsa) sıkıştırılır
+    SIKISTIRMA_ORANI = 0.25
+    SIKISTIRMA_ALT_SINIRI = 1024
+
+    def __init__(self, islemler: Iterable[Any] = ()):
+        self.temizle()
+        for islem in islemler:
+            self.ekle(islem)
+
+    def temizle(self) -> None:
+        self._idler: List[Optional[str]] = []
+        self._tutar = array("d")
+        self._zaman = array("q")  # epoch'tan beri mikrosaniye
+        self._bayrak = array("b")
+        self._etiket = array("i")  # Gider: kategori, Gelir: kaynak; -1 = None
+        self._kullanici = array("i")
+        self._aciklama = array("i")  # açıklamalar çoğunlukla tekrar eder ("Market", "Maaş", ...)
+        self._metinler: List[Optional[str]] = []
+        self._metin_kodu: Dict[Optional[str], int] = {}
+        self._satir: Dict[str, int] = {}
+        self._bekleyen: List[Any] = []
+        self._silinen = 0
+
+    # --- Kodlama ---
+    def _kod(self, metin: Optional[str]) -> int:
+        if metin is None:
+            return -1
+        kod = self._metin_kodu.get(metin)
+        if kod is None:
+            kod = self._metin_kodu[metin] = len(self._metinler)
+            self._metinler.append(metin)
+        return kod
+
+    def _metin(self, kod: int) -> Optional[str]:
+        return None if kod < 0 else self._metinler[kod]
+
+    @staticmethod
+    def _zaman_kodla(tarih: datetime) -> Tuple[int, int]:
+        bayrak = 0
+        if tarih.tzinfo is not None:
+            tarih = tarih.astimezone(timezone.utc).replace(tzinfo=None)
+            bayrak = _UTC
+        return (tarih - _EPOCH) // timedelta(microseconds=1), bayrak
+
+    def _tarih(self, satir: int) -> datetime:
+        tarih = _EPOCH + timedelta(microseconds=self._zaman[satir])
+        return tarih.replace(tzinfo=timezone.utc) if self._bayrak[satir] & _UTC else tarih
+
+    # --- Yazma ---
+    def ekle(self, islem: Any) -> bool:
+        """
+        İşlemi ekler. ID'si yoksa kaydedilene kadar bekleme listesinde tutulur; ID zaten varsa yok sayılır.
+        Dönüş: kayıtlı satırlara eklendiyse True (bekleme listesi ve tekrarlar için False).
+        """
+        transaction_id = getattr(islem, "id", None)
+        if not transaction_id:
+            self._bekleyen.append(islem)
+            return False
+        if transaction_id in self._satir:
+            return False
+        from backend.sistem_modelleri import Gelir
+
+        gelir = isinstance(islem, Gelir)
+        zaman, bayrak = self._zaman_kodla(islem.tarih)
+        if gelir:
+            bayrak |= _GELIR
+        if getattr(islem, "duzenliMi" if gelir else "zorunluMu", False):
+            bayrak |= _ISARETLI
+        self._satir[transaction_id] = len(self._idler)
+        self._idler.append(transaction_id)
+        self._tutar.append(float(islem.tutar))
+        self._zaman.append(zaman)
+        self._bayrak.append(bayrak)
+        self._etiket.append(self._kod(getattr(islem, "kaynak" if gelir else "kategori", None)))
+        self._kullanici.append(self._kod(islem.user_email))
+        self._aciklama.append(self._kod(islem.aciklama))
+        return True
+
+    def kaydedildi(self, islemler: Iterable[Any]) -> List[Any]:
+        """
+        ID'si atanmış bekleyen işlemleri dizilere taşır. Dönüş: kayıtlı satırlara yeni eklenenler
+        (aynı ID başka yoldan, ör. senkronizasyonla, zaten eklendiyse o işlem dönmez).
+        """
+        tasinan = {id(i) for i in islemler if getattr(i, "id", None)}
+        if not tasinan:
+            return []
+        kalan, eklenen = [], []
+        for islem in self._bekleyen:
+            if id(islem) in tasinan:
+                if self.ekle(islem):
+                    eklenen.append(islem)
+            else:
+                kalan.append(islem)
+        self._bekleyen = kalan
+        return eklenen
+
+    def sil(self, transaction_id: str) -> Optional[Any]:
+        """Satırı mezar taşıyla işaretler (O(1)) ve silinen işlemi döndürür; yoksa None."""
+        satir = self._satir.pop(transaction_id, None)
+        if satir is None:
+            return None
+        islem = self._nesne(satir)
+        self._idler[satir] = None
+        self._silinen += 1
+        if self._silinen >= self.SIKISTIRMA_ALT_SINIRI and self._silinen > self.SIKISTIRMA_ORANI * len(self._idler):
+            self.sikistir()
+        return islem
+
+    def sikistir(self) -> None:
+        """Mezar taşlı satırları dizilerden çıkarır ve indeksi yeniden kurar."""
+        canli = [i for i, transaction_id in enumerate(self._idler) if transaction_id is not None]
+        self._idler = [self._idler[i] for i in canli]
+        self._tutar = array("d", (self._tutar[i] for i in canli))
+        self._zaman = array("q", (self._zaman[i] for i in canli))
+        self._bayrak = array("b", (self._bayrak[i] for i in canli))
+        self._etiket = array("i", (self._etiket[i] for i in canli))
+        self._kullanici = array("i", (self._kullanici[i] for i in canli))
+        self._aciklama = array("i", (self._aciklama[i] for i in canli))
+        self._satir = {transaction_id: i for i, transaction_id in enumerate(self._idler)}
+        self._silinen = 0
+
+    # --- Okuma ---
+    def _nesne(self, satir: int) -> Any:
+        from backend.sistem_modelleri import Gelir, Gider
+
+        bayrak = self._bayrak[satir]
+        ortak = dict(
+            tutar=self._tutar[satir],
+            aciklama=self._metin(self._aciklama[satir]),
+            tarih_str=self._tarih(satir),
+            user_email=self._metin(self._kullanici[satir]),
+            id=self._idler[satir],
+        )
+        if bayrak & _GELIR:
+            return Gelir(kaynak=self._metin(self._etiket[satir]), duzenliMi=bool(bayrak & _ISARETLI), **ortak)
+        return Gider(kategori=self._metin(self._etiket[satir]), zorunluMu=bool(bayrak & _ISARETLI), **ortak)
+
+    def kayitlar(self) -> List[Dict[str, Any]]:
+        """
+        Tüm işlemler için Islem.to_dict ile aynı sözlükler. Nesne üretmeden sütunlardan kurulur:
+        vergi tek NumPy geçişinde (backend.vergi), taksit bayrağı kategori kodu başına bir kez hesaplanır.
+        """
+        import numpy as np
+        from backend.kategori import TAKSIT_ALT_TUTARI, taksitli_kategori_mi
+        from backend.vergi import vergi_hesapla
+
+        satirlar = np.fromiter((i for i, t in enumerate(self._idler) if t is not None), dtype=np.int64)
+        tutar = np.frombuffer(self._tutar, dtype=np.float64)[satirlar] if len(self._tutar) else np.zeros(0)
+        bayrak = np.frombuffer(self._bayrak, dtype=np.int8)[satirlar] if len(self._bayrak) else np.zeros(0, np.int8)
+        etiket = np.frombuffer(self._etiket, dtype=np.int32)[satirlar] if len(self._etiket) else np.zeros(0, np.int32)
+        zaman = np.frombuffer(self._zaman, dtype=np.int64)[satirlar] if len(self._zaman) else np.zeros(0, np.int64)
+
+        gelir = (bayrak & _GELIR) != 0
+        isaretli = (bayrak & _ISARETLI) != 0
+        vergi = np.zeros_like(tutar)
+        vergi[gelir] = vergi_hesapla(tutar[gelir], isaretli[gelir])
+        # -1 (kategori yok) son elemana düşer: False
+        taksitli_kod = np.array([taksitli_kategori_mi(m) for m in self._metinler] + [False], dtype=bool)
+        taksit = (tutar >= TAKSIT_ALT_TUTARI) & taksitli_kod[etiket]
+
+        # isoformat ile aynı metin: mikrosaniye yalnızca sıfırdan farklıysa, UTC ise +00:00
+        an = zaman.astype("datetime64[us]")
+        tarihler = np.datetime_as_string(an, unit="s").astype(object)
+        kesirli = (zaman % 1_000_000) != 0
+        if kesirli.any():
+            tarihler[kesirli] = np.datetime_as_string(an[kesirli], unit="us")
+        utc = (bayrak & _UTC) != 0
+        if utc.any():
+            tarihler[utc] = tarihler[utc] + "+00:00"
+
+        metin = self._metin
+        kayitlar: List[Dict[str, Any]] = []
+        ekle = kayitlar.append
+        for j, satir in enumerate(satirlar.tolist()):
+            kayit = {
+                "id": self._idler[satir],
+                "tutar": float(tutar[j]),
+                "aciklama": metin(self._aciklama[satir]),
+                "tarih": tarihler[j],
+                "user_email": metin(self._kullanici[satir]),
+            }
+            if gelir[j]:
+                kayit["islem_tipi"] = "Gelir"
+                kayit["kaynak"] = metin(int(etiket[j]))
+                kayit["duzenliMi"] = bool(isaretli[j])
+                kayit["tahmini_vergi"] = float(vergi[j])
+            else:
+                kayit["islem_tipi"] = "Gider"
+                kayit["kategori"] = metin(int(etiket[j]))
+                kayit["zorunluMu"] = bool(isaretli[j])
+                kayit["taksitVarMi"] = bool(taksit[j])
+            ekle(kayit)
+        return kayitlar + [i.to_dict() for i in self._bekleyen]
+
+    def net_toplam(self) -> float:
+        """Kayıtlı işlemlerin gelir - gider toplamı (bekleyenler hariç); bakiye mutabakatı için."""
+        import numpy as np
+
+        if not self._idler:
+            return 0.0
+        tutar = np.frombuffer(self._tutar, dtype=np.float64)
+        bayrak = np.frombuffer(self._bayrak, dtype=np.int8)
+        canli = np.fromiter((t is not None for t in self._idler), dtype=bool, count=len(self._idler))
+        isaret = np.where((bayrak & _GELIR) != 0, 1.0, -1.0)
+        return float(np.sum(tutar * isaret, where=canli))
+
+    def bekleyenler(self) -> List[Any]:
+        """Henüz kaydedilmemiş (ID'si olmayan) işlemler."""
+        return list(self._bekleyen)
+
+    def __contains__(self, transaction_id: object) -> bool:
+        return transaction_id in self._satir
+
+    def __len__(self) -> int:
+        return len(self._satir) + len(self._bekleyen)
+
+    def __iter__(self) -> Iterator[Any]:
+        for satir, transaction_id in enumerate(self._idler):
+            if transaction_id is not None:
+                yield self._nesne(satir)
+        yield from list(self._bekleyen)
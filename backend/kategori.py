@@ -0,0 +1,193 @@
+"""
+Gider kategorileri için tekilleştirilmiş (intern) kategori tablosu.
+
+Kategoriler yazım anında bir kez kanonikleştirilir; belgeler kanonik adı (Kategori) ve kompakt
+tamsayı kimliği (Kategori_Id) birlikte taşır. Analizler metin yerine bu kimliklerle gruplar.
+
+- Türkçe harf kuralları: "I" -> "ı", "İ" -> "i" (ve tersi); anahtar boşlukları sadeleştirilmiş küçük
+  harf metindir, görünen ad her kelimenin ilk harfi büyük yazılmış halidir ("istanbul" -> "İstanbul")
+- Kimlik, anahtarın CRC32'sidir (31 bit). Tablodan bağımsız hesaplandığı için süreçler ve depolama
+  arka uçları arasında aynıdır; ayrıca saklanan bir sayaç/tablo gerekmez. İki farklı anahtar aynı
+  CRC'ye düşerse sonra gelen, sıradaki boş kimliği alır (kimlik+1, +2, ...); farklı anahtarlar hiçbir
+  zaman aynı kimliği paylaşmaz. Kaydırılmış kimlik ilk gören sürecin sırasına bağlıdır, ama belgede ve
+  dönem özetinde kanonik adla birlikte saklandığından okuyan süreç ogren() ile aynı kimliği kaydeder
+- Kimlik tablosu sınırsızdır: farklı kanonik kategori sayısı kadar büyür (kategori başına tek kayıt;
+  tipik olarak yüzlerce). Kimlikler belgelerde saklı olduğundan tablodan atılamaz; sınırlı olan
+  ham metin önbelleğidir (MAX_HAM_METIN)
+- Taksit bayrağı (Gider.taksitVarMi kuralı) kategori başına bir kez hesaplanır
+- Ham metin -> kategori eşlemesi önbellekte tutulur; aynı metin ikinci kez işlenmez
+"""
+import threading
+import zlib
+from typing import Any, Dict, Iterable, List, Mapping, Optional
+
+import numpy as np
+import pandas as pd
+
+BILINMIYOR = "Bilinmiyor"
+MAX_HAM_METIN = 100_000  # ham metin önbelleği sınırı (aşılınca boşaltılır; kimlikler kalır)
+TAKSIT_ALT_TUTARI = 1000
+# Taksitli sayılan kategori anahtar kelimeleri (Türkçe küçük harf; "KREDI" -> "kredı" de yakalanır)
+TAKSIT_KATEGORILERI = ("fatura", "kredi", "kredı", "taksit", "ödeme")
+
+_KUCUK_TR = str.maketrans({"I": "ı", "İ": "i"})
+_BUYUK_TR = str.maketrans({"i": "İ", "ı": "I"})
+
+
+def tr_kucuk(metin: str) -> str:
+    return metin.translate(_KUCUK_TR).lower()
+
+
+def tr_buyuk(metin: str) -> str:
+    return metin.translate(_BUYUK_TR).upper()
+
+
+def tr_baslik(metin: str) -> str:
+    """str.title'ın Türkçe karşılığı: harf olmayan karakterden sonra gelen harf büyük, diğerleri küçük."""
+    parcalar = []
+    onceki_harf = False
+    for c in metin:
+        parcalar.append(tr_kucuk(c) if onceki_harf else tr_buyuk(c))
+        onceki_harf = c.isalpha()
+    return "".join(parcalar)
+
+
+class Kategori:
+    __slots__ = ("id", "ad", "anahtar", "taksitli")
+
+    def __init__(self, id: int, ad: str, anahtar: str, taksitli: bool):
+        self.id = id
+        self.ad = ad
+        self.anahtar = anahtar
+        self.taksitli = taksitli
+
+    def __repr__(self) -> str:
+        return f"Kategori({self.id}, {self.ad!r})"
+
+
+def _anahtar(ham: Any) -> str:
+    return tr_kucuk(" ".join(str(ham).split())) if ham is not None else ""
+
+
+class KategoriTablosu:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._ham: Dict[Any, Kategori] = {}
+        self._kimlikler: Dict[int, Kategori] = {}
+        self._anahtarlar: Dict[str, Kategori] = {}
+        self.cakisma = 0
+
+    def _olustur(self, anahtar: str, istenen: Optional[int] = None) -> Kategori:
+        """
+        Anahtarın kategorisi; yoksa oluşturur. Kimlik istenen (boşsa) ya da CRC'dir; doluysa sıradaki boş kimlik.
+        """
+        anahtar = anahtar or _anahtar(BILINMIYOR)
+        kimlik = zlib.crc32(anahtar.encode("utf-8")) & 0x7FFFFFFF
+        with self._lock:
+            kategori = self._anahtarlar.get(anahtar)
+            if kategori is not None:
+                return kategori
+            if istenen is not None and istenen not in self._kimlikler:
+                kimlik = istenen
+            elif kimlik in self._kimlikler:
+                self.cakisma += 1
+                print(f"⚠️ Kategori kimliği çakışması: {self._kimlikler[kimlik].anahtar!r} ve {anahtar!r} ({kimlik})")
+                while kimlik in self._kimlikler:
+                    kimlik = (kimlik + 1) & 0x7FFFFFFF
+            kategori = Kategori(kimlik, tr_baslik(anahtar), anahtar, any(k in anahtar for k in TAKSIT_KATEGORILERI))
+            self._kimlikler[kimlik] = kategori
+            self._anahtarlar[anahtar] = kategori
+            return kategori
+
+    def cozumle(self, ham: Optional[str]) -> Kategori:
+        """Ham kategori metnini kanonik kategoriye çevirir; boş/None -> Bilinmiyor."""
+        kategori = self._ham.get(ham)
+        if kategori is None:
+            kategori = self._olustur(_anahtar(ham))
+            with self._lock:
+                if len(self._ham) >= MAX_HAM_METIN:
+                    self._ham.clear()
+                self._ham[ham] = kategori
+        return kategori
+
+    def ogren(self, kimlik: Any, ad: Optional[str]) -> Kategori:
+        """
+        Başka süreçte yazılmış (belgede / dönem özetinde saklı) kimliği kanonik adıyla kaydeder. Ad bu
+        tabloda henüz yoksa kimlik aynen kullanılır; çakışma nedeniyle kaydırılmış kimlikler de korunur.
+        """
+        return self._olustur(_anahtar(ad), int(kimlik))
+
+    def gider_kategorisi(self, kategori: Optional[str], aciklama: Optional[str] = None) -> Kategori:
+        """Gider kuralı: kategori boşsa açıklama kategori olarak kullanılır."""
+        return self.cozumle(kategori if kategori and str(kategori).strip() else (aciklama or None))
+
+    def belge_kategorisi(self, data: Mapping[str, Any]) -> Kategori:
+        """Belgenin kategorisi: Kategori_Id biliniyorsa doğrudan, değilse (eski belgeler) alanlardan türetilir."""
+        kimlik = data.get("Kategori_Id")
+        ham = data.get("Kategori") or data.get("kategori")
+        if kimlik is not None:
+            kategori = self._kimlikler.get(kimlik)
+            if kategori is not None:
+                return kategori
+            if ham:
+                return self.ogren(kimlik, ham)
+        if data.get("Islem_Tipi") == "Gider":
+            return self.gider_kategorisi(ham, data.get("Aciklama"))
+        return self.cozumle(ham)
+
+    def kimlikler(self, hamlar: Iterable[Any]) -> np.ndarray:
+        """Ham metin dizisini kimlik dizisine çevirir; her farklı metin bir kez çözülür."""
+        hamlar = list(hamlar)
+        if not hamlar:
+            return np.empty(0, dtype=np.int64)
+        # None -> -1 kodu; son eleman (Bilinmiyor) seçilir
+        kodlar, tekiller = pd.factorize(pd.Series(hamlar, dtype=object))
+        tekil_kimlik = np.array([self.cozumle(h).id for h in tekiller] + [self.cozumle(None).id], dtype=np.int64)
+        return tekil_kimlik[kodlar]
+
+    def belge_kimlikleri(self, kimlikler: List[Any], hamlar: List[Any]) -> np.ndarray:
+        """
+        Belgelerin kategori kimlikleri: Kategori_Id varsa o, yoksa (eski belgeler) ham metinden.
+        Başka süreçte yazılmış ve bu tabloda henüz olmayan kimlikler belgedeki kanonik addan öğrenilir.
+        """
+        kimlik = pd.to_numeric(pd.Series(kimlikler, dtype=object), errors="coerce")
+        eksik = kimlik.isna().to_numpy()
+        sonuc = np.empty(len(kimlik), dtype=np.int64)
+        sonuc[~eksik] = kimlik[~eksik].to_numpy(dtype=np.int64)
+        if eksik.any():
+            sonuc[eksik] = self.kimlikler(np.asarray(hamlar, dtype=object)[eksik])
+        tekiller, ilk_satir = np.unique(sonuc, return_index=True)
+        for k, satir in zip(tekiller.tolist(), ilk_satir.tolist()):
+            if k not in self._kimlikler:
+                self.ogren(k, hamlar[satir])
+        return sonuc
+
+    def ad(self, kimlik: int) -> str:
+        kategori = self._kimlikler.get(int(kimlik))
+        return kategori.ad if kategori is not None else BILINMIYOR
+
+    def adlar(self, kimlikler: Iterable[int]) -> List[str]:
+        return [self.ad(k) for k in kimlikler]
+
+    def istatistik(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"kategori_sayisi": len(self._kimlikler), "ham_metin": len(self._ham), "cakisma": self.cakisma}
+
+
+_tablo_lock = threading.Lock()
+_tablo: Optional[KategoriTablosu] = None
+
+
+def get_kategori_tablosu() -> KategoriTablosu:
+    """Süreç genelinde tek kategori tablosu (Singleton)."""
+    global _tablo
+    if _tablo is None:
+        with _tablo_lock:
+            if _tablo is None:
+                _tablo = KategoriTablosu()
+    return _tablo
+
+
+def taksitli_kategori_mi(kategori: Optional[str]) -> bool:
+    """Kategori taksitli türden mi (Gider.taksitVarMi kuralı); tablodan önceden hesaplanmış bayrak."""
+    return get_kategori_tablosu().cozumle(kategori).taksitli
@@ -1,16 +1,55 @@
-from fastapi import FastAPI
-from fastapi.responses import JSONResponse
+import base64
+import json
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta
+
+from fastapi import FastAPI, Header, Query
+from fastapi.responses import Response, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 from typing import Optional, List, Any, Dict
 
-# Import Firestore client singleton
-from backend.firebase_config import get_db
-from backend.sistem_modelleri import ButceYonetici, TransactionFactory
-from backend.grafik_analiz import get_analysis_summary
-from backend.ai_service import run_ai_on_current_data, generate_finance_chat_reply
+# Import storage backend singleton (Firestore / SQLite / memory)
+from backend.storage import get_async_repository, get_repository
+from backend.sistem_modelleri import ButceYonetici, RaporFactory, TransactionFactory
+from backend.grafik_analiz import KOVALAR, MAX_NOKTA, MIN_NOKTA, VARSAYILAN_NOKTA, get_analysis_summary_async, grafik_ozeti
+from backend.analiz_motoru import get_analiz_motoru
+from backend.ai_service import run_ai_on_current_data_async, generate_finance_chat_reply_async
+from backend.concurrency import get_limiter, limiter_stats
+from backend.ozet_onbellegi import get_ozet_onbellegi
+from backend.bildirim import get_bildirim_dagitici
+from backend.serializer import FastJSONResponse, dumps
+from backend.vergi import MODLAR, VERGI_TARIFELERI, yillik_projeksiyon
+from backend.yazim_gunlugu import get_yazim_gunlugu
+from backend.tahmin import get_tahmin_motoru
+from backend.kategori import get_kategori_tablosu
+from backend.donem_ozetleri import get_rollup_derleyici
+from backend.anlik_goruntu import get_anlik_goruntu
+from backend.anomali import get_anomali_dedektoru
+from backend.grafik_cizici import (
+    BICIMLER, GRAFIK_TURLERI, MAX_PIKSEL, MIN_PIKSEL, VARSAYILAN_GENISLIK, VARSAYILAN_YUKSEKLIK, get_grafik_cizici,
+)
+
+
+@asynccontextmanager
+async def lifespan(_app: FastAPI):
+    # Yazım-arkası modunda WAL açılışta okunur; önceki süreçten kalan yazılmamış işlemler yeniden sıraya alınır
+    gunluk = await get_limiter("storage").run(get_yazim_gunlugu)
+    # Dönem özetlerinin periyodik derlemesi (özetler hazır değilse ilk derleme hemen başlar)
+    derleyici = get_rollup_derleyici()
+    derleyici.baslat()
+    # Kategori bazlı harcama istatistikleri geçmişten arka planda yüklenir
+    dedektor = get_anomali_dedektoru()
+    if dedektor is not None:
+        dedektor.baslat()
+    yield
+    derleyici.durdur()
+    get_grafik_cizici().kapat()
+    if gunluk is not None:
+        await get_limiter("storage").run(gunluk.bosalt, 30.0)
+
 
-app = FastAPI(title="CebimdekiVeri API", version="0.1.0")
+app = FastAPI(title="CebimdekiVeri API", version="0.1.0", default_response_class=FastJSONResponse, lifespan=lifespan)
 
 # CORS for React dev server
 app.add_middleware(
@@ -53,18 +92,33 @@ class ChatIn(BaseModel):
 
 
 @app.get("/health")
-def health_check():
-    """Simple health check that verifies Firebase Firestore connectivity."""
+async def health_check():
+    """Simple health check that verifies storage (Firestore by default) connectivity."""
     try:
-        db = get_db()
+        repo = get_async_repository()
         # Attempt a lightweight operation to ensure connectivity
-        # Listing collections (may be empty) is sufficient for a ping-like check
-        _ = list(db.collections())
-        return JSONResponse({"status": "ok", "firebase": True})
+        await repo.ping()
+        gunluk = get_yazim_gunlugu()
+        rollups_hazir = await get_limiter("storage").run(get_repository().rollups_hazir)
+        goruntu = get_anlik_goruntu()
+        dedektor = get_anomali_dedektoru()
+        return FastJSONResponse({
+            "status": "ok",
+            "firebase": repo.name == "firestore",
+            "storage": repo.name,
+            "concurrency": limiter_stats(),
+            "notifications": get_bildirim_dagitici().istatistik(),
+            "write_behind": gunluk.istatistik() if gunluk is not None else None,
+            "forecast_cache": get_tahmin_motoru().istatistik(),
+            "rollups": {"hazir": rollups_hazir, **get_rollup_derleyici().istatistik()},
+            "snapshots": goruntu.istatistik() if goruntu is not None else None,
+            "charts": get_grafik_cizici().istatistik(),
+            "anomalies": dedektor.istatistik() if dedektor is not None else None,
+        })
     except Exception as e:
         error_msg = str(e).lower()
         error_type = "network" if ("network" in error_msg or "connection" in error_msg or "timeout" in error_msg) else "other"
-        return JSONResponse({
+        return FastJSONResponse({
             "status": "error",
             "firebase": False,
             "error_type": error_type,
@@ -74,102 +128,388 @@ def health_check():
 
 
 @app.post("/transactions")
-def create_transaction(payload: TransactionIn):
+async def create_transaction(payload: TransactionIn):
     try:
         trx = TransactionFactory.create(payload.dict())
-        yonetici = ButceYonetici()
-        limit_info = yonetici.islem_ekle(trx)
-        return JSONResponse({"status": "ok", "limit": limit_info})
+        yonetici = ButceYonetici(trx.user_email)
+        limit_info = await get_limiter("storage").run(yonetici.islem_ekle, trx)
+        return FastJSONResponse({"status": "ok", "limit": limit_info})
+    except Exception as e:
+        return FastJSONResponse({"status": "error", "detail": str(e)}, status_code=400)
+
+
+class BulkTransactionsIn(BaseModel):
+    items: List[TransactionIn]
+
+
+@app.post("/transactions/bulk")
+async def create_transactions_bulk(payload: BulkTransactionsIn):
+    """
+    Çok sayıda işlemi toplu (batch) yazımla ekler; işlemler kullanıcıya göre gruplanır ve her
+    kullanıcının yöneticisinde limit kontrolü en sonda bir kez yapılır.
+    """
+    try:
+        gruplar: Dict[Optional[str], List[Any]] = {}
+        for item in payload.items:
+            trx = TransactionFactory.create(item.dict())
+            gruplar.setdefault(trx.user_email, []).append(trx)
+        eklenen = 0
+        ids: List[str] = []
+        limitler: Dict[str, Any] = {}
+        for user_email, islemler in gruplar.items():
+            sonuc = await get_limiter("storage").run(ButceYonetici(user_email).toplu_islem_ekle, islemler)
+            eklenen += sonuc["eklenen"]
+            ids.extend(sonuc["ids"])
+            limitler[user_email or ""] = sonuc["limit"]
+        # Tek kullanıcılı partilerde yanıt biçimi önceki ile aynı kalır
+        limit = next(iter(limitler.values())) if len(limitler) == 1 else limitler
+        return FastJSONResponse({"status": "ok", "eklenen": eklenen, "ids": ids, "limit": limit})
     except Exception as e:
-        return JSONResponse({"status": "error", "detail": str(e)}, status_code=400)
+        return FastJSONResponse({"status": "error", "detail": str(e)}, status_code=400)
+
+
+TRANSACTIONS_PAGE_SIZE = 500
+TRANSACTIONS_MAX_PAGE_SIZE = 5000
+
+
+def _iso(t: Any) -> Optional[str]:
+    """Firestore Timestamp/datetime değerini ISO metnine çevirir."""
+    if isinstance(t, datetime):
+        return t.isoformat()
+    return t if isinstance(t, str) else None
+
+
+def _parse_date_param(value: Optional[str], end: bool = False) -> Optional[datetime]:
+    """YYYY-MM-DD veya ISO tarih parametresi. Yalnızca gün verilen 'to' değeri o günü de kapsar."""
+    if not value:
+        return None
+    parsed = datetime.fromisoformat(value)
+    if end and len(value) == 10:
+        parsed += timedelta(days=1)
+    return parsed
+
+
+def _encode_cursor(tarih: Any, doc_id: str) -> str:
+    raw = json.dumps([_iso(tarih), doc_id]).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii")
+
+
+def _decode_cursor(cursor: Optional[str]):
+    if not cursor:
+        return None
+    try:
+        tarih, doc_id = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        return datetime.fromisoformat(tarih), doc_id
+    except Exception:
+        raise ValueError("Geçersiz cursor")
 
 
 @app.get("/transactions")
-def list_transactions():
+async def list_transactions(
+    user_email: Optional[str] = None,
+    date_from: Optional[str] = Query(None, alias="from"),
+    date_to: Optional[str] = Query(None, alias="to"),
+    islem_tipi: Optional[str] = None,
+    kategori: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, le=TRANSACTIONS_MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    format: str = "json",
+):
+    """
+    İşlemleri (Tarih, id) sırasıyla listeler.
+    - json (varsayılan): en fazla `limit` (varsayılan 500) kayıt ve sonraki sayfa için `next_cursor`
+    - ndjson: eşleşen tüm kayıtları satır satır akıtır (limit verilirse o kadar); sunucu belleği sabit kalır
+    """
+    try:
+        filtreler = dict(
+            start=_parse_date_param(date_from),
+            end=_parse_date_param(date_to, end=True),
+            user_email=user_email,
+            islem_tipi=islem_tipi,
+            # Kategoriler kanonik adla saklanır ("market" -> "Market")
+            kategori=get_kategori_tablosu().cozumle(kategori).ad if kategori else None,
+            after=_decode_cursor(cursor),
+        )
+    except ValueError as e:
+        return FastJSONResponse({"status": "error", "detail": str(e)}, status_code=400)
+
     try:
-        db = get_db()
-        docs = db.collection("transactions").order_by("Tarih").stream()
+        repo = get_async_repository()
+        if format == "ndjson":
+            docs = repo.query_range(limit=limit, **filtreler)
+
+            async def satirlar():
+                async for doc_id, data in docs:
+                    data["Tarih"] = _iso(data.get("Tarih"))
+                    yield dumps({"id": doc_id, **data}) + b"\n"
+
+            return StreamingResponse(satirlar(), media_type="application/x-ndjson")
+
+        sayfa = limit or TRANSACTIONS_PAGE_SIZE
         items: List[Dict[str, Any]] = []
-        for d in docs:
-            data = d.to_dict() or {}
-            t = data.get("Tarih")
-            # Convert Firestore Timestamp/datetime to iso string
-            try:
-                data["Tarih"] = t.isoformat()
-            except Exception:
-                try:
-                    # pandas Timestamp or other types
-                    from pandas import to_datetime
-                    data["Tarih"] = to_datetime(t).isoformat()
-                except Exception:
-                    data["Tarih"] = None
-            items.append({"id": d.id, **data})
-        return JSONResponse({"items": items})
-    except Exception as e:
-        return JSONResponse({"status": "error", "detail": str(e)}, status_code=500)
+        son = None
+        async for doc_id, data in repo.query_range(limit=sayfa, **filtreler):
+            son = (data.get("Tarih"), doc_id)
+            data["Tarih"] = _iso(data.get("Tarih"))
+            items.append({"id": doc_id, **data})
+        next_cursor = _encode_cursor(*son) if son is not None and len(items) == sayfa else None
+        return FastJSONResponse({"items": items, "next_cursor": next_cursor})
+    except Exception as e:
+        return FastJSONResponse({"status": "error", "detail": str(e)}, status_code=500)
 
 
 @app.get("/dashboard-data")
-def dashboard_data():
+async def dashboard_data(
+    user_email: Optional[str] = None,
+    date_from: Optional[str] = Query(None, alias="from"),
+    date_to: Optional[str] = Query(None, alias="to"),
+    points: int = Query(VARSAYILAN_NOKTA, ge=MIN_NOKTA, le=MAX_NOKTA),
+    bucket: str = "day",
+):
+    """
+    Panel özeti. gunluk_ozet grafik için bucket (day/week/month) boyutunda toplanır (tarih aralığında
+    doğrudan o seviyenin dönem özetlerinden okunur) ve en fazla points noktaya seyreltilir (min/max);
+    özetin geri kalanı ve tahmin etkilenmez.
+    """
+    if bucket not in KOVALAR:
+        return FastJSONResponse({"status": "error", "detail": f"bucket {', '.join(KOVALAR)} olmalı"}, status_code=400)
     try:
-        summary = get_analysis_summary()
-        return JSONResponse(summary)
+        start, end = _parse_date_param(date_from), _parse_date_param(date_to, end=True)
+    except ValueError as e:
+        return FastJSONResponse({"status": "error", "detail": str(e)}, status_code=400)
+    try:
+        summary = await get_analysis_summary_async(user_email, start, end, kova=bucket)
+        return FastJSONResponse(grafik_ozeti(summary, bucket, points))
     except Exception as e:
-        return JSONResponse({"status": "error", "detail": str(e)}, status_code=500)
+        return FastJSONResponse({"status": "error", "detail": str(e)}, status_code=500)
+
+
+@app.get("/charts/{kind}")
+async def render_chart(
+    kind: str,
+    user_email: Optional[str] = None,
+    date_from: Optional[str] = Query(None, alias="from"),
+    date_to: Optional[str] = Query(None, alias="to"),
+    format: str = "png",
+    width: int = Query(VARSAYILAN_GENISLIK, ge=MIN_PIKSEL, le=MAX_PIKSEL),
+    height: int = Query(VARSAYILAN_YUKSEKLIK, ge=MIN_PIKSEL, le=MAX_PIKSEL),
+    points: int = Query(VARSAYILAN_NOKTA, ge=MIN_NOKTA, le=MAX_NOKTA),
+    bucket: str = "day",
+    if_none_match: Optional[str] = Header(None),
+):
+    """
+    Özet grafiğini sunucuda çizer (kind: categories/monthly/daily, format: png/svg). Çizim ayrı
+    süreçlerde Agg ile yapılır; görüntü grafik verisi + seçeneklerin özetiyle önbelleklenir ve bu
+    özet ETag olarak döner (If-None-Match eşleşirse 304). daily grafiği bucket/points ile
+    /dashboard-data ile aynı şekilde seyreltilir.
+    """
+    if kind not in GRAFIK_TURLERI:
+        return FastJSONResponse({"status": "error", "detail": f"kind {', '.join(GRAFIK_TURLERI)} olmalı"}, status_code=400)
+    if format not in BICIMLER:
+        return FastJSONResponse({"status": "error", "detail": f"format {', '.join(BICIMLER)} olmalı"}, status_code=400)
+    if bucket not in KOVALAR:
+        return FastJSONResponse({"status": "error", "detail": f"bucket {', '.join(KOVALAR)} olmalı"}, status_code=400)
+    try:
+        start, end = _parse_date_param(date_from), _parse_date_param(date_to, end=True)
+    except ValueError as e:
+        return FastJSONResponse({"status": "error", "detail": str(e)}, status_code=400)
+    try:
+        summary = await get_analysis_summary_async(user_email, start, end, kova=bucket)
+        if kind == "daily":
+            summary = grafik_ozeti(summary, bucket, points)
+        anahtar, icerik = await get_grafik_cizici().ciz_async(kind, summary, format, width, height)
+    except Exception as e:
+        return FastJSONResponse({"status": "error", "detail": str(e)}, status_code=500)
+    etag = f'"{anahtar}"'
+    basliklar = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if if_none_match == etag:
+        return Response(status_code=304, headers=basliklar)
+    return Response(content=icerik, media_type=BICIMLER[format], headers=basliklar)
+
+
+@app.get("/reports/{tip}")
+async def export_report(
+    tip: str,
+    user_email: Optional[str] = None,
+    date_from: Optional[str] = Query(None, alias="from"),
+    date_to: Optional[str] = Query(None, alias="to"),
+):
+    """
+    İşlemleri CSV veya XLSX olarak indirir. Belgeler depolamadan parça parça okunur ve dosya
+    akış halinde gönderilir; her parça 'storage' havuzunda üretilir.
+    """
+    rapor = RaporFactory.rapor_uret(tip)
+    if rapor is None:
+        return FastJSONResponse({"status": "error", "detail": "tip csv veya xlsx olmalı"}, status_code=400)
+    try:
+        start, end = _parse_date_param(date_from), _parse_date_param(date_to, end=True)
+    except ValueError as e:
+        return FastJSONResponse({"status": "error", "detail": str(e)}, status_code=400)
+
+    limiter = get_limiter("storage")
+    try:
+        parcalar = rapor.akit(get_repository().query_range(start=start, end=end, user_email=user_email))
+        # İlk parça yanıt başlamadan üretilir; böylece eksik bağımlılık vb. hatalar JSON olarak döner
+        ilk = await limiter.run(next, parcalar, b"")
+    except RuntimeError as e:
+        # Eksik isteğe bağlı bağımlılık (ör. xlsx için openpyxl)
+        return FastJSONResponse({"status": "error", "detail": str(e)}, status_code=501)
+    except Exception as e:
+        return FastJSONResponse({"status": "error", "detail": str(e)}, status_code=500)
+
+    async def govde():
+        parca = ilk
+        while parca:
+            yield parca
+            parca = await limiter.run(next, parcalar, b"")
+
+    ad = "_".join(p for p in ("islemler", user_email, date_from, date_to) if p).replace("@", "_at_")
+    return StreamingResponse(
+        govde(),
+        media_type=rapor.media_type,
+        headers={"Content-Disposition": f'attachment; filename="{ad}.{rapor.uzanti}"'},
+    )
+
+
+@app.get("/tax/projection")
+async def tax_projection(
+    user_email: Optional[str] = None,
+    mod: str = "kumulatif",
+    date_from: Optional[str] = Query(None, alias="from"),
+    date_to: Optional[str] = Query(None, alias="to"),
+):
+    """
+    Kullanıcının gelir geçmişi için yıllık vergi projeksiyonu (backend.vergi, tek NumPy geçişi).
+    mod: duz | kademeli | kumulatif (varsayılan: yıllık kümülatif matrah üzerinden kademeli).
+    """
+    if mod not in MODLAR:
+        return FastJSONResponse({"status": "error", "detail": f"mod {', '.join(MODLAR)} olmalı"}, status_code=400)
+    try:
+        start, end = _parse_date_param(date_from), _parse_date_param(date_to, end=True)
+    except ValueError as e:
+        return FastJSONResponse({"status": "error", "detail": str(e)}, status_code=400)
+    try:
+        def hesapla():
+            belgeler = get_repository().query_range(start=start, end=end, user_email=user_email, islem_tipi="Gelir")
+            return yillik_projeksiyon(belgeler, mod=mod)
+
+        sonuc = await get_limiter("analysis").run(hesapla)
+        return FastJSONResponse({"user_email": user_email, **sonuc})
+    except Exception as e:
+        return FastJSONResponse({"status": "error", "detail": str(e)}, status_code=500)
+
+
+@app.get("/tax/brackets")
+async def tax_brackets():
+    """Yıl bazında sürümlenmiş vergi dilimi tabloları."""
+    return FastJSONResponse({"tarifeler": [t.to_dict() for _, t in sorted(VERGI_TARIFELERI.items())]})
+
+
+@app.get("/summary-cache/stats")
+async def summary_cache_stats():
+    """Özet önbelleğinin hit/miss sayaçları."""
+    return FastJSONResponse(get_ozet_onbellegi().istatistik())
+
+
+@app.get("/analysis-engine/verify")
+async def verify_analysis_engine():
+    """Artımlı analiz motorunun özetini pandas tabanlı tam hesaplama ile karşılaştırır."""
+    try:
+        return FastJSONResponse(await get_limiter("analysis").run(get_analiz_motoru().dogrula))
+    except Exception as e:
+        return FastJSONResponse({"status": "error", "detail": str(e)}, status_code=500)
+
+
+@app.post("/analysis-engine/rebuild")
+async def rebuild_analysis_engine():
+    """Analiz motorunun toplamlarını depolamadan yeniden kurar (tam yeniden kurulum)."""
+    try:
+        await get_limiter("analysis").run(get_analiz_motoru().yeniden_olustur)
+        return FastJSONResponse({"status": "ok"})
+    except Exception as e:
+        return FastJSONResponse({"status": "error", "detail": str(e)}, status_code=500)
+
+
+@app.post("/rollups/rebuild")
+async def rebuild_rollups():
+    """Dönem özetlerini (gün/hafta/ay/yıl) ham işlemlerden şimdi yeniden derler."""
+    try:
+        kayit = await get_limiter("storage").run(get_rollup_derleyici().derle)
+        return FastJSONResponse({"status": "ok", "kayit": kayit})
+    except Exception as e:
+        return FastJSONResponse({"status": "error", "detail": str(e)}, status_code=500)
+
+
+@app.post("/anomalies/rebuild")
+async def rebuild_anomaly_stats():
+    """Kategori bazlı harcama istatistiklerini depodaki tüm giderlerden şimdi yeniden kurar."""
+    dedektor = get_anomali_dedektoru()
+    if dedektor is None:
+        return FastJSONResponse({"status": "error", "detail": "Anomali tespiti kapalı (ANOMALY_DETECTION=0)"}, status_code=400)
+    try:
+        okunan = await get_limiter("storage").run(dedektor.doldur)
+        return FastJSONResponse({"status": "ok", "giderler": okunan})
+    except Exception as e:
+        return FastJSONResponse({"status": "error", "detail": str(e)}, status_code=500)
 
 
 @app.get("/ask-ai")
-def ask_ai():
+async def ask_ai():
     try:
-        advice = run_ai_on_current_data()
-        return JSONResponse({"message": advice})
+        advice = await run_ai_on_current_data_async()
+        return FastJSONResponse({"message": advice})
     except Exception as e:
-        return JSONResponse({"status": "error", "detail": str(e)}, status_code=500)
+        return FastJSONResponse({"status": "error", "detail": str(e)}, status_code=500)
 
 
 @app.post("/ask-ai")
-def ask_ai_chat(payload: ChatIn):
+async def ask_ai_chat(payload: ChatIn):
     try:
-        summary = payload.summary or get_analysis_summary()
+        summary = payload.summary or await get_analysis_summary_async()
         chart_data = None
         if payload.chart_data:
             chart_data = [row.dict() for row in payload.chart_data]
-        reply = generate_finance_chat_reply(summary, payload.message, chart_data, payload.image.dict() if payload.image else None)
-        return JSONResponse({"message": reply})
+        reply = await generate_finance_chat_reply_async(summary, payload.message, chart_data, payload.image.dict() if payload.image else None)
+        return FastJSONResponse({"message": reply})
     except Exception as e:
-        return JSONResponse({"status": "error", "detail": str(e)}, status_code=500)
+        return FastJSONResponse({"status": "error", "detail": str(e)}, status_code=500)
 
 
 @app.delete("/transactions/{transaction_id}")
-def delete_transaction(transaction_id: str):
+async def delete_transaction(transaction_id: str, user_email: Optional[str] = None):
     """Belirtilen ID'ye sahip işlemi siler."""
     try:
-        yonetici = ButceYonetici()
-        success = yonetici.islem_sil(transaction_id)
+        yonetici = ButceYonetici(user_email)
+        success = await get_limiter("storage").run(yonetici.islem_sil, transaction_id)
         if success:
-            return JSONResponse({"status": "ok", "message": "İşlem silindi"})
+            return FastJSONResponse({"status": "ok", "message": "İşlem silindi"})
         else:
-            return JSONResponse({"status": "error", "detail": "İşlem bulunamadı"}, status_code=404)
+            return FastJSONResponse({"status": "error", "detail": "İşlem bulunamadı"}, status_code=404)
+    except TimeoutError as e:
+        # İşlem yazım-arkası günlüğünde bekliyor; bulunamadı değil, yeniden denenebilir
+        return FastJSONResponse({"status": "error", "detail": str(e)}, status_code=503, headers={"Retry-After": "1"})
     except Exception as e:
-        return JSONResponse({"status": "error", "detail": str(e)}, status_code=500)
+        return FastJSONResponse({"status": "error", "detail": str(e)}, status_code=500)
 
 
 class BudgetLimitIn(BaseModel):
     aylikLimit: float
+    user_email: Optional[str] = None
 
 
 @app.get("/budget-manager/status")
-def budget_status():
-    """Bütçe yöneticisinin durumunu döndürür (bakiye, limit, işlem sayısı)."""
+async def budget_status(user_email: Optional[str] = None):
+    """Kullanıcının bütçe yöneticisinin durumunu döndürür (bakiye, limit, işlem sayısı)."""
     try:
-        yonetici = ButceYonetici()
-        # Firestore'dan en güncel durumu çekerek tutarlılık sağla
+        yonetici = ButceYonetici(user_email)
+        # Son çağrıdan bu yana yapılan değişiklikleri uygula (ilk çağrıda tam yükleme)
         try:
-            yonetici.gecmisi_yukle()
+            await get_limiter("storage").run(yonetici.senkronize_et)
         except Exception:
             # Sessizce geç; en azından mevcut bellek durumunu döndür
             pass
-        return JSONResponse({
+        return FastJSONResponse({
+            "user_email": yonetici.user_email,
             "bakiye": yonetici.bakiye,
             "aylikLimit": yonetici.aylikLimit,
             "islemSayisi": len(yonetici.islemler),
@@ -177,56 +517,79 @@ def budget_status():
             "veritabaniYolu": yonetici.veritabaniYolu,
         })
     except Exception as e:
-        return JSONResponse({"status": "error", "detail": str(e)}, status_code=500)
+        return FastJSONResponse({"status": "error", "detail": str(e)}, status_code=500)
 
 
 @app.put("/budget-manager/limit")
-def set_budget_limit(payload: BudgetLimitIn):
-    """Aylık limiti günceller."""
+async def set_budget_limit(payload: BudgetLimitIn):
+    """Kullanıcının aylık limitini günceller."""
     try:
-        yonetici = ButceYonetici()
+        yonetici = ButceYonetici(payload.user_email)
         yonetici.aylikLimit = payload.aylikLimit
-        return JSONResponse({"status": "ok", "aylikLimit": yonetici.aylikLimit})
+        return FastJSONResponse({"status": "ok", "aylikLimit": yonetici.aylikLimit})
     except Exception as e:
-        return JSONResponse({"status": "error", "detail": str(e)}, status_code=500)
+        return FastJSONResponse({"status": "error", "detail": str(e)}, status_code=500)
+
+
+@app.get("/budget-manager/transactions")
+async def budget_transactions(user_email: Optional[str] = None):
+    """Kullanıcının bellekteki işlemlerini (vergi ve taksit bilgisiyle) döndürür; depo sütunlarından toplu kodlanır."""
+    try:
+        yonetici = ButceYonetici(user_email)
+        await get_limiter("storage").run(yonetici.senkronize_et)
+        kayitlar = await get_limiter("analysis").run(yonetici.kayitlar)
+        return Response(dumps(kayitlar), media_type="application/json")
+    except Exception as e:
+        return FastJSONResponse({"status": "error", "detail": str(e)}, status_code=500)
 
 
 @app.post("/budget-manager/load-history")
-def load_history():
-    """Firestore'dan geçmiş işlemleri yükler."""
+async def load_history(user_email: Optional[str] = None):
+    """Firestore'dan kullanıcının geçmiş işlemlerini yükler."""
     try:
-        yonetici = ButceYonetici()
-        yonetici.gecmisi_yukle()
-        return JSONResponse({
+        yonetici = ButceYonetici(user_email)
+        await get_limiter("storage").run(yonetici.gecmisi_yukle)
+        return FastJSONResponse({
             "status": "ok",
             "islemSayisi": len(yonetici.islemler),
             "bakiye": yonetici.bakiye,
         })
     except Exception as e:
-        return JSONResponse({"status": "error", "detail": str(e)}, status_code=500)
+        return FastJSONResponse({"status": "error", "detail": str(e)}, status_code=500)
+
+
+@app.post("/budget-manager/reconcile")
+async def reconcile_budget(user_email: Optional[str] = None, duzelt: bool = True):
+    """Bellekteki bakiyeyi depolamadaki aylık özet toplamlarıyla karşılaştırır; fark sürerse düzeltir."""
+    try:
+        yonetici = ButceYonetici(user_email)
+        sonuc = await get_limiter("storage").run(yonetici.mutabakat, duzelt)
+        return FastJSONResponse({"status": "ok", **sonuc})
+    except Exception as e:
+        return FastJSONResponse({"status": "error", "detail": str(e)}, status_code=500)
 
 
 @app.post("/budget-manager/save")
-def save_data():
-    """Tüm işlemleri Firestore'a kaydeder."""
+async def save_data(user_email: Optional[str] = None):
+    """Kullanıcının kaydedilmemiş işlemlerini Firestore'a kaydeder."""
     try:
-        yonetici = ButceYonetici()
-        yonetici.veriyi_kaydet()
-        return JSONResponse({"status": "ok", "message": "Veriler kaydedildi"})
+        yonetici = ButceYonetici(user_email)
+        await get_limiter("storage").run(yonetici.veriyi_kaydet)
+        return FastJSONResponse({"status": "ok", "message": "Veriler kaydedildi"})
     except Exception as e:
-        return JSONResponse({"status": "error", "detail": str(e)}, status_code=500)
+        return FastJSONResponse({"status": "error", "detail": str(e)}, status_code=500)
 
 
 @app.post("/budget-manager/notify")
-def notify_observers(payload: Dict[str, str]):
-    """Gözlemcilere bildirim gönderir."""
+async def notify_observers(payload: Dict[str, str]):
+    """Kullanıcının gözlemcilerine bildirim gönderir."""
     try:
-        yonetici = ButceYonetici()
+        yonetici = ButceYonetici(payload.get("user_email"))
         mesaj = payload.get("mesaj", "")
         yonetici.gozlemcileri_duyur(mesaj)
-        return JSONResponse({"status": "ok", "message": "Bildirim gönderildi"})
+        return FastJSONResponse({"status": "ok", "message": "Bildirim gönderildi"})
     except Exception as e:
-        return JSONResponse({"status": "error", "detail": str(e)}, status_code=500)
+        return FastJSONResponse({"status": "error", "detail": str(e)}, status_code=500)
 
 
 # For local debug via: python backend/main.py
@@ -0,0 +1,120 @@
+"""
+Süreç genelinde analiz özeti önbelleği.
+
+/dashboard-data, GET /ask-ai ve POST /ask-ai aynı özeti (kullanıcı + tarih aralığı) ister; önbellek
+bir sayfa yüklemesinde özetin yalnızca bir kez hesaplanmasını sağlar. Kayıtlar SUMMARY_CACHE_TTL
+saniye (varsayılan 30) yaşar ve islem_ekle / islem_sil / toplu yazımlarda açıkça geçersiz kılınır.
+Aynı anahtar için eşzamanlı kaçırmalarda hesaplama tek sefer yapılır, diğer istekler sonucu bekler.
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Callable, Dict, Optional, Tuple
+
+OzetAnahtari = Tuple[Optional[str], Optional[str], Optional[str], str]
+
+
+def ozet_anahtari(
+    user_email: Optional[str] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    kova: str = "day",
+) -> OzetAnahtari:
+    return (user_email, start.isoformat() if start else None, end.isoformat() if end else None, kova)
+
+
+class OzetOnbellegi:
+    def __init__(self, ttl: float = 30.0, max_kayit: int = 1024):
+        self.ttl = ttl
+        self.max_kayit = max_kayit
+        self._lock = threading.Lock()
+        self._kayitlar: "OrderedDict[OzetAnahtari, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._hesaplanan: Dict[OzetAnahtari, threading.Lock] = {}
+        self.hit = 0
+        self.miss = 0
+        self.gecersiz_kilma = 0
+
+    def bak(self, anahtar: OzetAnahtari) -> Optional[Dict[str, Any]]:
+        """Süresi dolmamış kayıt varsa döndürür (hit sayılır); yoksa None (sayaç değişmez)."""
+        with self._lock:
+            kayit = self._kayitlar.get(anahtar)
+            if kayit is None or kayit[0] < time.monotonic():
+                return None
+            self._kayitlar.move_to_end(anahtar)
+            self.hit += 1
+            return kayit[1]
+
+    def al(self, anahtar: OzetAnahtari, hesapla: Callable[[], Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Önbellekteki özeti döndürür; yoksa hesapla() ile üretip saklar.
+        Dönen sözlük paylaşılır, çağıranlar değiştirmemelidir.
+        """
+        deger = self.bak(anahtar)
+        if deger is not None:
+            return deger
+        with self._lock:
+            anahtar_kilidi = self._hesaplanan.setdefault(anahtar, threading.Lock())
+        with anahtar_kilidi:
+            # Beklerken başka bir istek hesaplamış olabilir
+            deger = self.bak(anahtar)
+            if deger is not None:
+                return deger
+            with self._lock:
+                self.miss += 1
+                nesil = self.gecersiz_kilma
+            try:
+                deger = hesapla()
+                with self._lock:
+                    # Hesaplama sırasında bir yazım olduysa sonucu saklama (eski olabilir)
+                    if nesil == self.gecersiz_kilma:
+                        self._kayitlar[anahtar] = (time.monotonic() + self.ttl, deger)
+                        self._kayitlar.move_to_end(anahtar)
+                        while len(self._kayitlar) > self.max_kayit:
+                            self._kayitlar.popitem(last=False)
+            finally:
+                # hesapla() hata verse de anahtar kilidi bırakılır; bekleyenler kendi hesaplamasını yapar
+                with self._lock:
+                    if self._hesaplanan.get(anahtar) is anahtar_kilidi:
+                        del self._hesaplanan[anahtar]
+            return deger
+
+    def gecersiz_kil(self, user_email: Optional[str] = None) -> None:
+        """
+        Yazım sonrası çağrılır. user_email verilirse o kullanıcının ve tüm kullanıcıları kapsayan
+        kayıtlar, verilmezse tüm kayıtlar silinir.
+        """
+        with self._lock:
+            self.gecersiz_kilma += 1
+            if user_email is None:
+                self._kayitlar.clear()
+                return
+            for anahtar in [a for a in self._kayitlar if a[0] is None or a[0] == user_email]:
+                del self._kayitlar[anahtar]
+
+    def istatistik(self) -> Dict[str, Any]:
+        with self._lock:
+            toplam = self.hit + self.miss
+            return {
+                "hit": self.hit,
+                "miss": self.miss,
+                "hit_orani": round(self.hit / toplam, 4) if toplam else 0.0,
+                "gecersiz_kilma": self.gecersiz_kilma,
+                "kayit_sayisi": len(self._kayitlar),
+                "ttl": self.ttl,
+            }
+
+
+_onbellek_lock = threading.Lock()
+_onbellek: Optional[OzetOnbellegi] = None
+
+
+def get_ozet_onbellegi() -> OzetOnbellegi:
+    """Süreç genelinde tek özet önbelleği (Singleton)."""
+    global _onbellek
+    if _onbellek is None:
+        with _onbellek_lock:
+            if _onbellek is None:
+                _onbellek = OzetOnbellegi(ttl=float(os.getenv("SUMMARY_CACHE_TTL", "30")))
+    return _onbellek
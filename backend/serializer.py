@@ -0,0 +1,53 @@
+"""
+Toplu JSON serileştirme.
+
+orjson kuruluysa onu, değilse önceden kurulmuş tek bir stdlib ``json.JSONEncoder`` örneğini
+(kompakt ayraçlar, dairesel referans kontrolü kapalı) kullanır. Her iki yol da doğrudan ``bytes``
+üretir; datetime değerleri ISO metnine, NumPy skalerleri Python sayılarına çevrilir.
+
+- ``dumps(obj)``: tek çağrıda bytes (ör. IslemDeposu.kayitlar() çıktısı)
+- ``FastJSONResponse``: API'nin varsayılan yanıt sınıfı
+"""
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any
+
+import numpy as np
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson  # type: ignore
+except ImportError:  # pragma: no cover - orjson opsiyoneldir
+    orjson = None
+
+
+def _default(obj: Any) -> Any:
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    if isinstance(obj, Decimal):
+        return float(obj)
+    raise TypeError(f"JSON'a çevrilemeyen tür: {type(obj).__name__}")
+
+
+_encoder = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"), check_circular=False, default=_default)
+
+if orjson is not None:
+    _ORJSON_OPT = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+    def dumps(obj: Any) -> bytes:
+        return orjson.dumps(obj, default=_default, option=_ORJSON_OPT)
+else:
+    def dumps(obj: Any) -> bytes:
+        return _encoder.encode(obj).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse ile aynı arayüz; gövdeyi dumps (orjson / stdlib) ile üretir."""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
@@ -1,8 +1,25 @@
+import csv
+import io
+import json
+import os
+import tempfile
+import threading
+import uuid
 from abc import ABC, abstractmethod
-from datetime import datetime
-from typing import Any, Dict, Optional
-
-from backend.firebase_config import get_db
+from collections import OrderedDict
+from datetime import datetime, timezone
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from backend.storage import get_repository
+from backend.islem_deposu import IslemDeposu
+from backend.analiz_motoru import get_analiz_motoru
+from backend.ozet_onbellegi import get_ozet_onbellegi
+from backend.vergi import vergi_hesapla_tek
+from backend.bildirim import get_bildirim_dagitici
+from backend.anomali import get_anomali_dedektoru
+from backend.yazim_gunlugu import get_yazim_gunlugu
+from backend.kategori import TAKSIT_ALT_TUTARI, get_kategori_tablosu, taksitli_kategori_mi
 
 
 # --- ARAYÜZLER ---
@@ -19,8 +36,11 @@ class Islem(ABC):
         self.tutar = tutar
         self.aciklama = aciklama
         self.user_email = user_email
-        # Eğer tarih girildiyse onu kullan, girilmediyse şu anı al
-        if tarih_str:
+        # Eğer tarih girildiyse onu kullan, girilmediyse şu anı al.
+        # Depolamadan gelen değer zaten datetime'dır (Firestore Timestamp dahil), ayrıştırılmaz.
+        if isinstance(tarih_str, datetime):
+            self.tarih = tarih_str
+        elif tarih_str:
             try:
                 self.tarih = datetime.strptime(tarih_str, "%Y-%m-%d")
             except ValueError:
@@ -49,9 +69,8 @@ class Islem(ABC):
             detay += f"ID: {self.id}"
         return detay.strip()
 
-    def toJSON(self) -> str:
-        """İşlemi JSON string formatında döndürür."""
-        import json
+    def to_dict(self) -> Dict[str, Any]:
+        """toJSON'un sözlük hali (toplu serileştirme için: backend.serializer)."""
         data: Dict[str, Any] = {
             "id": self.id,
             "tutar": self.tutar,
@@ -68,7 +87,11 @@ class Islem(ABC):
             data["kategori"] = self.kategori
             data["zorunluMu"] = self.zorunluMu
             data["taksitVarMi"] = self.taksitVarMi()
-        return json.dumps(data, ensure_ascii=False, indent=2)
+        return data
+
+    def toJSON(self) -> str:
+        """İşlemi JSON string formatında döndürür."""
+        return json.dumps(self.to_dict(), ensure_ascii=False, indent=2)
 
     def __str__(self):
         return f"[{self.tarih.strftime('%Y-%m-%d')}] {self.aciklama}: {self.tutar} TL"
@@ -83,25 +106,14 @@ class Gelir(Islem):
 
     def vergiHesapla(self) -> float:
         """
-        Gelir vergisi hesaplar. Türkiye'de 2024 için:
+        Gelir vergisi hesaplar (backend.vergi, VARSAYILAN_YIL tarifesi, düz mod). Türkiye'de 2024 için:
         - İlk 110.000 TL için %15
         - 110.000 - 230.000 TL arası %20
         - 230.000 TL üzeri %27
         Düzenli gelirlerde %5 ek indirim uygulanır.
+        Çok sayıda gelir için backend.vergi.vergi_hesapla tek NumPy geçişinde hesaplar.
         """
-        vergi_orani = 0.15
-        if self.tutar > 230000:
-            vergi_orani = 0.27
-        elif self.tutar > 110000:
-            vergi_orani = 0.20
-        
-        vergi = self.tutar * vergi_orani
-        
-        # Düzenli gelirlerde %5 indirim
-        if self.duzenliMi:
-            vergi *= 0.95
-        
-        return round(vergi, 2)
+        return vergi_hesapla_tek(self.tutar, self.duzenliMi)
 
 
 class Gider(Islem):
@@ -114,12 +126,9 @@ class Gider(Islem):
         """
         Giderin taksitli olup olmadığını kontrol eder.
         Basit bir heuristik: Tutar 1000 TL üzerindeyse ve kategori "FATURA", "KREDI", "TAKSIT" içeriyorsa taksitli kabul edilir.
+        Kategori bayrağı kategori tablosunda (backend.kategori) bir kez hesaplanır.
         """
-        if self.tutar >= 1000:
-            kategori_upper = (self.kategori or "").upper()
-            taksit_kategorileri = ["FATURA", "KREDI", "TAKSIT", "KREDİ", "ÖDEME"]
-            return any(k in kategori_upper for k in taksit_kategorileri)
-        return False
+        return self.tutar >= TAKSIT_ALT_TUTARI and taksitli_kategori_mi(self.kategori)
 
 
 # --- KULLANICI ---
@@ -141,70 +150,173 @@ class Kullanici(Gozlemci):
 
 
 # --- YÖNETİCİ ---
+class _YoneticiKayitDefteri:
+    """
+    Kullanıcı başına ButceYonetici örnekleri (LRU). En uzun süre kullanılmayan örnek, sınır aşılınca
+    bellekten atılır; bir sonraki erişimde yeniden oluşturulur. Aylık limitler atılan örneklerden
+    bağımsız saklanır, böylece tahliye kullanıcı ayarını kaybettirmez.
+    """
+
+    def __init__(self, max_boyut: int):
+        self.max_boyut = max_boyut
+        self._lock = threading.Lock()
+        self._ornekler: "OrderedDict[Optional[str], ButceYonetici]" = OrderedDict()
+        self.limitler: Dict[Optional[str], float] = {}
+
+    def al(self, user_email: Optional[str], olustur) -> "ButceYonetici":
+        with self._lock:
+            ornek = self._ornekler.get(user_email)
+            if ornek is None:
+                ornek = self._ornekler[user_email] = olustur(user_email)
+                while len(self._ornekler) > self.max_boyut:
+                    self._ornekler.popitem(last=False)
+            else:
+                self._ornekler.move_to_end(user_email)
+            return ornek
+
+    def varsa(self, user_email: Optional[str]) -> Optional["ButceYonetici"]:
+        """Bellekte bulunan örneği (LRU sırasını değiştirmeden) döndürür."""
+        with self._lock:
+            return self._ornekler.get(user_email)
+
+    def __len__(self) -> int:
+        return len(self._ornekler)
+
+
 class ButceYonetici:
-    _instance = None
-
-    def __new__(cls):
-        if cls._instance is None:
-            cls._instance = super(ButceYonetici, cls).__new__(cls)
-            cls._instance.islemler = []
-            cls._instance.gozlemciler = []
-            cls._instance.bakiye = 0.0
-            cls._instance.aylikLimit = 0.0  # Aylık limit (TL)
-            cls._instance.veritabaniYolu = "transactions"  # Firestore koleksiyon adı
-        return cls._instance
+    """
+    Kullanıcı başına bütçe yöneticisi. ButceYonetici(user_email) aynı kullanıcı için hep aynı örneği
+    döndürür (kayıt defteri üzerinden); bakiye, işlemler, limit ve sorgular o kullanıcıyla sınırlıdır.
+    ButceYonetici() (user_email=None) tüm kullanıcıları kapsayan görünümdür.
+
+    Defter: bakiye her zaman depodaki kayıtlı işlemlerin (gelir - gider) toplamıdır. İşlem deposu ve
+    bakiye yalnızca örneğe ait _defter_lock altında ve birlikte değişir; depolama yazımları kilit
+    dışında yapılır, bakiye yazım başarılı olduktan sonra uygulanır. Böylece farklı kullanıcıların
+    yazımları birbirini beklemez, aynı işlemin iki yoldan (ekleme ve senkronizasyon) gelmesi de
+    bakiyeyi iki kez değiştirmez.
+    """
+    TOPLU_YAZIM_BOYUTU = 500  # toplu eklemede bakiye/özet güncellemesi başına işlem sayısı
+    HIDRASYON_PARCASI = 5000  # gecmisi_yukle'de create_many'ye verilen belge sayısı
+    MUTABAKAT_TOLERANSI = 0.01  # TL; kayan nokta toplama sırası farkları bunun altında kalır
+    GUNLUK_BEKLEME_SN = 10.0  # silme/mutabakat öncesi WAL'ın depolamaya aktarılması için en uzun bekleme
+    _kayit = _YoneticiKayitDefteri(int(os.getenv("BUDGET_MANAGER_CACHE_SIZE", "256")))
+
+    def __new__(cls, user_email: Optional[str] = None):
+        return cls._kayit.al(user_email, cls._olustur)
+
+    @classmethod
+    def _olustur(cls, user_email: Optional[str]) -> "ButceYonetici":
+        ornek = super(ButceYonetici, cls).__new__(cls)
+        ornek.user_email = user_email
+        ornek.islemler = IslemDeposu()  # len() ve yineleme destekler; belge ID'si ile indeksli
+        ornek.gozlemciler = []
+        ornek.bakiye = 0.0
+        ornek.veritabaniYolu = "transactions"  # Firestore koleksiyon adı
+        ornek._senkron_isareti = None  # son senkronizasyonun yüksek su işareti; None: hiç yüklenmedi
+        ornek._senkron_lock = threading.Lock()
+        ornek._defter_lock = threading.RLock()  # islemler + bakiye
+        return ornek
+
+    @staticmethod
+    def _hareket(islem: Islem) -> float:
+        """İşlemin bakiyeye etkisi."""
+        return islem.tutar if isinstance(islem, Gelir) else -islem.tutar
+
+    def _defter_ekle(self, islemler: Iterable[Islem]) -> int:
+        """ID'li işlemleri depoya ekler; yalnızca yeni eklenenler bakiyeye yansır. Dönüş: eklenen sayısı."""
+        eklenen = 0
+        with self._defter_lock:
+            for islem in islemler:
+                if self.islemler.ekle(islem):
+                    self.bakiye += self._hareket(islem)
+                    eklenen += 1
+        return eklenen
+
+    def _defter_kaydedildi(self, islemler: List[Islem]) -> None:
+        """Yazımı tamamlanan bekleyen işlemleri kayıtlı satırlara taşır ve bakiyeye yansıtır."""
+        with self._defter_lock:
+            for islem in self.islemler.kaydedildi(islemler):
+                self.bakiye += self._hareket(islem)
+
+    def _defter_sil(self, transaction_id: str) -> Optional[Islem]:
+        """İşlemi depodan çıkarır; depoda idiyse bakiyeden düşer ve işlemi döndürür."""
+        with self._defter_lock:
+            islem = self.islemler.sil(transaction_id)
+            if islem is not None:
+                self.bakiye -= self._hareket(islem)
+            return islem
+
+    def kayitlar(self) -> List[Dict[str, Any]]:
+        """İşlemlerin tutarlı bir anlık görüntüsü (Islem.to_dict sözlükleri)."""
+        with self._defter_lock:
+            return self.islemler.kayitlar()
+
+    @property
+    def aylikLimit(self) -> float:
+        """Kullanıcının aylık limiti (TL)."""
+        return self._kayit.limitler.get(self.user_email, 0.0)
+
+    @aylikLimit.setter
+    def aylikLimit(self, deger: float) -> None:
+        self._kayit.limitler[self.user_email] = float(deger)
+        # Yeni limitle eşikler baştan değerlendirilir
+        get_bildirim_dagitici().sifirla((self.user_email, "limit"))
 
     def gozlemci_ekle(self, gozlemci: Gozlemci):
         self.gozlemciler.append(gozlemci)
 
     def islem_ekle(self, islem: Islem):
-        self.islemler.append(islem)
+        # Yazım başarılı olana kadar bekleyen işlem olarak tutulur (veriyi_kaydet tekrar dener);
+        # bakiye yazımdan sonra, işlem kayıtlı satırlara taşınırken güncellenir
+        with self._defter_lock:
+            self.islemler.ekle(islem)
 
         limit_info: Optional[Dict[str, Any]] = None
 
         if isinstance(islem, Gelir):
-            self.bakiye += islem.tutar
+            self.csv_ye_yaz(islem, "Gelir", "Gelir")
+            self._defter_kaydedildi([islem])
             print(f"➕ Gelir Eklendi: {islem.aciklama} ({islem.tarih.strftime('%Y-%m-%d')})")
             # Gelir sonrası da bilgilendirme yapılabilir (negatif/kritik bakiye toparlandı mı vs.)
-            limit_info = self.limit_kontrol()
-            self.csv_ye_yaz(islem, "Gelir", "Gelir")
+            limit_info = self.limit_kontrol(user_email=islem.user_email, referans_tarih=islem.tarih)
 
         elif isinstance(islem, Gider):
-            self.bakiye -= islem.tutar
+            self.csv_ye_yaz(islem, islem.kategori, "Gider")
+            self._defter_kaydedildi([islem])
             print(f"➖ Gider Eklendi: {islem.aciklama} ({islem.tarih.strftime('%Y-%m-%d')})")
-            # Aylik gider toplamını (bu gider dahil) hesaplayıp limit kontrolü yap
-            toplam = (self._aylik_gider_toplami(islem.tarih) or 0.0) + float(islem.tutar)
-            limit_info = self.limit_kontrol(aylik_gider_toplam=toplam)
-            self.csv_ye_yaz(islem, getattr(islem, "kategori_id", None), "Gider")
+            self._anomali_bildir(self._anomali_puanla([islem]))
+            # Aylık özet bu gideri artık içerir; limit kontrolü güncel toplamla yapılır
+            # (limit yoksa özet hiç okunmaz)
+            toplam = self._aylik_gider_toplami(islem.tarih, islem.user_email) if self.aylikLimit > 0 else None
+            limit_info = self.limit_kontrol(aylik_gider_toplam=toplam, user_email=islem.user_email, referans_tarih=islem.tarih)
 
         return limit_info
 
     def csv_ye_yaz(self, islem: Islem, kategori_degeri: Any, islem_tipi: str):
         """
-        Firestore'a yazan kalıcılık katmanı. Metot adı korunmuştur.
+        Depolama katmanına (get_repository) yazan kalıcılık katmanı. Metot adı korunmuştur.
         Koleksiyon: transactions
-        Belge alanları: User_Email, Tarih, Kategori (ops.), Tutar, Islem_Tipi, Aciklama, Kaynak (ops.)
+        Belge alanları: User_Email, Tarih, Kategori + Kategori_Id (gider), Tutar, Islem_Tipi, Aciklama, Kaynak (ops.)
         Dönen belge ID'si Islem nesnesine eklenir.
+        İşlem belgesi ve ilgili aylık özet (monthly_aggregates) depolama katmanında atomik yazılır.
+        Bakiyeye dokunmaz; çağıran yazım başarılı olunca _defter_kaydedildi ile uygular.
+        Yazım-arkası modunda (WRITE_BEHIND) ID burada atanır ve belge yalnızca yerel WAL'a yazılır;
+        depolamaya grup commit ile arka planda aktarılır.
         """
+        gunluk = get_yazim_gunlugu()
+        if gunluk is not None:
+            data = self._belge_verisi(islem, kategori_degeri, islem_tipi)
+            islem.id = islem.id or uuid.uuid4().hex
+            gunluk.ekle(islem.id, data)
+            return
         try:
-            db = get_db()
-            data: Dict[str, Any] = {
-                "User_Email": getattr(islem, "user_email", None),
-                "Tarih": islem.tarih,  # firebase-admin, datetime -> Timestamp'e dönüştürür
-                "Kategori": kategori_degeri if islem_tipi == "Gider" else None,
-                "Tutar": float(islem.tutar),
-                "Islem_Tipi": islem_tipi,
-                "Aciklama": getattr(islem, "aciklama", None),
-            }
-            if isinstance(islem, Gelir):
-                data["Kaynak"] = getattr(islem, "kaynak", None)
-                data["DuzenliMi"] = getattr(islem, "duzenliMi", False)
-            elif isinstance(islem, Gider):
-                data["ZorunluMu"] = getattr(islem, "zorunluMu", False)
-            # Firestore add() metodu (timestamp, DocumentReference) tuple döndürür
-            _, doc_ref = db.collection("transactions").add(data)
-            # Firestore'dan dönen belge ID'sini Islem nesnesine ekle
-            islem.id = doc_ref.id
+            data = self._belge_verisi(islem, kategori_degeri, islem_tipi)
+            # Depolamanın ürettiği belge ID'sini Islem nesnesine ekle
+            motor = get_analiz_motoru()
+            with motor.yazim():
+                islem.id = get_repository().add(data)
+                motor.islem_eklendi(data, islem.id)
+            get_ozet_onbellegi().gecersiz_kil(data.get("User_Email"))
         except Exception as exc:
             error_msg = str(exc)
             if "network" in error_msg.lower() or "connection" in error_msg.lower() or "timeout" in error_msg.lower():
@@ -212,31 +324,122 @@ class ButceYonetici:
                 print("💡 İnternet bağlantınızı kontrol edin veya Firebase servisinin çalıştığından emin olun.")
             else:
                 print(f"❌ Firestore Hatası: {error_msg}")
-            # Hata durumunda işlemi geri al (bakiye güncellemesini geri al)
-            if isinstance(islem, Gelir):
-                self.bakiye -= islem.tutar
-            elif isinstance(islem, Gider):
-                self.bakiye += islem.tutar
             raise  # Hata yukarıya fırlatılır
 
-    def limit_kontrol(self, aylik_gider_toplam: Optional[float] = None) -> Dict[str, Any]:
+    @staticmethod
+    def _belge_verisi(islem: Islem, kategori_degeri: Any, islem_tipi: str) -> Dict[str, Any]:
+        """
+        Islem nesnesini depolamadaki belge alanlarına dönüştürür. Gider kategorisi burada bir kez
+        kanonikleştirilir (kategori boşsa açıklama kullanılır); nesnenin kategorisi de kanonik ada çekilir.
+        """
+        data: Dict[str, Any] = {
+            "User_Email": getattr(islem, "user_email", None),
+            "Tarih": islem.tarih,  # firebase-admin, datetime -> Timestamp'e dönüştürür
+            "Kategori": None,
+            "Tutar": float(islem.tutar),
+            "Islem_Tipi": islem_tipi,
+            "Aciklama": getattr(islem, "aciklama", None),
+        }
+        if islem_tipi == "Gider":
+            kategori = get_kategori_tablosu().gider_kategorisi(kategori_degeri, data["Aciklama"])
+            data["Kategori"] = kategori.ad
+            data["Kategori_Id"] = kategori.id
+            if isinstance(islem, Gider):
+                islem.kategori = kategori.ad
+        if isinstance(islem, Gelir):
+            data["Kaynak"] = getattr(islem, "kaynak", None)
+            data["DuzenliMi"] = getattr(islem, "duzenliMi", False)
+        elif isinstance(islem, Gider):
+            data["ZorunluMu"] = getattr(islem, "zorunluMu", False)
+        return data
+
+    def _toplu_yaz(self, islemler: List[Islem]) -> None:
+        """
+        İşlemleri tek bir add_many çağrısıyla yazar (depolama kendi batch sınırına göre böler),
+        dönen ID'leri nesnelere ekler ve analiz motoruna bildirir. Bakiyeye dokunmaz.
+        """
+        veriler = [
+            self._belge_verisi(i, "Gelir" if isinstance(i, Gelir) else getattr(i, "kategori", None), "Gelir" if isinstance(i, Gelir) else "Gider")
+            for i in islemler
+        ]
+        motor = get_analiz_motoru()
+        with motor.yazim():
+            ids = get_repository().add_many(veriler)
+            for islem, data, transaction_id in zip(islemler, veriler, ids):
+                islem.id = transaction_id
+                motor.islem_eklendi(data, transaction_id)
+        onbellek = get_ozet_onbellegi()
+        for user_email in {d.get("User_Email") for d in veriler}:
+            onbellek.gecersiz_kil(user_email)
+
+    def toplu_islem_ekle(self, islemler: List[Islem]) -> Dict[str, Any]:
+        """
+        Çok sayıda işlemi (ör. banka ekstresi) TOPLU_YAZIM_BOYUTU'luk parçalar halinde ekler.
+        Bakiye ve aylık özetler parça başına bir kez güncellenir; limit kontrolü en sonda bir kez,
+        partideki en son giderin ayı için yapılır. Partideki olağandışı giderler tek bildirimde toplanır.
+        Dönüş: { eklenen: int, ids: [str, ...], limit: Optional[dict], anomaliler: [dict, ...] }
+        Bir parça yazılamazsa önceki parçalar kalıcıdır; hata, eklenen sayısıyla birlikte fırlatılır.
+        """
+        eklenen = 0
+        anomaliler: List[Dict[str, Any]] = []
+        for bas in range(0, len(islemler), self.TOPLU_YAZIM_BOYUTU):
+            parca = islemler[bas:bas + self.TOPLU_YAZIM_BOYUTU]
+            try:
+                self._toplu_yaz(parca)
+            except Exception as exc:
+                raise RuntimeError(f"Toplu yazım {eklenen}. işlemden sonra durdu: {exc}") from exc
+            self._defter_ekle(parca)
+            eklenen += len(parca)
+            anomaliler.extend(self._anomali_puanla([i for i in parca if isinstance(i, Gider)]))
+        self._anomali_bildir(anomaliler)
+
+        limit_info: Optional[Dict[str, Any]] = None
+        giderler = [i for i in islemler if isinstance(i, Gider)]
+        if giderler:
+            son = max(giderler, key=lambda i: i.tarih)
+            # Aylık özet bu partiyi zaten içerir
+            limit_info = self.limit_kontrol(
+                aylik_gider_toplam=self._aylik_gider_toplami(son.tarih, son.user_email),
+                user_email=son.user_email,
+                referans_tarih=son.tarih,
+            )
+        elif islemler:
+            limit_info = self.limit_kontrol(user_email=islemler[-1].user_email, referans_tarih=islemler[-1].tarih)
+
+        print(f"📦 Toplu ekleme: {eklenen} işlem, Bakiye: {self.bakiye} TL")
+        return {"eklenen": eklenen, "ids": [i.id for i in islemler], "limit": limit_info, "anomaliler": anomaliler}
+
+    def limit_kontrol(
+        self,
+        aylik_gider_toplam: Optional[float] = None,
+        user_email: Optional[str] = None,
+        referans_tarih: Optional[datetime] = None,
+    ) -> Dict[str, Any]:
         """
         Aylık limit durumunu değerlendirir ve eşik bazlı bilgi döndürür.
         Dönüş: { asildi: bool, yuzde: float, esik: Optional[int], mesaj: str }
         Not: Aylık limit gider toplamına göre değerlendirilir (bakiye değil).
+        Bildirimler yalnızca eşik (kullanıcı+ay) veya bakiye seviyesi yükseldiğinde yayınlanır;
+        dönüş değeri her çağrıda güncel durumu içerir.
         """
+        user_email = user_email if user_email is not None else self.user_email
+        referans_tarih = referans_tarih or datetime.now()
+
         # Önce bakiye ile ilgili kritik durumlar için yayın (limitten bağımsız)
+        bakiye_anahtari = (self.user_email, "bakiye")
         if self.bakiye < 0:
-            self._bildirim_yayinla(f"ACİL! Bakiye negatife düştü! ({self.bakiye} TL)")
+            self._bildirim_yayinla(f"ACİL! Bakiye negatife düştü! ({self.bakiye} TL)", anahtar=bakiye_anahtari, durum=2)
         elif self.bakiye < 1000:
-            self._bildirim_yayinla(f"Dikkat: Bakiye kritik seviyede. ({self.bakiye} TL)")
+            self._bildirim_yayinla(f"Dikkat: Bakiye kritik seviyede. ({self.bakiye} TL)", anahtar=bakiye_anahtari, durum=1)
+        else:
+            get_bildirim_dagitici().durum_degisti(bakiye_anahtari, 0)
 
         if self.aylikLimit <= 0:
             return {"asildi": False, "yuzde": 0.0, "esik": None, "mesaj": "Limit ayarlı değil"}
 
-        # Aylık gider toplamı verilmediyse Firestore'dan/hatıradan hesapla
+        # Aylık gider toplamı verilmediyse kullanıcının ilgili aydaki özet belgesinden oku
         if aylik_gider_toplam is None:
-            aylik_gider_toplam = self._aylik_gider_toplami(datetime.now())
+            aylik_gider_toplam = self._aylik_gider_toplami(referans_tarih, user_email)
 
         try:
             yuzde = float(aylik_gider_toplam) / float(self.aylikLimit) if self.aylikLimit else 0.0
@@ -255,41 +458,59 @@ class ButceYonetici:
             esik = 50
             mesaj = f"Aylık limitin %50'si aşıldı. (Gider: {aylik_gider_toplam} TL / Limit: {self.aylikLimit} TL)"
 
+        limit_anahtari = (user_email, "limit", referans_tarih.year, referans_tarih.month)
         if mesaj:
-            self._bildirim_yayinla(mesaj)
+            self._bildirim_yayinla(mesaj, anahtar=limit_anahtari, durum=esik)
+        else:
+            get_bildirim_dagitici().durum_degisti(limit_anahtari, 0)
 
         return {"asildi": yuzde >= 1.0, "yuzde": round(yuzde, 4), "esik": esik, "mesaj": mesaj or ""}
 
-    def _aylik_gider_toplami(self, referans_tarih: datetime) -> float:
+    def _anomali_puanla(self, giderler: List[Gider]) -> List[Dict[str, Any]]:
         """
-        Verilen tarihin ait olduğu ay için toplam Gider tutarını hesaplar.
-        Firestore'dan tüm işlemleri çekip Python tarafında filtreler (basit ve yeterli).
+        Kaydedilen giderleri kategori bazlı anomali dedektörüne verir (gider başına O(1), depolama
+        okunmaz). Dönüş: anomali bulunan giderlerin bilgileri (kategori adı eklenmiş).
+        """
+        dedektor = get_anomali_dedektoru()
+        if dedektor is None:
+            return []
+        tablo = get_kategori_tablosu()
+        anomaliler = []
+        for gider in giderler:
+            kategori = tablo.cozumle(gider.kategori)
+            sonuc = dedektor.gozlemle(gider.user_email, kategori.id, gider.tutar, gider.id)
+            if sonuc is not None:
+                anomaliler.append({**sonuc, "kategori": kategori.ad})
+        return anomaliler
+
+    def _anomali_bildir(self, anomaliler: List[Dict[str, Any]]) -> None:
+        """Tek anomali kendi bildirimiyle, toplu eklemedekiler tek bildirimde yayınlanır."""
+        if len(anomaliler) == 1:
+            a = anomaliler[0]
+            self._bildirim_yayinla(
+                f"Olağandışı harcama: {a['kategori']} kategorisinde {a['tutar']} TL (bu kategoride olağan: ~{a['tipik']} TL)"
+            )
+        elif anomaliler:
+            ornekler = ", ".join(f"{a['kategori']} {a['tutar']} TL" for a in anomaliler[:3])
+            self._bildirim_yayinla(f"Toplu eklemede {len(anomaliler)} olağandışı harcama: {ornekler}")
+
+    def _aylik_gider_toplami(self, referans_tarih: datetime, user_email: Optional[str] = None) -> float:
+        """
+        Verilen tarihin ait olduğu ay için kullanıcının toplam Gider tutarını döndürür.
+        Koleksiyonu taramak yerine monthly_aggregates içindeki tek özet belgesini okur; yazım-arkası
+        modunda WAL'da bekleyen giderler de eklenir (grup commit'i süren gider iki kez sayılmaz).
         """
         try:
-            db = get_db()
-            docs = db.collection(self.veritabaniYolu).order_by("Tarih").stream()
-            yil = referans_tarih.year
-            ay = referans_tarih.month
-            toplam = 0.0
-            for d in docs:
-                data = d.to_dict() or {}
-                if data.get("Islem_Tipi") != "Gider":
-                    continue
-                t = data.get("Tarih")
-                try:
-                    t_py = t if isinstance(t, datetime) else None
-                    if t_py is None:
-                        # Bazı durumlarda Timestamp/datetime farklı olabilir; dönüştürmeyi dene
-                        from pandas import to_datetime
-                        t_py = to_datetime(t).to_pydatetime()
-                except Exception:
-                    continue
-                if t_py.year == yil and t_py.month == ay:
-                    try:
-                        toplam += float(data.get("Tutar", 0))
-                    except Exception:
-                        pass
-            return toplam
+            repo = get_repository()
+            yil, ay = referans_tarih.year, referans_tarih.month
+
+            def depolama_toplami() -> float:
+                return float(repo.monthly_aggregate(user_email, yil, ay).get("Gider_Toplam", 0) or 0)
+
+            gunluk = get_yazim_gunlugu()
+            if gunluk is None:
+                return depolama_toplami()
+            return gunluk.aylik_gider(user_email, yil, ay, depolama_toplami)
         except Exception as exc:
             print(f"❌ Aylık gider toplami hesaplanamadı: {exc}")
             return 0.0
@@ -297,35 +518,47 @@ class ButceYonetici:
     def islem_sil(self, id: str) -> bool:
         """
         Belirtilen ID'ye sahip işlemi siler.
-        Firestore'dan siler ve bakiyeyi günceller.
+        Depolamadan siler ve işlemi içeren bellekteki görünümlerin bakiyesini günceller.
+        İşlem WAL'da bekliyorsa ve GUNLUK_BEKLEME_SN içinde depolamaya aktarılamazsa TimeoutError
+        fırlatır (işlem vardır, silme yeniden denenmelidir); bulunamayan işlem için False döner.
         """
         try:
-            db = get_db()
-            # Firestore'dan sil
-            doc_ref = db.collection(self.veritabaniYolu).document(id)
-            doc = doc_ref.get()
-            
-            if not doc.exists:
+            gunluk = get_yazim_gunlugu()
+            if gunluk is not None and gunluk.bekliyor_mu(id):
+                # Henüz WAL'da bekleyen işlem önce depolamaya aktarılır
+                if not gunluk.bosalt(self.GUNLUK_BEKLEME_SN):
+                    raise TimeoutError(f"İşlem henüz depolamaya aktarılmadı, silme yeniden denenmeli: {id}")
+            # Depolamadan sil (aylık özet aynı adımda geri alınır)
+            motor = get_analiz_motoru()
+            with motor.yazim():
+                data = get_repository().delete(id)
+                if data is not None:
+                    motor.islem_silindi(data, id)
+            if data is None:
                 return False
-            
-            data = doc.to_dict()
-            tutar = float(data.get("Tutar", 0))
-            islem_tipi = data.get("Islem_Tipi", "")
-            
-            # Firestore'dan sil
-            doc_ref.delete()
-            
-            # Bakiyeyi güncelle
-            if islem_tipi == "Gelir":
-                self.bakiye -= tutar
-            elif islem_tipi == "Gider":
-                self.bakiye += tutar
-            
-            # Bellekteki işlemler listesinden de sil
-            self.islemler = [i for i in self.islemler if getattr(i, "id", None) != id]
+            get_ozet_onbellegi().gecersiz_kil(data.get("User_Email"))
+
+            sahip = data.get("User_Email")
+
+            # Silinen işlemi içeren görünümler: bu örnek (sahibiyse veya genel görünümse),
+            # bellekteki sahibin örneği ve genel görünüm
+            ilgili: List["ButceYonetici"] = []
+            for yonetici in (
+                self if self.user_email in (None, sahip) else None,
+                self._kayit.varsa(sahip),
+                self._kayit.varsa(None),
+            ):
+                if yonetici is not None and all(yonetici is not y for y in ilgili):
+                    ilgili.append(yonetici)
+            for yonetici in ilgili:
+                # Bellekteki işlem deposundan sil (O(1) mezar taşı); bakiye yalnızca işlem depodaysa
+                # düşülür, böylece aynı silmeyi senkronizasyonla da gören örnek iki kez düşmez
+                yonetici._defter_sil(id)
             
             print(f"🗑️ İşlem silindi: {id}")
             return True
+        except TimeoutError:
+            raise
         except Exception as exc:
             error_msg = str(exc)
             print(f"❌ İşlem silme hatası: {error_msg}")
@@ -333,52 +566,141 @@ class ButceYonetici:
 
     def gecmisi_yukle(self) -> None:
         """
-        Firestore'dan geçmiş işlemleri yükler ve bellekteki listeye ekler.
-        Bakiyeyi de günceller.
+        Depolamadan yöneticinin kullanıcısına ait geçmiş işlemleri yükler ve bellekteki listeye ekler
+        (genel görünümde tüm kullanıcılar). Bakiyeyi de günceller.
         """
         try:
-            db = get_db()
-            docs = db.collection(self.veritabaniYolu).order_by("Tarih").stream()
-            
-            self.islemler = []
-            self.bakiye = 0.0
-            
-            for doc in docs:
-                data = doc.to_dict()
-                transaction_id = doc.id
-                
-                # TransactionFactory ile Islem nesnesi oluştur
-                data["id"] = transaction_id
-                islem = TransactionFactory.create(data)
-                
-                # Bakiyeyi güncelle
-                if isinstance(islem, Gelir):
-                    self.bakiye += islem.tutar
-                elif isinstance(islem, Gider):
-                    self.bakiye -= islem.tutar
-                
-                self.islemler.append(islem)
-            
+            repo = get_repository()
+            # İşaret yüklemeden önce alınır; yükleme sırasındaki yazımlar sonraki senkronizasyonda gelir
+            isaret = repo.degisiklik_isareti()
+            docs = iter(repo.query_range(user_email=self.user_email))
+
+            # Yeni depo ve bakiye kilit dışında kurulur, sonunda tek adımda değiştirilir
+            depo = IslemDeposu()
+            bakiye = 0.0
+
+            while True:
+                parca = list(islice(docs, self.HIDRASYON_PARCASI))
+                if not parca:
+                    break
+                for transaction_id, data in parca:
+                    data["id"] = transaction_id
+                # TransactionFactory.create_many ile parça başına toplu Islem oluştur
+                for islem in TransactionFactory.create_many([data for _, data in parca]):
+                    if depo.ekle(islem):
+                        bakiye += self._hareket(islem)
+
+            with self._defter_lock:
+                # Yazımı süren/başarısız bekleyen işlemler yeni depoya taşınır; yükleme sırasında
+                # tamamlanan yazımlar işaretten sonra olduğu için sonraki senkronizasyonda gelir
+                for islem in self.islemler.bekleyenler():
+                    depo.ekle(islem)
+                self.islemler = depo
+                self.bakiye = bakiye
+            self._senkron_isareti = isaret
             print(f"📥 Geçmiş veriler yüklendi: {len(self.islemler)} işlem, Bakiye: {self.bakiye} TL")
         except Exception as exc:
             error_msg = str(exc)
             print(f"❌ Geçmiş yükleme hatası: {error_msg}")
 
+    def senkronize_et(self) -> int:
+        """
+        Bellekteki durumu depolamayla artımlı olarak eşitler: son işaretten sonraki eklemeler ve
+        silmeler uygulanır (O(değişiklik)). Hiç yükleme yapılmadıysa gecmisi_yukle ile tam yükler.
+        Bu örneğin kendi yazdığı (zaten bellekte olan) işlemler tekrar uygulanmaz.
+        Dönüş: uygulanan değişiklik sayısı.
+        """
+        with self._senkron_lock:
+            if self._senkron_isareti is None:
+                self.gecmisi_yukle()
+                return len(self.islemler)
+            try:
+                degisiklikler, isaret = get_repository().degisiklikler(self._senkron_isareti, user_email=self.user_email)
+                uygulanan = 0
+                yeniler = TransactionFactory.create_many(
+                    [{**data, "id": transaction_id} for tur, transaction_id, data in degisiklikler if tur == "ekle"]
+                )
+                yeni_islem = {islem.id: islem for islem in yeniler}
+                for tur, transaction_id, data in degisiklikler:
+                    if tur == "ekle":
+                        uygulanan += self._defter_ekle([yeni_islem[transaction_id]])
+                    elif tur == "sil" and self._defter_sil(transaction_id) is not None:
+                        uygulanan += 1
+                self._senkron_isareti = isaret
+                return uygulanan
+            except Exception as exc:
+                print(f"❌ Senkronizasyon hatası: {exc}")
+                return 0
+
+    def mutabakat(self, duzelt: bool = True) -> Dict[str, Any]:
+        """
+        Bellekteki bakiyeyi depolamayla karşılaştırır.
+        1) Bakiye, depodaki işlemlerin toplamıyla (IslemDeposu.net_toplam) aynı olmalıdır.
+        2) Önce senkronize_et ile depolamadaki değişiklikler alınır; ardından depo toplamı ve işlem
+           sayısı, depolamanın aylık özetlerinin toplamıyla (balance_aggregate) karşılaştırılır.
+        Süren yazımlar geçici fark yaratabileceği için fark görülünce bir kez daha senkronize edilir;
+        fark sürerse ve duzelt=True ise geçmiş depolamadan yeniden yüklenir.
+        Dönüş: { bakiye, depo_toplami, depolama_toplami, fark, islem_sayisi, depolama_islem_sayisi, duzeltildi }
+        """
+        repo = get_repository()
+        gunluk = get_yazim_gunlugu()
+        if gunluk is not None:
+            # WAL'da bekleyen yazımlar depolamanın özetlerinde henüz yoktur
+            gunluk.bosalt(self.GUNLUK_BEKLEME_SN)
+        duzeltildi = False
+        with self._defter_lock:
+            depo_toplami = self.islemler.net_toplam()
+            if abs(self.bakiye - depo_toplami) > self.MUTABAKAT_TOLERANSI:
+                print(f"⚠️ Bakiye işlem toplamından sapmış: {self.bakiye} TL / {depo_toplami} TL")
+                if duzelt:
+                    self.bakiye = depo_toplami
+                    duzeltildi = True
+
+        for _ in range(2):
+            self.senkronize_et()
+            ozet = repo.balance_aggregate(self.user_email)
+            depolama_toplami = float(ozet["Gelir_Toplam"]) - float(ozet["Gider_Toplam"])
+            with self._defter_lock:
+                bakiye = self.bakiye
+                islem_sayisi = len(self.islemler) - len(self.islemler.bekleyenler())
+            fark = bakiye - depolama_toplami
+            if abs(fark) <= self.MUTABAKAT_TOLERANSI and islem_sayisi == ozet["Islem_Sayisi"]:
+                break
+        else:
+            print(f"⚠️ Bakiye depolamayla uyuşmuyor: bellek {bakiye} TL, depolama {depolama_toplami} TL")
+            if duzelt:
+                with self._senkron_lock:
+                    self.gecmisi_yukle()
+                with self._defter_lock:
+                    bakiye = self.bakiye
+                    islem_sayisi = len(self.islemler) - len(self.islemler.bekleyenler())
+                fark = bakiye - depolama_toplami
+                duzeltildi = True
+
+        return {
+            "bakiye": round(bakiye, 2),
+            "depo_toplami": round(depo_toplami, 2),
+            "depolama_toplami": round(depolama_toplami, 2),
+            "fark": round(fark, 2),
+            "islem_sayisi": islem_sayisi,
+            "depolama_islem_sayisi": int(ozet["Islem_Sayisi"]),
+            "duzeltildi": duzeltildi,
+        }
+
     def veriyi_kaydet(self) -> None:
         """
-        Tüm işlemleri Firestore'a kaydeder.
-        csv_ye_yaz metodunu kullanır (her işlem için).
+        Henüz kaydedilmemiş (ID'si olmayan) tüm işlemleri depolamaya kaydeder.
+        Tek tek csv_ye_yaz yerine toplu yazım (_toplu_yaz) kullanır.
         """
         try:
+            # Eğer ID yoksa yeni kayıt, varsa güncelleme gerekir
+            bekleyenler = [i for i in self.islemler.bekleyenler() if isinstance(i, (Gelir, Gider))]
             kaydedilen = 0
-            for islem in self.islemler:
-                # Eğer ID yoksa yeni kayıt, varsa güncelleme gerekir
-                if not hasattr(islem, "id") or not islem.id:
-                    if isinstance(islem, Gelir):
-                        self.csv_ye_yaz(islem, "Gelir", "Gelir")
-                    elif isinstance(islem, Gider):
-                        self.csv_ye_yaz(islem, getattr(islem, "kategori", None), "Gider")
-                    kaydedilen += 1
+            for bas in range(0, len(bekleyenler), self.TOPLU_YAZIM_BOYUTU):
+                parca = bekleyenler[bas:bas + self.TOPLU_YAZIM_BOYUTU]
+                self._toplu_yaz(parca)
+                self._defter_kaydedildi(parca)
+                kaydedilen += len(parca)
             print(f"💾 Veriler kaydedildi: {kaydedilen} işlem")
         except Exception as exc:
             error_msg = str(exc)
@@ -386,15 +708,18 @@ class ButceYonetici:
 
     def gozlemcileri_duyur(self, mesaj: str) -> None:
         """
-        Tüm gözlemcilere bildirim gönderir.
+        Tüm gözlemcilere bildirim gönderir (birleştirme yapılmaz).
         Public metod - _bildirim_yayinla'yı çağırır.
         """
         self._bildirim_yayinla(mesaj)
 
-    def _bildirim_yayinla(self, mesaj):
-        bildirim = Bildirim(user_id=None, mesaj=mesaj)
-        for g in self.gozlemciler:
-            g.update(bildirim)
+    def _bildirim_yayinla(self, mesaj, anahtar=None, durum: int = 1):
+        """
+        Bildirimi dağıtıcı kuyruğuna ekler; gözlemciler arka plan iş parçacığında güncellenir.
+        anahtar verilirse (ör. kullanıcı+ay eşiği) yalnızca durum yükseldiğinde yayınlanır.
+        """
+        bildirim = Bildirim(user_id=self.user_email, mesaj=mesaj)
+        get_bildirim_dagitici().yayinla(self.gozlemciler, bildirim, anahtar=anahtar, durum=durum)
 
     def bakiye_goster(self):
         print(f"\n💰 Güncel Bakiye: {self.bakiye} TL")
@@ -408,25 +733,98 @@ class ButceYonetici:
 
 
 # --- RAPORLAMA ---
-class Rapor:
+class Rapor(ABC):
+    """
+    Depolamadaki işlemleri dışa aktaran rapor. akit() belgeleri parça parça okur ve çıktıyı bytes
+    parçaları halinde üretir; geçmişin tamamı hiçbir zaman belleğe alınmaz. Her rapor tipi akit()'i
+    uygulamak zorundadır (uygulamayan alt sınıf örneklenemez).
+    """
+    uzanti = ""
+    media_type = "application/octet-stream"
+    SUTUNLAR = ("Tarih", "Islem_Tipi", "Kategori", "Aciklama", "Tutar", "Kaynak", "User_Email", "id")
+    PARCA_SATIR = 1000  # bir çıktı parçasındaki satır sayısı
+
     def olustur(self): pass
 
+    @abstractmethod
+    def akit(self, belgeler: Iterable[Tuple[str, Dict[str, Any]]]) -> Iterator[bytes]:
+        """Belgeleri (transaction_id, data) sırasıyla okur, çıktıyı bytes parçaları olarak üretir."""
+
+    @classmethod
+    def satir(cls, transaction_id: str, data: Dict[str, Any]) -> List[Any]:
+        return [transaction_id if alan == "id" else data.get(alan) for alan in cls.SUTUNLAR]
+
+
+class CSVRapor(Rapor):
+    uzanti = "csv"
+    media_type = "text/csv; charset=utf-8"
+
+    def olustur(self): return "🧾 CSV Raporu oluşturuldu."
+
+    def akit(self, belgeler: Iterable[Tuple[str, Dict[str, Any]]]) -> Iterator[bytes]:
+        tampon = io.StringIO()
+        yazici = csv.writer(tampon)
+        # BOM: Excel'in Türkçe karakterleri UTF-8 olarak açması için
+        tampon.write("\ufeff")
+        yazici.writerow(self.SUTUNLAR)
+        for i, (transaction_id, data) in enumerate(belgeler, 1):
+            satir = self.satir(transaction_id, data)
+            tarih = satir[0]
+            if isinstance(tarih, datetime):
+                satir[0] = tarih.isoformat()
+            yazici.writerow(satir)
+            if i % self.PARCA_SATIR == 0:
+                yield tampon.getvalue().encode("utf-8")
+                tampon.seek(0)
+                tampon.truncate()
+        if tampon.tell():
+            yield tampon.getvalue().encode("utf-8")
+
 
 class ExcelRapor(Rapor):
-    def olustur(self): return "📊 Excel Raporu oluşturuldu."
+    """
+    openpyxl write-only modu (requirements.txt; kurulu değilse 501 döner). Satırlar sabit bellekle
+    geçici bir dosyaya yazılır, ardından dosya parça parça okunur.
+    """
+    uzanti = "xlsx"
+    media_type = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+    DOSYA_PARCASI = 1 << 16
 
+    def olustur(self): return "📊 Excel Raporu oluşturuldu."
 
-class PDFRapor(Rapor):
-    def olustur(self): return "📄 PDF Raporu oluşturuldu."
+    def akit(self, belgeler: Iterable[Tuple[str, Dict[str, Any]]]) -> Iterator[bytes]:
+        try:
+            from openpyxl import Workbook  # type: ignore
+        except ImportError as exc:
+            raise RuntimeError("XLSX raporu için openpyxl gerekli (pip install openpyxl).") from exc
+
+        kitap = Workbook(write_only=True)
+        sayfa = kitap.create_sheet("Islemler")
+        sayfa.append(list(self.SUTUNLAR))
+        for transaction_id, data in belgeler:
+            satir = self.satir(transaction_id, data)
+            tarih = satir[0]
+            if isinstance(tarih, datetime) and tarih.tzinfo is not None:
+                # Excel saat dilimi tutmaz; UTC'ye çevrilmiş yerel değer yazılır
+                satir[0] = tarih.astimezone(timezone.utc).replace(tzinfo=None)
+            sayfa.append(satir)
+        with tempfile.TemporaryFile(suffix=".xlsx") as dosya:
+            kitap.save(dosya)
+            dosya.seek(0)
+            while True:
+                parca = dosya.read(self.DOSYA_PARCASI)
+                if not parca:
+                    break
+                yield parca
 
 
 class RaporFactory:
     @staticmethod
     def rapor_uret(tip):
-        if tip == "excel":
+        if tip in ("excel", "xlsx"):
             return ExcelRapor()
-        elif tip == "pdf":
-            return PDFRapor()
+        elif tip == "csv":
+            return CSVRapor()
         return None
 
 
@@ -463,3 +861,73 @@ class TransactionFactory:
             return Gider(tutar=float(tutar), aciklama=aciklama, kategori=kategori, tarih_str=tarih, user_email=user_email, zorunluMu=bool(zorunluMu), id=transaction_id)
         else:
             raise ValueError("Geçersiz islem_tipi. 'Gelir' veya 'Gider' olmalı.")
+
+    # create_many için mantıksal alan -> (API yazımı, depolama yazımı)
+    _ALAN_YAZIMLARI = {
+        "tip": ("islem_tipi", "Islem_Tipi"),
+        "tutar": ("tutar", "Tutar"),
+        "aciklama": ("aciklama", "Aciklama"),
+        "tarih": ("tarih", "Tarih"),
+        "id": ("id", "Id"),
+        "user_email": ("user_email", "User_Email"),
+        "kaynak": ("kaynak", "Kaynak"),
+        "duzenliMi": ("duzenliMi", "DuzenliMi"),
+        "kategori": ("kategori", "Kategori"),
+        "zorunluMu": ("zorunluMu", "ZorunluMu"),
+    }
+
+    @staticmethod
+    def _bayrak(deger: Any) -> bool:
+        if isinstance(deger, str):
+            return deger.lower() in ("true", "evet", "yes", "1")
+        return bool(deger)
+
+    @classmethod
+    def create_many(cls, datas: List[Dict[str, Any]]) -> List[Islem]:
+        """
+        Toplu hidrasyon (ör. gecmisi_yukle). Alan yazımı ('tutar' / 'Tutar') partideki belgelerin
+        anahtarlarının birleşimine bakılarak alan başına bir kez çözülür; ilk belgede bulunmayan alanlar
+        (ör. Gider'le başlayan bir partide Gelir'in kaynak'ı) da bulunur. Aynı alanı iki yazımla da içeren
+        partiler create() ile satır satır oluşturulur. Geçersiz islem_tipi create() ile aynı ValueError'u fırlatır.
+        """
+        if not datas:
+            return []
+        anahtarlar = set().union(*datas)
+        k: Dict[str, str] = {}
+        for alan, (api, depo) in cls._ALAN_YAZIMLARI.items():
+            if api in anahtarlar and depo in anahtarlar:
+                return [cls.create(data) for data in datas]
+            k[alan] = depo if depo in anahtarlar else api
+        tip_k, tutar_k, aciklama_k, tarih_k, id_k = k["tip"], k["tutar"], k["aciklama"], k["tarih"], k["id"]
+        user_k, kaynak_k, duzenli_k, kategori_k, zorunlu_k = k["user_email"], k["kaynak"], k["duzenliMi"], k["kategori"], k["zorunluMu"]
+        bayrak = cls._bayrak
+
+        islemler: List[Islem] = []
+        ekle = islemler.append
+        for data in datas:
+            tip = data.get(tip_k)
+            if tip != "Gelir" and tip != "Gider":
+                tip = (tip or "").strip().capitalize()
+                if tip not in ("Gelir", "Gider"):
+                    raise ValueError("Geçersiz islem_tipi. 'Gelir' veya 'Gider' olmalı.")
+            if tip == "Gelir":
+                ekle(Gelir(
+                    tutar=float(data.get(tutar_k)),
+                    aciklama=data.get(aciklama_k),
+                    kaynak=data.get(kaynak_k),
+                    tarih_str=data.get(tarih_k),
+                    user_email=data.get(user_k),
+                    duzenliMi=bayrak(data.get(duzenli_k, False)),
+                    id=data.get(id_k),
+                ))
+            else:
+                ekle(Gider(
+                    tutar=float(data.get(tutar_k)),
+                    aciklama=data.get(aciklama_k),
+                    kategori=data.get(kategori_k),
+                    tarih_str=data.get(tarih_k),
+                    user_email=data.get(user_k),
+                    zorunluMu=bayrak(data.get(zorunlu_k, False)),
+                    id=data.get(id_k),
+                ))
+        return islemler
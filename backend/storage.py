@@ -0,0 +1,1180 @@
+"""
+İşlem verisi için depolama katmanı.
+
+Uygulamanın geri kalanı Firestore'a doğrudan değil, ``get_repository()`` ile alınan
+``TransactionRepository`` arayüzüne erişir. Arka uç ``STORAGE_BACKEND`` ortam değişkeni ile seçilir:
+
+- ``firestore`` (varsayılan): canlı Firestore (``backend.firebase_config.get_db``)
+- ``sqlite``: ``SQLITE_PATH`` ile verilen yerel dosya (varsayılan ``cebimdekiveri.db``)
+- ``memory``: süreç içi SQLite (``:memory:``), testler ve yük denemeleri için
+
+Belgeler her arka uçta aynı alan adlarıyla (User_Email, Tarih, Kategori, Tutar, Islem_Tipi, ...)
+``(belge_id, veri)`` ikilileri olarak döner; ``Tarih`` her zaman ``datetime``'dır.
+Aylık özetler (monthly_aggregates) ve dönem özetleri (rollups: kullanıcı başına gün / ISO hafta /
+ay / yıl; gelir, gider, adet ve kategori toplamları) işlem yazımıyla aynı atomik adımda güncellenir.
+Dönem özetleri ``rebuild_rollups`` ile ham işlemlerden yeniden derlenir (backend.donem_ozetleri).
+
+Her yazım ve silme bir değişiklik kaydı da bırakır (``degisiklikler``); bellekte durum tutan
+okuyucular (ör. ButceYonetici) tam yeniden yükleme yerine yalnızca son işaretten sonraki
+değişiklikleri uygular.
+"""
+import json
+import os
+import sqlite3
+import threading
+import uuid
+from abc import ABC, abstractmethod
+from datetime import date, datetime, timedelta, timezone
+from itertools import islice
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from backend.concurrency import get_limiter
+from backend.kategori import get_kategori_tablosu
+
+Belge = Tuple[str, Dict[str, Any]]
+# Sayfalama imleci: son görülen belgenin (Tarih, belge_id) ikilisi
+Imlec = Tuple[datetime, str]
+# Değişiklik: ("ekle", belge_id, veri) veya ("sil", belge_id, None)
+Degisiklik = Tuple[str, str, Optional[Dict[str, Any]]]
+
+TRANSACTIONS = "transactions"
+MONTHLY_AGGREGATES = "monthly_aggregates"
+TRANSACTION_CHANGES = "transaction_changes"
+TRANSACTION_TOMBSTONES = "transaction_tombstones"
+NOTIFICATIONS = "notifications"
+ROLLUPS = "rollups"
+ROLLUP_CATEGORIES = "rollup_categories"  # SQLite; Firestore'da rollup belgesinin Kategoriler alanı
+ROLLUP_META = "rollup_meta"
+
+# Dönem özeti seviyeleri; hafta pazartesi başlar (ISO hafta)
+ROLLUP_SEVIYELERI = ("day", "week", "month", "year")
+
+# Firestore tek bir batch'te en fazla 500 yazma işlemine izin verir
+FIRESTORE_BATCH_LIMIT = 500
+
+
+def aylik_ozet_anahtari(user_email: Optional[str], yil: int, ay: int) -> str:
+    """Kullanıcı+ay özet kaydının anahtarı, örn. 'ali@x.com_2024-05'."""
+    kullanici = (user_email or "anonim").replace("/", "_")
+    return f"{kullanici}_{yil:04d}-{ay:02d}"
+
+
+def ay_araligi(yil: int, ay: int) -> Tuple[datetime, datetime]:
+    """Verilen ayın [başlangıç, sonraki ayın başı) aralığı."""
+    return datetime(yil, ay, 1), datetime(yil + (ay // 12), ay % 12 + 1, 1)
+
+
+def _ozet_deltasi(data: Dict[str, Any]) -> Optional[Tuple[Optional[str], int, int, str, float]]:
+    """Belgenin aylık özete katkısı: (user_email, yil, ay, tip, tutar); katkısı yoksa None."""
+    tip = data.get("Islem_Tipi")
+    tarih = data.get("Tarih")
+    if tip not in ("Gelir", "Gider") or not isinstance(tarih, datetime):
+        return None
+    return data.get("User_Email"), tarih.year, tarih.month, tip, float(data.get("Tutar", 0) or 0)
+
+
+def donem_baslangici(tarih: Any, seviye: str) -> date:
+    """Tarihin ait olduğu dönemin ilk günü (week: ISO haftanın pazartesisi)."""
+    gun = tarih.date() if isinstance(tarih, datetime) else tarih
+    if seviye == "day":
+        return gun
+    if seviye == "week":
+        return gun - timedelta(days=gun.weekday())
+    if seviye == "month":
+        return gun.replace(day=1)
+    if seviye == "year":
+        return gun.replace(month=1, day=1)
+    raise ValueError(f"Bilinmeyen dönem seviyesi: {seviye} ({', '.join(ROLLUP_SEVIYELERI)} olmalı)")
+
+
+def rollup_anahtari(user_email: Optional[str], seviye: str, donem: str) -> str:
+    """Dönem özeti kaydının anahtarı, örn. 'ali@x.com_week_2024-04-29'."""
+    kullanici = (user_email or "anonim").replace("/", "_")
+    return f"{kullanici}_{seviye}_{donem}"
+
+
+# (user_email, seviye, dönem) -> [gelir, gider, adet, {kategori_id: [tutar, adet]}]
+# Kayıtlarda kategori başına kanonik ad (Ad) da saklanır; başka süreçte yazılmış kimlikler okuyucuda
+# bu addan öğrenilir (KategoriTablosu.belge_kimlikleri ile aynı yaklaşım)
+RollupSatiri = List[Any]
+
+
+class _RollupBirikimi:
+    """Belgelerin dört seviyedeki dönem özetlerine katkılarını toplar (toplu yazım ve yeniden derleme için)."""
+
+    def __init__(self):
+        self.satirlar: Dict[Tuple[Optional[str], str, str], RollupSatiri] = {}
+
+    def anahtarlar(self, data: Dict[str, Any]) -> List[Tuple[Optional[str], str, str]]:
+        tarih = data.get("Tarih")
+        if data.get("Islem_Tipi") not in ("Gelir", "Gider") or not isinstance(tarih, datetime):
+            return []
+        user_email = data.get("User_Email")
+        return [(user_email, seviye, donem_baslangici(tarih, seviye).isoformat()) for seviye in ROLLUP_SEVIYELERI]
+
+    def ekle(self, data: Dict[str, Any], isaret: int = 1) -> None:
+        anahtarlar = self.anahtarlar(data)
+        if not anahtarlar:
+            return
+        tutar = isaret * float(data.get("Tutar", 0) or 0)
+        gider = data.get("Islem_Tipi") == "Gider"
+        kategori = get_kategori_tablosu().belge_kategorisi(data).id if gider else None
+        for anahtar in anahtarlar:
+            satir = self.satirlar.get(anahtar)
+            if satir is None:
+                satir = self.satirlar[anahtar] = [0.0, 0.0, 0, {}]
+            satir[1 if gider else 0] += tutar
+            satir[2] += isaret
+            if kategori is not None:
+                kova = satir[3].setdefault(kategori, [0.0, 0])
+                kova[0] += tutar
+                kova[1] += isaret
+
+
+def _rollup_kaydi(user_email: Optional[str], seviye: str, donem: str, satir: RollupSatiri) -> Dict[str, Any]:
+    tablo = get_kategori_tablosu()
+    return {
+        "User_Email": user_email,
+        "Seviye": seviye,
+        "Donem": donem,
+        "Gelir_Toplam": satir[0],
+        "Gider_Toplam": satir[1],
+        "Islem_Sayisi": satir[2],
+        "Kategoriler": {
+            k: {"Tutar": v[0], "Adet": v[1], "Ad": tablo.ad(k)} for k, v in satir[3].items() if v[1] > 0
+        },
+    }
+
+
+def _bos_ozet(user_email: Optional[str], yil: int, ay: int) -> Dict[str, Any]:
+    return {
+        "User_Email": user_email,
+        "Yil": yil,
+        "Ay": ay,
+        "Gelir_Toplam": 0.0,
+        "Gider_Toplam": 0.0,
+        "Islem_Sayisi": 0,
+    }
+
+
+class TransactionRepository(ABC):
+    """İşlem belgeleri ve aylık özetler için depolama arayüzü."""
+
+    name = "abstract"
+
+    @abstractmethod
+    def add(self, data: Dict[str, Any]) -> str:
+        """İşlemi ve ait olduğu aylık özeti atomik olarak yazar, yeni belge ID'sini döndürür."""
+
+    def add_many(self, datas: List[Dict[str, Any]], ids: Optional[List[str]] = None) -> List[str]:
+        """
+        Birden çok işlemi toplu yazar; aylık özetler parça başına bir kez güncellenir.
+        ids verilirse belgeler bu ID'lerle yazılır (yazım-arkası günlüğü ID'yi önceden atar).
+        Varsayılan uygulama tek tek add() çağırır, arka uçlar toplu yazım ile geçersiz kılar.
+        """
+        if ids is not None:
+            raise NotImplementedError(f"{type(self).__name__} önceden atanmış ID ile yazımı desteklemiyor.")
+        return [self.add(data) for data in datas]
+
+    @abstractmethod
+    def get(self, doc_id: str) -> Optional[Dict[str, Any]]:
+        """Belgeyi döndürür; yoksa None."""
+
+    @abstractmethod
+    def delete(self, doc_id: str) -> Optional[Dict[str, Any]]:
+        """Belgeyi siler ve aylık özeti geri alır. Silinen veriyi, belge yoksa None döndürür."""
+
+    @abstractmethod
+    def query_range(
+        self,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        user_email: Optional[str] = None,
+        islem_tipi: Optional[str] = None,
+        kategori: Optional[str] = None,
+        after: Optional[Imlec] = None,
+        limit: Optional[int] = None,
+    ) -> Iterator[Belge]:
+        """
+        (Tarih, belge_id) sırasıyla [start, end) aralığındaki belgeleri akıtır.
+        user_email / islem_tipi / kategori verilirse eşitlik filtresi uygular.
+        after=(Tarih, belge_id) imleci verilirse o belgeden sonrasından başlar; limit en fazla kaç belge döneceğidir.
+        """
+
+    def stream(self) -> Iterator[Belge]:
+        """Tüm belgeleri Tarih sırasıyla akıtır."""
+        return self.query_range()
+
+    @abstractmethod
+    def monthly_aggregate(self, user_email: Optional[str], yil: int, ay: int) -> Dict[str, Any]:
+        """Kullanıcının ilgili aya ait özetini döndürür (Gelir_Toplam, Gider_Toplam, Islem_Sayisi)."""
+
+    @abstractmethod
+    def balance_aggregate(self, user_email: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Kullanıcının tüm aylık özetlerinin toplamı (Gelir_Toplam, Gider_Toplam, Islem_Sayisi);
+        user_email verilmezse tüm kullanıcılar. Bellekteki bakiyenin mutabakatında kullanılır.
+        """
+
+    @abstractmethod
+    def rollups(
+        self,
+        seviye: str,
+        user_email: Optional[str] = None,
+        start: Optional[date] = None,
+        end: Optional[date] = None,
+        kategoriler: bool = True,
+    ) -> List[Dict[str, Any]]:
+        """
+        Seviyedeki (day/week/month/year) dönem özetleri, Donem sırasıyla. Her kayıt: User_Email, Seviye,
+        Donem ('YYYY-MM-DD', dönemin ilk günü), Gelir_Toplam, Gider_Toplam, Islem_Sayisi ve
+        Kategoriler {Kategori_Id: {Tutar, Adet, Ad}}. user_email verilmezse tüm kullanıcıların kayıtları
+        (kullanıcı başına ayrı) döner. start/end dönem başlangıcına [start, end) filtresidir.
+        kategoriler=False ise Kategoriler okunmaz (boş döner); yalnızca gelir/gider gereken seriler için.
+        """
+
+    @abstractmethod
+    def rebuild_rollups(self, user_email: Optional[str] = None) -> int:
+        """
+        Dönem özetlerini ham işlemlerden yeniden derler ve eskilerinin yerine yazar (sıkıştırma);
+        user_email verilmezse tümü. Tümü derlendiğinde özetler hazır işaretlenir. Dönüş: yazılan kayıt sayısı.
+        """
+
+    @abstractmethod
+    def rollups_hazir(self) -> bool:
+        """
+        Dönem özetleri tüm geçmişi kapsıyor mu. Özet tutulmadan önce yazılmış veri varsa ilk tam
+        derlemeye kadar False'tur; okuyucular bu durumda ham işlemlere döner.
+        """
+
+    @abstractmethod
+    def add_notifications(self, kayitlar: List[Dict[str, Any]]) -> None:
+        """Bildirim kayıtlarını (User_Email, Mesaj, Tarih, Okundu) toplu yazar."""
+
+    @abstractmethod
+    def degisiklik_isareti(self) -> Any:
+        """
+        Şu anki yüksek su işareti. Tam yüklemeden ÖNCE alınır; degisiklikler(isaret) yükleme
+        sırasında yapılan yazımları da döndürür (uygulama tarafı tekrarları yok saymalıdır).
+        """
+
+    @abstractmethod
+    def degisiklikler(self, isaret: Any, user_email: Optional[str] = None) -> Tuple[List[Degisiklik], Any]:
+        """
+        isaret'ten sonraki ekleme/silmeleri oluş sırasıyla ve yeni işareti döndürür.
+        user_email verilirse yalnızca o kullanıcının değişiklikleri. Maliyet O(değişiklik)'tir.
+        """
+
+    @abstractmethod
+    def ping(self) -> None:
+        """Arka uca hafif bir erişim yapar; bağlantı yoksa hata fırlatır."""
+
+
+# --- FIRESTORE ---
+class FirestoreTransactionRepository(TransactionRepository):
+    """
+    Değişiklik akışı: her belge yazımda ``Guncelleme`` (sunucu zamanı) alanı alır, silinen belgeler
+    için transaction_tombstones koleksiyonuna ``Silinme`` zamanlı bir kayıt bırakılır. Sunucu zaman
+    damgaları commit sırasıyla görünür olmayabileceğinden sorgular DEGISIKLIK_PAYI kadar geriden başlar.
+    """
+
+    name = "firestore"
+    DEGISIKLIK_PAYI = timedelta(seconds=5)
+
+    def __init__(self, db=None):
+        self._db = db
+        self._rollups_hazir = False
+
+    @property
+    def db(self):
+        if self._db is None:
+            from backend.firebase_config import get_db
+            self._db = get_db()
+        return self._db
+
+    def _ozet_ref(self, user_email: Optional[str], yil: int, ay: int):
+        return self.db.collection(MONTHLY_AGGREGATES).document(aylik_ozet_anahtari(user_email, yil, ay))
+
+    def _rollup_ref(self, user_email: Optional[str], seviye: str, donem: str):
+        return self.db.collection(ROLLUPS).document(rollup_anahtari(user_email, seviye, donem))
+
+    def _rollup_artislari(self, birikim: _RollupBirikimi, batch) -> None:
+        """Birikimdeki dönem özeti katkılarını batch'e Increment olarak ekler."""
+        from firebase_admin import firestore  # type: ignore
+
+        tablo = get_kategori_tablosu()
+        for (user_email, seviye, donem), satir in birikim.satirlar.items():
+            alanlar: Dict[str, Any] = {
+                "User_Email": user_email,
+                "Seviye": seviye,
+                "Donem": donem,
+                "Gelir_Toplam": firestore.Increment(satir[0]),
+                "Gider_Toplam": firestore.Increment(satir[1]),
+                "Islem_Sayisi": firestore.Increment(satir[2]),
+            }
+            if satir[3]:
+                alanlar["Kategoriler"] = {
+                    str(k): {"Tutar": firestore.Increment(v[0]), "Adet": firestore.Increment(v[1]), "Ad": tablo.ad(k)}
+                    for k, v in satir[3].items()
+                }
+            batch.set(self._rollup_ref(user_email, seviye, donem), alanlar, merge=True)
+
+    def _ozet_artis(self, data: Dict[str, Any], isaret: int) -> Optional[Dict[str, Any]]:
+        from firebase_admin import firestore  # type: ignore
+
+        tip = data.get("Islem_Tipi")
+        if tip not in ("Gelir", "Gider") or not isinstance(data.get("Tarih"), datetime):
+            return None
+        return {
+            f"{tip}_Toplam": firestore.Increment(isaret * float(data.get("Tutar", 0) or 0)),
+            "Islem_Sayisi": firestore.Increment(isaret),
+        }
+
+    def add(self, data: Dict[str, Any]) -> str:
+        tarih = data.get("Tarih")
+        user_email = data.get("User_Email")
+        artis = self._ozet_artis(data, +1)
+        # Eski (özetsiz) aylar için önce özet belgesini hazırla; aksi halde Increment geçmişi kaybeder
+        if artis is not None:
+            self.monthly_aggregate(user_email, tarih.year, tarih.month)
+        doc_ref = self.db.collection(TRANSACTIONS).document()
+        batch = self.db.batch()
+        batch.set(doc_ref, self._damgali(data))
+        if artis is not None:
+            batch.set(self._ozet_ref(user_email, tarih.year, tarih.month), artis, merge=True)
+            birikim = _RollupBirikimi()
+            birikim.ekle(data, +1)
+            self._rollup_artislari(birikim, batch)
+        batch.commit()
+        return doc_ref.id
+
+    def add_many(self, datas: List[Dict[str, Any]], ids: Optional[List[str]] = None) -> List[str]:
+        """
+        Belgeleri FIRESTORE_BATCH_LIMIT'i aşmayan batch'lere böler. Her batch, içindeki belgeler ve
+        dokunduğu her kullanıcı+ay özeti ile dönem özeti için tek bir Increment yazar; batch'ler kendi
+        içinde atomiktir.
+        """
+        from firebase_admin import firestore  # type: ignore
+
+        deltalar = [_ozet_deltasi(d) for d in datas]
+        # Özetsiz eski aylar önce (anahtar başına bir kez) hazırlanır
+        for anahtar in {(d[0], d[1], d[2]) for d in deltalar if d is not None}:
+            self.monthly_aggregate(*anahtar)
+
+        verilen_ids = ids
+        ids = []
+        parca: List[Tuple[Any, Dict[str, Any]]] = []
+        ozetler: Dict[Tuple[Optional[str], int, int], Dict[str, float]] = {}
+        birikim = _RollupBirikimi()
+
+        def yaz() -> None:
+            batch = self.db.batch()
+            for ref, data in parca:
+                batch.set(ref, self._damgali(data))
+            for (user_email, yil, ay), toplam in ozetler.items():
+                alanlar = {f"{tip}_Toplam": firestore.Increment(v) for tip, v in toplam.items() if tip != "adet"}
+                alanlar["Islem_Sayisi"] = firestore.Increment(int(toplam["adet"]))
+                batch.set(self._ozet_ref(user_email, yil, ay), alanlar, merge=True)
+            self._rollup_artislari(birikim, batch)
+            batch.commit()
+            ids.extend(ref.id for ref, _ in parca)
+            parca.clear()
+            ozetler.clear()
+            birikim.satirlar.clear()
+
+        for i, (data, delta) in enumerate(zip(datas, deltalar)):
+            yeni_ozet = delta is not None and (delta[0], delta[1], delta[2]) not in ozetler
+            yeni_rollup = sum(1 for a in birikim.anahtarlar(data) if a not in birikim.satirlar)
+            if len(parca) + len(ozetler) + len(birikim.satirlar) + 1 + int(yeni_ozet) + yeni_rollup > FIRESTORE_BATCH_LIMIT:
+                yaz()
+            koleksiyon = self.db.collection(TRANSACTIONS)
+            parca.append((koleksiyon.document(verilen_ids[i]) if verilen_ids else koleksiyon.document(), data))
+            birikim.ekle(data, +1)
+            if delta is not None:
+                user_email, yil, ay, tip, tutar = delta
+                toplam = ozetler.setdefault((user_email, yil, ay), {"adet": 0})
+                toplam[tip] = toplam.get(tip, 0.0) + tutar
+                toplam["adet"] += 1
+        if parca:
+            yaz()
+        return ids
+
+    def get(self, doc_id: str) -> Optional[Dict[str, Any]]:
+        doc = self.db.collection(TRANSACTIONS).document(doc_id).get()
+        if not doc.exists:
+            return None
+        return self._veri(doc)
+
+    def delete(self, doc_id: str) -> Optional[Dict[str, Any]]:
+        doc_ref = self.db.collection(TRANSACTIONS).document(doc_id)
+        doc = doc_ref.get()
+        if not doc.exists:
+            return None
+        data = self._veri(doc)
+        tarih = data.get("Tarih")
+        user_email = data.get("User_Email")
+        artis = self._ozet_artis(data, -1)
+        if artis is not None:
+            # Özet belgesi yoksa önce mevcut aydan (silinecek belge dahil) oluştur
+            self.monthly_aggregate(user_email, tarih.year, tarih.month)
+        batch = self.db.batch()
+        batch.delete(doc_ref)
+        batch.set(self.db.collection(TRANSACTION_TOMBSTONES).document(doc_id), self._mezar_tasi(user_email))
+        if artis is not None:
+            batch.set(self._ozet_ref(user_email, tarih.year, tarih.month), artis, merge=True)
+            birikim = _RollupBirikimi()
+            birikim.ekle(data, -1)
+            self._rollup_artislari(birikim, batch)
+        batch.commit()
+        return data
+
+    def query_range(
+        self,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        user_email: Optional[str] = None,
+        islem_tipi: Optional[str] = None,
+        kategori: Optional[str] = None,
+        after: Optional[Imlec] = None,
+        limit: Optional[int] = None,
+    ) -> Iterator[Belge]:
+        """Filtreler sunucu tarafında uygulanır; gerekli bileşik indeksler firestore.indexes.json içindedir."""
+        from firebase_admin import firestore  # type: ignore
+
+        query = self.db.collection(TRANSACTIONS)
+        for alan, deger in (("User_Email", user_email), ("Islem_Tipi", islem_tipi), ("Kategori", kategori)):
+            if deger is not None:
+                query = query.where(filter=firestore.FieldFilter(alan, "==", deger))
+        if start is not None:
+            query = query.where(filter=firestore.FieldFilter("Tarih", ">=", start))
+        if end is not None:
+            query = query.where(filter=firestore.FieldFilter("Tarih", "<", end))
+        query = query.order_by("Tarih").order_by("__name__")
+        if after is not None:
+            query = query.start_after({"Tarih": after[0], "__name__": after[1]})
+        if limit is not None:
+            query = query.limit(limit)
+        for d in query.stream():
+            yield d.id, self._veri(d)
+
+    def monthly_aggregate(self, user_email: Optional[str], yil: int, ay: int) -> Dict[str, Any]:
+        """
+        Özet belgesi yoksa (özet tutulmadan önce yazılmış veriler) yalnızca o ayın aralığı
+        sorgulanarak bir kez oluşturulur; sonraki tüm çağrılar tek belge okur.
+        """
+        ref = self._ozet_ref(user_email, yil, ay)
+        snap = ref.get()
+        if snap.exists:
+            return snap.to_dict() or {}
+
+        ozet = _bos_ozet(user_email, yil, ay)
+        ay_basi, sonraki_ay = ay_araligi(yil, ay)
+        # Kullanıcı filtresi sorguda uygulanır ((User_Email, Tarih) bileşik indeksi); None için
+        # sorgu filtresiz kalır, kullanıcısız belgeler aşağıda ayıklanır
+        for _, data in self.query_range(ay_basi, sonraki_ay, user_email=user_email):
+            if data.get("User_Email") != user_email:
+                continue
+            tip = data.get("Islem_Tipi")
+            if tip not in ("Gelir", "Gider"):
+                continue
+            try:
+                ozet[f"{tip}_Toplam"] += float(data.get("Tutar", 0))
+            except Exception:
+                continue
+            ozet["Islem_Sayisi"] += 1
+        # create() belge zaten varsa (eşzamanlı oluşturma) hata verir; o durumda mevcut değeri oku
+        try:
+            ref.create(ozet)
+        except Exception:
+            snap = ref.get()
+            if snap.exists:
+                return snap.to_dict() or {}
+        return ozet
+
+    @staticmethod
+    def _veri(doc) -> Dict[str, Any]:
+        """Belge verisi; değişiklik akışının iç alanı (Guncelleme) dışarı verilmez."""
+        data = doc.to_dict() or {}
+        data.pop("Guncelleme", None)
+        return data
+
+    @staticmethod
+    def _damgali(data: Dict[str, Any]) -> Dict[str, Any]:
+        from firebase_admin import firestore  # type: ignore
+
+        return {**data, "Guncelleme": firestore.SERVER_TIMESTAMP}
+
+    @staticmethod
+    def _mezar_tasi(user_email: Optional[str]) -> Dict[str, Any]:
+        from firebase_admin import firestore  # type: ignore
+
+        return {"User_Email": user_email, "Silinme": firestore.SERVER_TIMESTAMP}
+
+    def balance_aggregate(self, user_email: Optional[str] = None) -> Dict[str, Any]:
+        """Özet belgeleri (kullanıcı başına ay sayısı kadar) okunup toplanır; özeti hiç oluşmamış eski aylar dahil değildir."""
+        from firebase_admin import firestore  # type: ignore
+
+        query = self.db.collection(MONTHLY_AGGREGATES)
+        if user_email is not None:
+            query = query.where(filter=firestore.FieldFilter("User_Email", "==", user_email))
+        toplam = {"Gelir_Toplam": 0.0, "Gider_Toplam": 0.0, "Islem_Sayisi": 0}
+        for d in query.stream():
+            ozet = d.to_dict() or {}
+            toplam["Gelir_Toplam"] += float(ozet.get("Gelir_Toplam", 0) or 0)
+            toplam["Gider_Toplam"] += float(ozet.get("Gider_Toplam", 0) or 0)
+            toplam["Islem_Sayisi"] += int(ozet.get("Islem_Sayisi", 0) or 0)
+        return toplam
+
+    def rollups(
+        self,
+        seviye: str,
+        user_email: Optional[str] = None,
+        start: Optional[date] = None,
+        end: Optional[date] = None,
+        kategoriler: bool = True,
+    ) -> List[Dict[str, Any]]:
+        from firebase_admin import firestore  # type: ignore
+
+        query = self.db.collection(ROLLUPS).where(filter=firestore.FieldFilter("Seviye", "==", seviye))
+        if user_email is not None:
+            query = query.where(filter=firestore.FieldFilter("User_Email", "==", user_email))
+        if start is not None:
+            query = query.where(filter=firestore.FieldFilter("Donem", ">=", start.isoformat()))
+        if end is not None:
+            query = query.where(filter=firestore.FieldFilter("Donem", "<", end.isoformat()))
+        if not kategoriler:
+            query = query.select(["User_Email", "Seviye", "Donem", "Gelir_Toplam", "Gider_Toplam", "Islem_Sayisi"])
+        kayitlar = []
+        for d in query.order_by("Donem").stream():
+            kayit = d.to_dict() or {}
+            if int(kayit.get("Islem_Sayisi", 0) or 0) <= 0:
+                continue
+            kayit["Kategoriler"] = {
+                int(k): {"Tutar": float(v.get("Tutar", 0) or 0), "Adet": int(v.get("Adet", 0) or 0), "Ad": v.get("Ad")}
+                for k, v in (kayit.get("Kategoriler") or {}).items()
+                if int(v.get("Adet", 0) or 0) > 0
+            }
+            kayitlar.append(kayit)
+        return kayitlar
+
+    def rebuild_rollups(self, user_email: Optional[str] = None) -> int:
+        """
+        Özetler ham işlemlerden hesaplanıp batch'lerle üzerine yazılır, artık karşılığı olmayan
+        kayıtlar silinir. Derleme sırasında gelen yazımlar bir sonraki derlemede düzelir.
+        """
+        from firebase_admin import firestore  # type: ignore
+
+        birikim = _RollupBirikimi()
+        for _, data in self.query_range(user_email=user_email):
+            birikim.ekle(data, +1)
+        yeni = {rollup_anahtari(*anahtar) for anahtar in birikim.satirlar}
+
+        eski = self.db.collection(ROLLUPS)
+        if user_email is not None:
+            eski = eski.where(filter=firestore.FieldFilter("User_Email", "==", user_email))
+        silinecek = [d.reference for d in eski.stream() if d.id not in yeni]
+
+        islemler: List[Tuple[str, Any, Optional[Dict[str, Any]]]] = [("sil", ref, None) for ref in silinecek]
+        islemler += [
+            ("yaz", self._rollup_ref(*anahtar), _rollup_kaydi(*anahtar, satir))
+            for anahtar, satir in birikim.satirlar.items()
+        ]
+        for bas in range(0, len(islemler), FIRESTORE_BATCH_LIMIT):
+            batch = self.db.batch()
+            for tur, ref, kayit in islemler[bas:bas + FIRESTORE_BATCH_LIMIT]:
+                if tur == "sil":
+                    batch.delete(ref)
+                else:
+                    kayit["Kategoriler"] = {str(k): v for k, v in kayit["Kategoriler"].items()}
+                    batch.set(ref, kayit)
+            batch.commit()
+        if user_email is None:
+            self.db.collection(ROLLUP_META).document("durum").set({"Hazir": True, "Derleme": firestore.SERVER_TIMESTAMP})
+            self._rollups_hazir = True
+        return len(birikim.satirlar)
+
+    def rollups_hazir(self) -> bool:
+        if not self._rollups_hazir:
+            snap = self.db.collection(ROLLUP_META).document("durum").get()
+            self._rollups_hazir = bool(snap.exists and (snap.to_dict() or {}).get("Hazir"))
+        return self._rollups_hazir
+
+    def add_notifications(self, kayitlar: List[Dict[str, Any]]) -> None:
+        koleksiyon = self.db.collection(NOTIFICATIONS)
+        for bas in range(0, len(kayitlar), FIRESTORE_BATCH_LIMIT):
+            batch = self.db.batch()
+            for kayit in kayitlar[bas:bas + FIRESTORE_BATCH_LIMIT]:
+                batch.set(koleksiyon.document(), kayit)
+            batch.commit()
+
+    def degisiklik_isareti(self) -> datetime:
+        return datetime.now(timezone.utc)
+
+    def degisiklikler(self, isaret: datetime, user_email: Optional[str] = None) -> Tuple[List[Degisiklik], datetime]:
+        from firebase_admin import firestore  # type: ignore
+
+        alt_sinir = isaret - self.DEGISIKLIK_PAYI
+        kayitlar: List[Tuple[datetime, Degisiklik]] = []
+        for koleksiyon, alan in ((TRANSACTIONS, "Guncelleme"), (TRANSACTION_TOMBSTONES, "Silinme")):
+            query = self.db.collection(koleksiyon)
+            if user_email is not None:
+                query = query.where(filter=firestore.FieldFilter("User_Email", "==", user_email))
+            query = query.where(filter=firestore.FieldFilter(alan, ">", alt_sinir)).order_by(alan)
+            for d in query.stream():
+                data = d.to_dict() or {}
+                zaman = data.pop(alan, None) or isaret
+                if koleksiyon == TRANSACTIONS:
+                    kayitlar.append((zaman, ("ekle", d.id, data)))
+                else:
+                    kayitlar.append((zaman, ("sil", d.id, None)))
+        # Aynı belge için ekleme ve silme birlikte gelirse silme sonra uygulanmalı
+        kayitlar.sort(key=lambda k: (k[0], k[1][0] == "sil"))
+        yeni_isaret = max([isaret] + [zaman for zaman, _ in kayitlar])
+        return [d for _, d in kayitlar], yeni_isaret
+
+    def ping(self) -> None:
+        _ = list(self.db.collections())
+
+
+# --- SQLITE / BELLEK İÇİ ---
+class SQLiteTransactionRepository(TransactionRepository):
+    """
+    Gömülü SQLite arka ucu. ``path=":memory:"`` ile tamamen bellek içi çalışır.
+    Tek bağlantı bir kilitle paylaşılır (FastAPI threadpool'u için güvenli).
+    """
+
+    name = "sqlite"
+
+    def __init__(self, path: str = ":memory:"):
+        self.path = path
+        if path == ":memory:":
+            self.name = "memory"
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(
+            f"""
+            CREATE TABLE IF NOT EXISTS {TRANSACTIONS} (
+                id TEXT PRIMARY KEY,
+                user_email TEXT,
+                tarih TEXT,
+                islem_tipi TEXT,
+                tutar REAL,
+                data TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_{TRANSACTIONS}_tarih ON {TRANSACTIONS} (tarih, id);
+            CREATE INDEX IF NOT EXISTS idx_{TRANSACTIONS}_user_tarih ON {TRANSACTIONS} (user_email, tarih, id);
+            CREATE TABLE IF NOT EXISTS {TRANSACTION_CHANGES} (
+                sira INTEGER PRIMARY KEY AUTOINCREMENT,
+                id TEXT NOT NULL,
+                user_email TEXT,
+                islem TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_{TRANSACTION_CHANGES}_user_sira ON {TRANSACTION_CHANGES} (user_email, sira);
+            CREATE TABLE IF NOT EXISTS {NOTIFICATIONS} (
+                id TEXT PRIMARY KEY,
+                user_email TEXT,
+                tarih TEXT,
+                mesaj TEXT,
+                okundu INTEGER NOT NULL DEFAULT 0
+            );
+            CREATE TABLE IF NOT EXISTS {MONTHLY_AGGREGATES} (
+                anahtar TEXT PRIMARY KEY,
+                user_email TEXT,
+                yil INTEGER,
+                ay INTEGER,
+                gelir_toplam REAL NOT NULL DEFAULT 0,
+                gider_toplam REAL NOT NULL DEFAULT 0,
+                islem_sayisi INTEGER NOT NULL DEFAULT 0
+            );
+            CREATE TABLE IF NOT EXISTS {ROLLUPS} (
+                anahtar TEXT PRIMARY KEY,
+                user_email TEXT,
+                seviye TEXT NOT NULL,
+                donem TEXT NOT NULL,
+                gelir_toplam REAL NOT NULL DEFAULT 0,
+                gider_toplam REAL NOT NULL DEFAULT 0,
+                islem_sayisi INTEGER NOT NULL DEFAULT 0
+            );
+            CREATE INDEX IF NOT EXISTS idx_{ROLLUPS}_seviye_user_donem ON {ROLLUPS} (seviye, user_email, donem);
+            CREATE INDEX IF NOT EXISTS idx_{ROLLUPS}_seviye_donem ON {ROLLUPS} (seviye, donem);
+            CREATE TABLE IF NOT EXISTS {ROLLUP_CATEGORIES} (
+                anahtar TEXT NOT NULL,
+                kategori_id INTEGER NOT NULL,
+                tutar REAL NOT NULL DEFAULT 0,
+                adet INTEGER NOT NULL DEFAULT 0,
+                ad TEXT,
+                PRIMARY KEY (anahtar, kategori_id)
+            );
+            CREATE TABLE IF NOT EXISTS {ROLLUP_META} (
+                anahtar TEXT PRIMARY KEY,
+                deger TEXT
+            );
+            """
+        )
+        # Özetler tutulmadan önce yazılmış veri yoksa (yeni veritabanı) özetler baştan hazırdır
+        with self._lock:
+            hazir = self._conn.execute(f"SELECT 1 FROM {ROLLUP_META} WHERE anahtar = 'hazir'").fetchone()
+            if not hazir and not self._conn.execute(f"SELECT 1 FROM {TRANSACTIONS} LIMIT 1").fetchone():
+                self._conn.execute(f"INSERT INTO {ROLLUP_META} (anahtar, deger) VALUES ('hazir', ?)", (datetime.now().isoformat(),))
+
+    # Dönüşümler: Tarih ISO metin olarak saklanır, okurken datetime'a çevrilir
+    @staticmethod
+    def _kodla(data: Dict[str, Any]) -> str:
+        return json.dumps(data, ensure_ascii=False, default=lambda v: v.isoformat() if isinstance(v, datetime) else str(v))
+
+    @staticmethod
+    def _coz(raw: str) -> Dict[str, Any]:
+        data = json.loads(raw)
+        t = data.get("Tarih")
+        if isinstance(t, str):
+            try:
+                data["Tarih"] = datetime.fromisoformat(t)
+            except ValueError:
+                pass
+        return data
+
+    @staticmethod
+    def _tarih_metni(t: Any) -> Optional[str]:
+        return t.isoformat() if isinstance(t, datetime) else None
+
+    def _ozet_guncelle(self, data: Dict[str, Any], isaret: int) -> None:
+        delta = _ozet_deltasi(data)
+        if delta is None:
+            return
+        user_email, yil, ay, tip, tutar = delta
+        self._ozet_yaz(
+            [(user_email, yil, ay, isaret * tutar if tip == "Gelir" else 0.0, isaret * tutar if tip == "Gider" else 0.0, isaret)]
+        )
+
+    def _ozet_yaz(self, satirlar: List[Tuple[Optional[str], int, int, float, float, int]]) -> None:
+        """(user_email, yil, ay, gelir, gider, adet) artışlarını özet tablosuna ekler."""
+        self._conn.executemany(
+            f"""
+            INSERT INTO {MONTHLY_AGGREGATES} (anahtar, user_email, yil, ay, gelir_toplam, gider_toplam, islem_sayisi)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(anahtar) DO UPDATE SET
+                gelir_toplam = gelir_toplam + excluded.gelir_toplam,
+                gider_toplam = gider_toplam + excluded.gider_toplam,
+                islem_sayisi = islem_sayisi + excluded.islem_sayisi
+            """,
+            [(aylik_ozet_anahtari(u, yil, ay), u, yil, ay, gelir, gider, adet) for u, yil, ay, gelir, gider, adet in satirlar],
+        )
+
+    def _rollup_yaz(self, birikim: _RollupBirikimi) -> None:
+        """Dönem özeti artışlarını ekler; boşalan (adet <= 0) kayıtlar ve kategoriler silinir."""
+        if not birikim.satirlar:
+            return
+        anahtarlar = [rollup_anahtari(*a) for a in birikim.satirlar]
+        tablo = get_kategori_tablosu()
+        self._conn.executemany(
+            f"""
+            INSERT INTO {ROLLUPS} (anahtar, user_email, seviye, donem, gelir_toplam, gider_toplam, islem_sayisi)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(anahtar) DO UPDATE SET
+                gelir_toplam = gelir_toplam + excluded.gelir_toplam,
+                gider_toplam = gider_toplam + excluded.gider_toplam,
+                islem_sayisi = islem_sayisi + excluded.islem_sayisi
+            """,
+            [(k, u, sev, donem, t[0], t[1], t[2]) for k, ((u, sev, donem), t) in zip(anahtarlar, birikim.satirlar.items())],
+        )
+        self._conn.executemany(
+            f"""
+            INSERT INTO {ROLLUP_CATEGORIES} (anahtar, kategori_id, tutar, adet, ad) VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT(anahtar, kategori_id) DO UPDATE SET tutar = tutar + excluded.tutar, adet = adet + excluded.adet
+            """,
+            [
+                (k, kid, v[0], v[1], tablo.ad(kid))
+                for k, t in zip(anahtarlar, birikim.satirlar.values()) for kid, v in t[3].items()
+            ],
+        )
+        if any(t[2] < 0 for t in birikim.satirlar.values()):
+            yer = ",".join("?" * len(anahtarlar))
+            self._conn.execute(f"DELETE FROM {ROLLUPS} WHERE anahtar IN ({yer}) AND islem_sayisi <= 0", anahtarlar)
+            self._conn.execute(f"DELETE FROM {ROLLUP_CATEGORIES} WHERE anahtar IN ({yer}) AND adet <= 0", anahtarlar)
+
+    def _degisiklik_yaz(self, satirlar: List[Tuple[str, Optional[str], str]]) -> None:
+        """(belge_id, user_email, 'ekle'|'sil') kayıtlarını değişiklik günlüğüne ekler."""
+        self._conn.executemany(
+            f"INSERT INTO {TRANSACTION_CHANGES} (id, user_email, islem) VALUES (?, ?, ?)", satirlar
+        )
+
+    def _satir(self, doc_id: str, data: Dict[str, Any]) -> Tuple[Any, ...]:
+        return (
+            doc_id,
+            data.get("User_Email"),
+            self._tarih_metni(data.get("Tarih")),
+            data.get("Islem_Tipi"),
+            float(data.get("Tutar", 0) or 0),
+            self._kodla(data),
+        )
+
+    def add(self, data: Dict[str, Any]) -> str:
+        doc_id = uuid.uuid4().hex
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.execute(
+                    f"INSERT INTO {TRANSACTIONS} (id, user_email, tarih, islem_tipi, tutar, data) VALUES (?, ?, ?, ?, ?, ?)",
+                    self._satir(doc_id, data),
+                )
+                self._degisiklik_yaz([(doc_id, data.get("User_Email"), "ekle")])
+                self._ozet_guncelle(data, +1)
+                birikim = _RollupBirikimi()
+                birikim.ekle(data, +1)
+                self._rollup_yaz(birikim)
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return doc_id
+
+    def add_many(self, datas: List[Dict[str, Any]], ids: Optional[List[str]] = None) -> List[str]:
+        """Tüm belgeleri ve özet artışlarını tek bir SQLite işleminde yazar."""
+        ids = list(ids) if ids is not None else [uuid.uuid4().hex for _ in datas]
+        ozetler: Dict[Tuple[Optional[str], int, int], List[float]] = {}
+        birikim = _RollupBirikimi()
+        for data in datas:
+            birikim.ekle(data, +1)
+            delta = _ozet_deltasi(data)
+            if delta is None:
+                continue
+            user_email, yil, ay, tip, tutar = delta
+            toplam = ozetler.setdefault((user_email, yil, ay), [0.0, 0.0, 0])
+            toplam[0 if tip == "Gelir" else 1] += tutar
+            toplam[2] += 1
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.executemany(
+                    f"INSERT INTO {TRANSACTIONS} (id, user_email, tarih, islem_tipi, tutar, data) VALUES (?, ?, ?, ?, ?, ?)",
+                    [self._satir(doc_id, data) for doc_id, data in zip(ids, datas)],
+                )
+                self._degisiklik_yaz([(doc_id, data.get("User_Email"), "ekle") for doc_id, data in zip(ids, datas)])
+                self._ozet_yaz([(u, yil, ay, t[0], t[1], int(t[2])) for (u, yil, ay), t in ozetler.items()])
+                self._rollup_yaz(birikim)
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return ids
+
+    def get(self, doc_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute(f"SELECT data FROM {TRANSACTIONS} WHERE id = ?", (doc_id,)).fetchone()
+        return self._coz(row[0]) if row else None
+
+    def delete(self, doc_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                row = self._conn.execute(f"SELECT data FROM {TRANSACTIONS} WHERE id = ?", (doc_id,)).fetchone()
+                if not row:
+                    self._conn.execute("COMMIT")
+                    return None
+                data = self._coz(row[0])
+                self._conn.execute(f"DELETE FROM {TRANSACTIONS} WHERE id = ?", (doc_id,))
+                self._degisiklik_yaz([(doc_id, data.get("User_Email"), "sil")])
+                self._ozet_guncelle(data, -1)
+                birikim = _RollupBirikimi()
+                birikim.ekle(data, -1)
+                self._rollup_yaz(birikim)
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return data
+
+    # query_range kilidi bu kadar satırlık sayfalar arasında bırakır; bellek kullanımı sabit kalır
+    SAYFA_BOYUTU = 1000
+
+    def query_range(
+        self,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        user_email: Optional[str] = None,
+        islem_tipi: Optional[str] = None,
+        kategori: Optional[str] = None,
+        after: Optional[Imlec] = None,
+        limit: Optional[int] = None,
+    ) -> Iterator[Belge]:
+        # Firestore'daki order_by("Tarih") gibi tarihsiz belgeler sıralı sorgulara girmez
+        kosullar = ["tarih IS NOT NULL"]
+        params: list = []
+        if start is not None:
+            kosullar.append("tarih >= ?")
+            params.append(start.isoformat())
+        if end is not None:
+            kosullar.append("tarih < ?")
+            params.append(end.isoformat())
+        if user_email is not None:
+            kosullar.append("user_email = ?")
+            params.append(user_email)
+        if islem_tipi is not None:
+            kosullar.append("islem_tipi = ?")
+            params.append(islem_tipi)
+        if kategori is not None:
+            kosullar.append("json_extract(data, '$.Kategori') = ?")
+            params.append(kategori)
+
+        imlec = (after[0].isoformat(), after[1]) if after is not None else None
+        kalan = limit
+        while kalan is None or kalan > 0:
+            sayfa = self.SAYFA_BOYUTU if kalan is None else min(kalan, self.SAYFA_BOYUTU)
+            sayfa_kosul = kosullar + (["(tarih, id) > (?, ?)"] if imlec else [])
+            where = f"WHERE {' AND '.join(sayfa_kosul)}"
+            with self._lock:
+                rows = self._conn.execute(
+                    f"SELECT id, tarih, data FROM {TRANSACTIONS} {where} ORDER BY tarih, id LIMIT ?",
+                    params + (list(imlec) if imlec else []) + [sayfa],
+                ).fetchall()
+            for doc_id, _, raw in rows:
+                yield doc_id, self._coz(raw)
+            if len(rows) < sayfa:
+                return
+            imlec = (rows[-1][1], rows[-1][0])
+            if kalan is not None:
+                kalan -= len(rows)
+
+    def monthly_aggregate(self, user_email: Optional[str], yil: int, ay: int) -> Dict[str, Any]:
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT gelir_toplam, gider_toplam, islem_sayisi FROM {MONTHLY_AGGREGATES} WHERE anahtar = ?",
+                (aylik_ozet_anahtari(user_email, yil, ay),),
+            ).fetchone()
+        ozet = _bos_ozet(user_email, yil, ay)
+        if row:
+            ozet["Gelir_Toplam"], ozet["Gider_Toplam"], ozet["Islem_Sayisi"] = float(row[0]), float(row[1]), int(row[2])
+        return ozet
+
+    def balance_aggregate(self, user_email: Optional[str] = None) -> Dict[str, Any]:
+        kosul, params = "", []
+        if user_email is not None:
+            kosul, params = "WHERE user_email = ?", [user_email]
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT SUM(gelir_toplam), SUM(gider_toplam), SUM(islem_sayisi) FROM {MONTHLY_AGGREGATES} {kosul}",
+                params,
+            ).fetchone()
+        return {"Gelir_Toplam": float(row[0] or 0), "Gider_Toplam": float(row[1] or 0), "Islem_Sayisi": int(row[2] or 0)}
+
+    def rollups(
+        self,
+        seviye: str,
+        user_email: Optional[str] = None,
+        start: Optional[date] = None,
+        end: Optional[date] = None,
+        kategoriler: bool = True,
+    ) -> List[Dict[str, Any]]:
+        kosullar, params = ["r.seviye = ?"], [seviye]
+        if user_email is not None:
+            kosullar.append("r.user_email = ?")
+            params.append(user_email)
+        if start is not None:
+            kosullar.append("r.donem >= ?")
+            params.append(start.isoformat())
+        if end is not None:
+            kosullar.append("r.donem < ?")
+            params.append(end.isoformat())
+        where = " AND ".join(kosullar)
+        with self._lock:
+            rows = self._conn.execute(
+                f"""
+                SELECT r.anahtar, r.user_email, r.donem, r.gelir_toplam, r.gider_toplam, r.islem_sayisi
+                FROM {ROLLUPS} r WHERE {where} AND r.islem_sayisi > 0 ORDER BY r.donem, r.anahtar
+                """,
+                params,
+            ).fetchall()
+            kategori_rows = self._conn.execute(
+                f"""
+                SELECT c.anahtar, c.kategori_id, c.tutar, c.adet, c.ad FROM {ROLLUP_CATEGORIES} c
+                JOIN {ROLLUPS} r ON r.anahtar = c.anahtar WHERE {where} AND c.adet > 0
+                """,
+                params,
+            ).fetchall() if kategoriler else []
+        kategori_map: Dict[str, Dict[int, Dict[str, Any]]] = {}
+        for anahtar, kategori_id, tutar, adet, ad in kategori_rows:
+            kategori_map.setdefault(anahtar, {})[int(kategori_id)] = {"Tutar": float(tutar), "Adet": int(adet), "Ad": ad}
+        return [
+            {
+                "User_Email": u,
+                "Seviye": seviye,
+                "Donem": donem,
+                "Gelir_Toplam": float(gelir),
+                "Gider_Toplam": float(gider),
+                "Islem_Sayisi": int(adet),
+                "Kategoriler": kategori_map.get(anahtar, {}),
+            }
+            for anahtar, u, donem, gelir, gider, adet in rows
+        ]
+
+    def rebuild_rollups(self, user_email: Optional[str] = None) -> int:
+        """Tek SQLite işleminde (yazımlar beklerken) eski özetler silinip ham işlemlerden yeniden yazılır."""
+        kosul, params = ("WHERE user_email = ?", [user_email]) if user_email is not None else ("", [])
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                birikim = _RollupBirikimi()
+                for (raw,) in self._conn.execute(f"SELECT data FROM {TRANSACTIONS} {kosul}", params):
+                    birikim.ekle(self._coz(raw), +1)
+                self._conn.execute(
+                    f"DELETE FROM {ROLLUP_CATEGORIES} WHERE anahtar IN (SELECT anahtar FROM {ROLLUPS} {kosul})", params
+                )
+                self._conn.execute(f"DELETE FROM {ROLLUPS} {kosul}", params)
+                self._rollup_yaz(birikim)
+                if user_email is None:
+                    self._conn.execute(
+                        f"INSERT OR REPLACE INTO {ROLLUP_META} (anahtar, deger) VALUES ('hazir', ?)", (datetime.now().isoformat(),)
+                    )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return len(birikim.satirlar)
+
+    def rollups_hazir(self) -> bool:
+        with self._lock:
+            return self._conn.execute(f"SELECT 1 FROM {ROLLUP_META} WHERE anahtar = 'hazir'").fetchone() is not None
+
+    def add_notifications(self, kayitlar: List[Dict[str, Any]]) -> None:
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.executemany(
+                    f"INSERT INTO {NOTIFICATIONS} (id, user_email, tarih, mesaj, okundu) VALUES (?, ?, ?, ?, ?)",
+                    [
+                        (uuid.uuid4().hex, k.get("User_Email"), self._tarih_metni(k.get("Tarih")), k.get("Mesaj"), int(bool(k.get("Okundu"))))
+                        for k in kayitlar
+                    ],
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def degisiklik_isareti(self) -> int:
+        with self._lock:
+            row = self._conn.execute(f"SELECT MAX(sira) FROM {TRANSACTION_CHANGES}").fetchone()
+        return int(row[0] or 0)
+
+    def degisiklikler(self, isaret: int, user_email: Optional[str] = None) -> Tuple[List[Degisiklik], int]:
+        kosul, params = "c.sira > ?", [isaret]
+        if user_email is not None:
+            kosul += " AND c.user_email = ?"
+            params.append(user_email)
+        with self._lock:
+            rows = self._conn.execute(
+                f"""
+                SELECT c.sira, c.id, c.islem, t.data FROM {TRANSACTION_CHANGES} c
+                LEFT JOIN {TRANSACTIONS} t ON t.id = c.id
+                WHERE {kosul} ORDER BY c.sira
+                """,
+                params,
+            ).fetchall()
+        degisiklikler: List[Degisiklik] = []
+        for _, doc_id, islem, raw in rows:
+            if islem == "sil":
+                degisiklikler.append(("sil", doc_id, None))
+            elif raw is not None:
+                # Sonradan silinen belgenin eklemesi atlanır; silme kaydı zaten listededir
+                degisiklikler.append(("ekle", doc_id, self._coz(raw)))
+        return degisiklikler, (rows[-1][0] if rows else isaret)
+
+    def ping(self) -> None:
+        with self._lock:
+            self._conn.execute("SELECT 1").fetchone()
+
+
+# --- SEÇİM (Singleton) ---
+_repo_lock = threading.Lock()
+_repository: Optional[TransactionRepository] = None
+
+
+def _create_repository(backend: str) -> TransactionRepository:
+    backend = (backend or "firestore").strip().lower()
+    if backend == "firestore":
+        return FirestoreTransactionRepository()
+    if backend == "sqlite":
+        return SQLiteTransactionRepository(os.getenv("SQLITE_PATH", "cebimdekiveri.db"))
+    if backend == "memory":
+        return SQLiteTransactionRepository(":memory:")
+    raise ValueError(f"Bilinmeyen STORAGE_BACKEND: {backend} (firestore, sqlite veya memory olmalı)")
+
+
+def get_repository() -> TransactionRepository:
+    """STORAGE_BACKEND ortam değişkenine göre seçilen depolama arka ucunu (Singleton) döndürür."""
+    global _repository
+    if _repository is not None:
+        return _repository
+    with _repo_lock:
+        if _repository is None:
+            _repository = _create_repository(os.getenv("STORAGE_BACKEND", "firestore"))
+    return _repository
+
+
+def set_repository(repository: Optional[TransactionRepository]) -> None:
+    """Aktif arka ucu değiştirir (testler ve benchmark'lar için). None verilirse bir sonraki çağrıda yeniden seçilir."""
+    global _repository
+    with _repo_lock:
+        _repository = repository
+
+
+# --- ASYNC ---
+class AsyncTransactionRepository:
+    """
+    Senkron bir TransactionRepository'yi async endpoint'ler için sarar. Her çağrı 'storage'
+    sınırlayıcısının havuzunda çalışır; olay döngüsü bloklanmaz ve eşzamanlı depolama çağrısı sınırlıdır.
+    """
+
+    AKIS_PARCASI = 500
+
+    def __init__(self, repository: Optional[TransactionRepository] = None):
+        self._repository = repository
+
+    @property
+    def sync(self) -> TransactionRepository:
+        return self._repository or get_repository()
+
+    @property
+    def name(self) -> str:
+        return self.sync.name
+
+    async def _calistir(self, fn, *args, **kwargs):
+        return await get_limiter("storage").run(fn, *args, **kwargs)
+
+    async def add(self, data: Dict[str, Any]) -> str:
+        return await self._calistir(self.sync.add, data)
+
+    async def add_many(self, datas: List[Dict[str, Any]]) -> List[str]:
+        return await self._calistir(self.sync.add_many, datas)
+
+    async def get(self, doc_id: str) -> Optional[Dict[str, Any]]:
+        return await self._calistir(self.sync.get, doc_id)
+
+    async def delete(self, doc_id: str) -> Optional[Dict[str, Any]]:
+        return await self._calistir(self.sync.delete, doc_id)
+
+    async def monthly_aggregate(self, user_email: Optional[str], yil: int, ay: int) -> Dict[str, Any]:
+        return await self._calistir(self.sync.monthly_aggregate, user_email, yil, ay)
+
+    async def rollups(self, seviye: str, **kwargs) -> List[Dict[str, Any]]:
+        return await self._calistir(self.sync.rollups, seviye, **kwargs)
+
+    async def ping(self) -> None:
+        await self._calistir(self.sync.ping)
+
+    async def query_range(self, **kwargs):
+        """query_range'in async üreteç karşılığı; belgeler AKIS_PARCASI'lık parçalar halinde çekilir."""
+        it = iter(self.sync.query_range(**kwargs))
+        while True:
+            parca = await self._calistir(lambda: list(islice(it, self.AKIS_PARCASI)))
+            for belge in parca:
+                yield belge
+            if len(parca) < self.AKIS_PARCASI:
+                return
+
+
+def get_async_repository() -> AsyncTransactionRepository:
+    """Aktif depolama arka ucunun async sarmalayıcısı."""
+    return AsyncTransactionRepository()
@@ -0,0 +1,240 @@
+"""
+Aylık gelir/gider tahmin motoru.
+
+Özetteki ``tahmin`` alanı, kullanıcının aylık serisi üzerinde geriye dönük (rolling-origin) test
+edilen modeller arasından hatası (MAE) en düşük olanla üretilir. Modeller vektöreldir: bir
+serinin tüm test noktalarındaki tahminleri tek NumPy/pandas geçişinde hesaplanır.
+
+- ``ma3`` / ``ma6``: son 3 / 6 ayın ortalaması (``ma3`` eski davranıştır)
+- ``ewma_0.3`` / ``ewma_0.6``: üstel ağırlıklı ortalama
+- ``mevsimsel_naif``: 12 ay önceki değer
+- ``trend``: son 6 aya doğrusal eğilim; giderde kategori başına kurulur, negatif kategori
+  tahminleri sıfırlanıp toplanır
+
+Seri, ilk aydan son tamamlanmış aya kadar boş aylar sıfırla doldurularak kurulur; içinde
+bulunulan (yarım) ay tahmine katılmaz. Sonuçlar kullanıcı başına, verinin sürümüyle birlikte
+saklanır; yeni veri gelene (ya da ay dönene) kadar aynı sonuç yeniden kullanılır.
+"""
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, Hashable, List, Mapping, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+Ay = Tuple[int, int]
+
+TREND_PENCERESI = 6
+TEST_PENCERESI = 12  # en fazla son 12 ay test edilir
+MIN_GECMIS = 3  # ilk tahmin noktasından önce gereken ay sayısı
+MIN_TEST = 2  # model seçimi için gereken en az test noktası
+VARSAYILAN_MODEL = "ma3"
+
+
+# --- Modeller: matris (k satır x T ay) -> her t için y[:, :t]'den üretilen t. ay tahmini (k x T) ---
+def _hareketli_ortalama(pencere: int):
+    def tahmin(y: np.ndarray) -> np.ndarray:
+        T = y.shape[1]
+        cs = np.concatenate([np.zeros((y.shape[0], 1)), np.cumsum(y, axis=1)], axis=1)
+        t = np.arange(T)
+        n = np.minimum(t, pencere)
+        sonuc = np.full(y.shape, np.nan)
+        gecerli = n > 0
+        sonuc[:, gecerli] = (cs[:, t[gecerli]] - cs[:, t[gecerli] - n[gecerli]]) / n[gecerli]
+        return sonuc
+    return tahmin
+
+
+def _ewma(alfa: float):
+    def tahmin(y: np.ndarray) -> np.ndarray:
+        duzey = pd.DataFrame(y.T).ewm(alpha=alfa, adjust=False).mean().to_numpy().T
+        sonuc = np.full(y.shape, np.nan)
+        sonuc[:, 1:] = duzey[:, :-1]
+        return sonuc
+    return tahmin
+
+
+def _mevsimsel_naif(periyot: int):
+    def tahmin(y: np.ndarray) -> np.ndarray:
+        sonuc = np.full(y.shape, np.nan)
+        sonuc[:, periyot:] = y[:, :-periyot]
+        return sonuc
+    return tahmin
+
+
+def _trend(pencere: int):
+    def tahmin(y: np.ndarray) -> np.ndarray:
+        # Kayan pencerede en küçük kareler (kapalı form, kümülatif toplamlarla)
+        k, T = y.shape
+        i = np.arange(T, dtype=np.float64)
+        cs = np.concatenate([np.zeros((k, 1)), np.cumsum(y, axis=1)], axis=1)
+        csi = np.concatenate([np.zeros((k, 1)), np.cumsum(y * i, axis=1)], axis=1)
+        t = np.arange(T)
+        n = np.minimum(t, pencere).astype(np.float64)
+        bas = t - n.astype(np.int64)
+        sy = cs[:, t] - cs[:, bas]
+        sxy = csi[:, t] - csi[:, bas] - bas * sy  # x = pencere içindeki sıra (0..n-1)
+        sx = n * (n - 1) / 2
+        sxx = (n - 1) * n * (2 * n - 1) / 6
+        payda = n * sxx - sx ** 2
+        with np.errstate(divide="ignore", invalid="ignore"):
+            egim = np.where(payda > 0, (n * sxy - sx * sy) / np.where(payda > 0, payda, 1), 0.0)
+            kesen = np.where(n > 0, (sy - egim * sx) / np.where(n > 0, n, 1), np.nan)
+        sonuc = np.maximum(kesen + egim * n, 0.0)
+        sonuc[:, n == 0] = np.nan
+        return sonuc
+    return tahmin
+
+
+# ad -> (model, gereken en az geçmiş ay)
+MODELLER = {
+    "ma3": (_hareketli_ortalama(3), 1),
+    "ma6": (_hareketli_ortalama(6), 1),
+    "ewma_0.3": (_ewma(0.3), 1),
+    "ewma_0.6": (_ewma(0.6), 1),
+    "mevsimsel_naif": (_mevsimsel_naif(12), 12),
+    "trend": (_trend(TREND_PENCERESI), 2),
+}
+
+
+def _ay_sirasi(aylar: List[Ay]) -> List[Ay]:
+    """İlk aydan son aya kadar kesintisiz ay listesi."""
+    (y0, a0), (y1, a1) = aylar[0], aylar[-1]
+    return [((y0 * 12 + a0 - 1 + i) // 12, (y0 * 12 + a0 - 1 + i) % 12 + 1) for i in range((y1 * 12 + a1) - (y0 * 12 + a0) + 1)]
+
+
+def seri_sec(y: np.ndarray) -> Dict[str, Any]:
+    """
+    Satırları toplanan (k x T) seri matrisi için modelleri geriye dönük test eder, en iyisiyle
+    sonraki ayı tahmin eder. Dönüş: { tahmin, model, hata, hatalar }.
+    """
+    T = y.shape[1]
+    toplam = y.sum(axis=0)
+    if T == 0:
+        return {"tahmin": 0.0, "model": None, "hata": None, "hatalar": {}}
+
+    # Sonraki ayın tahmini için seriye bir boş sütun eklenir; model son sütunda y[:, :T]'yi kullanır
+    genis = np.concatenate([y, np.zeros((y.shape[0], 1))], axis=1)
+    baslangic = max(MIN_GECMIS, T - TEST_PENCERESI)
+    uygun = [ad for ad, (_, gerekli) in MODELLER.items() if T - max(gerekli, baslangic) >= MIN_TEST]
+    # Uzun geçmiş isteyen modeller de aynı noktalarda karşılaştırılsın
+    baslangic = max([baslangic] + [MODELLER[ad][1] for ad in uygun])
+    uygun = [ad for ad in uygun if T - baslangic >= MIN_TEST]
+
+    if not uygun:
+        tahminler = MODELLER[VARSAYILAN_MODEL][0](genis).sum(axis=0)
+        return {"tahmin": round(float(tahminler[T]), 2), "model": VARSAYILAN_MODEL, "hata": None, "hatalar": {}}
+
+    hatalar: Dict[str, float] = {}
+    sonraki: Dict[str, float] = {}
+    for ad in uygun:
+        tahminler = MODELLER[ad][0](genis).sum(axis=0)
+        hatalar[ad] = float(np.mean(np.abs(tahminler[baslangic:T] - toplam[baslangic:T])))
+        sonraki[ad] = float(tahminler[T])
+    # Eşitlikte tanım sırası (daha basit model) kazanır
+    en_iyi = min(uygun, key=lambda ad: hatalar[ad])
+    return {
+        "tahmin": round(sonraki[en_iyi], 2),
+        "model": en_iyi,
+        "hata": round(hatalar[en_iyi], 2),
+        "hatalar": {ad: round(h, 2) for ad, h in hatalar.items()},
+    }
+
+
+class TahminMotoru:
+    """Kullanıcı başına tahmin sonuçlarını veri sürümüyle saklayan LRU önbellek."""
+
+    def __init__(self, max_kayit: int = 1024):
+        self.max_kayit = max_kayit
+        self._lock = threading.Lock()
+        self._kayitlar: "OrderedDict[Hashable, Tuple[Hashable, Dict[str, Any]]]" = OrderedDict()
+        self.hit = 0
+        self.miss = 0
+
+    def tahmin(
+        self,
+        aylik: Mapping[Ay, Tuple[float, float]],
+        kategori_aylik: Mapping[Hashable, Mapping[Ay, float]],
+        anahtar: Optional[Hashable] = None,
+        surum: Optional[Hashable] = None,
+        simdi: Optional[datetime] = None,
+    ) -> Dict[str, Any]:
+        """
+        aylik: (yil, ay) -> (gelir, gider); kategori_aylik: kategori (kimliği) -> (yil, ay) -> gider.
+        anahtar ve surum verilirse sonuç, aynı sürüm için (ve aynı takvim ayında) yeniden kullanılır.
+        Dönüş: { gelir, gider, model: {gelir, gider}, hata: {gelir, gider}, hatalar: {gelir: {...}, gider: {...}} }
+        """
+        simdi = simdi or datetime.now()
+        bu_ay = (simdi.year, simdi.month)
+        if anahtar is not None:
+            with self._lock:
+                kayit = self._kayitlar.get(anahtar)
+                if kayit is not None and kayit[0] == (surum, bu_ay):
+                    self._kayitlar.move_to_end(anahtar)
+                    self.hit += 1
+                    return kayit[1]
+                self.miss += 1
+
+        sonuc = self._hesapla(aylik, kategori_aylik, bu_ay)
+        if anahtar is not None:
+            with self._lock:
+                self._kayitlar[anahtar] = ((surum, bu_ay), sonuc)
+                self._kayitlar.move_to_end(anahtar)
+                while len(self._kayitlar) > self.max_kayit:
+                    self._kayitlar.popitem(last=False)
+        return sonuc
+
+    @staticmethod
+    def _hesapla(aylik: Mapping[Ay, Tuple[float, float]], kategori_aylik: Mapping[Hashable, Mapping[Ay, float]], bu_ay: Ay) -> Dict[str, Any]:
+        aylar = sorted(aylik)
+        # Yarım kalan ay, daha önce tamamlanmış ay varsa seriden çıkarılır
+        if len(aylar) > 1 and aylar[-1] >= bu_ay:
+            aylar = [a for a in aylar if a < bu_ay] or aylar
+        if not aylar:
+            gelir = gider = seri_sec(np.zeros((1, 0)))
+        else:
+            sira = _ay_sirasi(aylar)
+            indeks = {a: i for i, a in enumerate(sira)}
+            gelir_seri = np.zeros((1, len(sira)))
+            for a, (g, _) in aylik.items():
+                if a in indeks:
+                    gelir_seri[0, indeks[a]] = g
+            kategoriler = sorted(kategori_aylik)
+            gider_seri = np.zeros((max(len(kategoriler), 1), len(sira)))
+            if kategoriler:
+                for r, kategori in enumerate(kategoriler):
+                    for a, tutar in kategori_aylik[kategori].items():
+                        if a in indeks:
+                            gider_seri[r, indeks[a]] = tutar
+            else:
+                for a, (_, g) in aylik.items():
+                    if a in indeks:
+                        gider_seri[0, indeks[a]] = g
+            gelir = seri_sec(gelir_seri)
+            gider = seri_sec(gider_seri)
+        return {
+            "gelir": gelir["tahmin"],
+            "gider": gider["tahmin"],
+            "model": {"gelir": gelir["model"], "gider": gider["model"]},
+            "hata": {"gelir": gelir["hata"], "gider": gider["hata"]},
+            "hatalar": {"gelir": gelir["hatalar"], "gider": gider["hatalar"]},
+        }
+
+    def istatistik(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"hit": self.hit, "miss": self.miss, "kayit_sayisi": len(self._kayitlar)}
+
+
+_motor_lock = threading.Lock()
+_motor: Optional[TahminMotoru] = None
+
+
+def get_tahmin_motoru() -> TahminMotoru:
+    """Süreç genelinde tek TahminMotoru örneği (Singleton)."""
+    global _motor
+    if _motor is None:
+        with _motor_lock:
+            if _motor is None:
+                _motor = TahminMotoru()
+    return _motor
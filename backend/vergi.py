@@ -0,0 +1,174 @@
+"""
+Tablo tabanlı, vektörel gelir vergisi motoru.
+
+Dilimler yıl bazında sürümlenir (VERGI_TARIFELERI); hesaplamalar bütün bir tutar dizisi için tek
+NumPy geçişinde yapılır. Üç hesaplama modu vardır:
+
+- ``duz``: tutarın tamamına, düştüğü dilimin oranı uygulanır (Gelir.vergiHesapla'nın davranışı)
+- ``kademeli``: gerçek artan oranlı hesap; her dilimin oranı yalnızca o dilime düşen kısma uygulanır
+- ``kumulatif``: kademeli hesap, aynı yıl içindeki gelirlerin kümülatif toplamı üzerinden yapılır;
+  her satırın vergisi, o satırın yıllık matrahı yükselttiği kısmın vergisidir
+
+Düzenli gelirlerde satırın vergisine tarifedeki indirim (varsayılan %5) uygulanır.
+"""
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+MODLAR = ("duz", "kademeli", "kumulatif")
+
+
+class VergiTarifesi:
+    """Bir yılın dilim tablosu. sinirlar: dilim üst sınırları (artan), oranlar: len(sinirlar) + 1 oran."""
+
+    __slots__ = ("yil", "sinirlar", "oranlar", "duzenli_indirim", "_taban")
+
+    def __init__(self, yil: int, sinirlar: Sequence[float], oranlar: Sequence[float], duzenli_indirim: float = 0.05):
+        if len(oranlar) != len(sinirlar) + 1:
+            raise ValueError("Oran sayısı dilim sınırı sayısından bir fazla olmalı.")
+        self.yil = yil
+        self.sinirlar = np.asarray(sinirlar, dtype=np.float64)
+        self.oranlar = np.asarray(oranlar, dtype=np.float64)
+        self.duzenli_indirim = duzenli_indirim
+        # Her dilimin alt sınırına kadar biriken kademeli vergi
+        alt = np.concatenate(([0.0], self.sinirlar))
+        self._taban = np.concatenate(([0.0], np.cumsum(np.diff(alt) * self.oranlar[:-1])))
+
+    def _dilim(self, matrah: np.ndarray) -> np.ndarray:
+        # 'left': sınıra eşit tutar alt dilimde kalır (vergiHesapla'daki '>' karşılaştırması)
+        return np.searchsorted(self.sinirlar, matrah, side="left")
+
+    def duz(self, tutar: np.ndarray) -> np.ndarray:
+        return tutar * self.oranlar[self._dilim(tutar)]
+
+    def kademeli(self, matrah: np.ndarray) -> np.ndarray:
+        matrah = np.maximum(matrah, 0.0)
+        dilim = self._dilim(matrah)
+        alt = np.concatenate(([0.0], self.sinirlar))[dilim]
+        return self._taban[dilim] + (matrah - alt) * self.oranlar[dilim]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "yil": self.yil,
+            "sinirlar": self.sinirlar.tolist(),
+            "oranlar": self.oranlar.tolist(),
+            "duzenli_indirim": self.duzenli_indirim,
+        }
+
+
+# Uygulamanın kullandığı ilk üç dilim (üst dilimler sadeleştirme gereği son dilime katılır)
+VERGI_TARIFELERI: Dict[int, VergiTarifesi] = {
+    2024: VergiTarifesi(2024, (110_000, 230_000), (0.15, 0.20, 0.27)),
+    2025: VergiTarifesi(2025, (158_000, 330_000), (0.15, 0.20, 0.27)),
+}
+# Gelir.vergiHesapla bu tarifeyi kullanır
+VARSAYILAN_YIL = 2024
+
+
+def tarife(yil: Optional[int] = None) -> VergiTarifesi:
+    """Yılın tarifesi; tablo yoksa o yıldan önceki en yeni tarife (hiç yoksa en eskisi)."""
+    if yil is None:
+        yil = VARSAYILAN_YIL
+    if yil in VERGI_TARIFELERI:
+        return VERGI_TARIFELERI[yil]
+    onceki = [y for y in VERGI_TARIFELERI if y <= yil]
+    return VERGI_TARIFELERI[max(onceki) if onceki else min(VERGI_TARIFELERI)]
+
+
+def _indirim(vergi: np.ndarray, duzenli: Optional[np.ndarray], oran: Any) -> np.ndarray:
+    if duzenli is None:
+        return vergi
+    return np.where(duzenli, vergi * (1.0 - oran), vergi)
+
+
+def vergi_hesapla(
+    tutarlar: Iterable[float],
+    duzenli: Optional[Iterable[bool]] = None,
+    yillar: Optional[Iterable[int]] = None,
+    mod: str = "duz",
+) -> np.ndarray:
+    """
+    Gelir dizisi için satır başına vergi (2 basamağa yuvarlanmış) döndürür.
+    yillar verilmezse tüm satırlar VARSAYILAN_YIL tarifesiyle hesaplanır. 'kumulatif' modda
+    satırlar yıl içinde verilen sırayla (tarih sırası beklenir) birikir.
+    """
+    if mod not in MODLAR:
+        raise ValueError(f"Geçersiz mod: {mod} ({', '.join(MODLAR)} olmalı)")
+    tutar = np.asarray(tutarlar if isinstance(tutarlar, np.ndarray) else list(tutarlar), dtype=np.float64)
+    duz_mu = None if duzenli is None else np.asarray(duzenli if isinstance(duzenli, np.ndarray) else list(duzenli), dtype=bool)
+    if yillar is None:
+        yil = np.full(tutar.shape, VARSAYILAN_YIL, dtype=np.int64)
+    else:
+        yil = np.asarray(yillar if isinstance(yillar, np.ndarray) else list(yillar), dtype=np.int64)
+
+    vergi = np.zeros_like(tutar)
+    for y in np.unique(yil):
+        maske = yil == y
+        t = tarife(int(y))
+        parca = tutar[maske]
+        if mod == "duz":
+            sonuc = t.duz(parca)
+        elif mod == "kademeli":
+            sonuc = t.kademeli(parca)
+        else:
+            kumulatif = np.cumsum(parca)
+            sonuc = t.kademeli(kumulatif) - t.kademeli(kumulatif - parca)
+        vergi[maske] = _indirim(sonuc, None if duz_mu is None else duz_mu[maske], t.duzenli_indirim)
+    return np.round(vergi, 2)
+
+
+def vergi_hesapla_tek(tutar: float, duzenli: bool = False, yil: Optional[int] = None) -> float:
+    """Tek gelir için düz mod vergisi (NumPy dizisi kurmadan; Gelir.vergiHesapla için)."""
+    t = tarife(yil)
+    oran = t.oranlar[int(np.searchsorted(t.sinirlar, tutar, side="left"))]
+    vergi = tutar * float(oran)
+    if duzenli:
+        vergi *= 1.0 - t.duzenli_indirim
+    return round(vergi, 2)
+
+
+def yillik_projeksiyon(
+    belgeler: Iterable[Tuple[str, Dict[str, Any]]],
+    mod: str = "kumulatif",
+) -> Dict[str, Any]:
+    """
+    Depolama belgelerinden (Tarih sırasıyla) yıllara göre gelir ve vergi toplamları.
+    Yalnızca Gelir belgeleri dikkate alınır; Tarih'i olmayanlar atlanır.
+    """
+    tutarlar: List[float] = []
+    yillar: List[int] = []
+    duzenliler: List[bool] = []
+    for _, data in belgeler:
+        tarih = data.get("Tarih")
+        if data.get("Islem_Tipi") != "Gelir" or not isinstance(tarih, datetime):
+            continue
+        tutarlar.append(float(data.get("Tutar", 0) or 0))
+        yillar.append(tarih.year)
+        duzenliler.append(bool(data.get("DuzenliMi", False)))
+
+    tutar = np.asarray(tutarlar, dtype=np.float64)
+    yil = np.asarray(yillar, dtype=np.int64)
+    vergi = vergi_hesapla(tutar, np.asarray(duzenliler, dtype=bool), yil, mod=mod)
+
+    ozet: List[Dict[str, Any]] = []
+    if len(yil):
+        yil_listesi, ters = np.unique(yil, return_inverse=True)
+        gelir_toplam = np.bincount(ters, weights=tutar)
+        vergi_toplam = np.bincount(ters, weights=vergi)
+        adet = np.bincount(ters)
+        for i, y in enumerate(yil_listesi):
+            ozet.append({
+                "yil": int(y),
+                "tarife_yili": tarife(int(y)).yil,
+                "gelir": round(float(gelir_toplam[i]), 2),
+                "vergi": round(float(vergi_toplam[i]), 2),
+                "efektif_oran": round(float(vergi_toplam[i] / gelir_toplam[i]), 4) if gelir_toplam[i] else 0.0,
+                "islem_sayisi": int(adet[i]),
+            })
+    return {
+        "mod": mod,
+        "yillar": ozet,
+        "toplam_gelir": round(float(tutar.sum()), 2),
+        "toplam_vergi": round(float(vergi.sum()), 2),
+    }
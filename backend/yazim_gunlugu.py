@@ -0,0 +1,349 @@
+"""
+POST /transactions için yazım-arkası (write-behind) tampon ve yerel yazım öncesi günlük (WAL).
+
+WRITE_BEHIND=1 iken ButceYonetici.islem_ekle işlemi depolamaya beklemeden yazar:
+
+- İşleme istemci tarafında ID verilir, belge WAL dosyasına (WAL_PATH, JSON satırları) eklenip
+  fsync edilir ve yanıt döner. Aynı anda gelen eklemelerin fsync'i tek çağrıda birleştirilir;
+  ekleme gecikmesi ağa değil yerel diske bağlıdır.
+- Arka plan iş parçacığı bekleyen belgeleri WAL_GROUP_SIZE belgeye ulaşınca ya da en eski belge
+  WAL_GROUP_MS beklediğinde tek add_many çağrısıyla (grup commit) yazar ve WAL'a 'yazildi' kaydı
+  ekler. Yazım hata verirse belgeler sırada kalır, artan beklemeyle yeniden denenir; yeniden
+  denemeden önce grubun depolamaya ulaşmış kısmı ayıklanır (özetler iki kez artmaz).
+- Limit kontrolü aylık özete WAL'da bekleyen giderleri ekler (aylik_gider); commit'i süren grubun
+  giderleri özete yansımış olabileceğinden, belirsizlik kalkana kadar beklenir (iki kez sayılmaz).
+- Süreç yeniden başlarken WAL okunur: 'yazildi' kaydı olmayan ve depolamada da bulunmayan belgeler
+  yeniden sıraya alınır (yazıldıktan sonra kaydı düşmeden çöken partiler iki kez yazılmaz).
+  Bekleyen belge kalmadığında WAL sıfırlanır.
+"""
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from backend.analiz_motoru import get_analiz_motoru
+from backend.ozet_onbellegi import get_ozet_onbellegi
+from backend.storage import get_repository
+
+
+def _kodla(kayit: Dict[str, Any]) -> bytes:
+    metin = json.dumps(kayit, ensure_ascii=False, separators=(",", ":"), default=lambda v: v.isoformat() if isinstance(v, datetime) else str(v))
+    return (metin + "\n").encode("utf-8")
+
+
+def _coz(data: Dict[str, Any]) -> Dict[str, Any]:
+    tarih = data.get("Tarih")
+    if isinstance(tarih, str):
+        try:
+            data["Tarih"] = datetime.fromisoformat(tarih)
+        except ValueError:
+            pass
+    return data
+
+
+class YazimGunlugu:
+    # Bekleyen belge kalmadığında WAL bu boyutu aştıysa sıfırlanır
+    SIFIRLAMA_BOYUTU = 1 << 20
+    EN_UZUN_BEKLEME_SN = 5.0  # başarısız yazımdan sonraki en uzun yeniden deneme beklemesi
+
+    def __init__(self, yol: str, grup_boyutu: int = 500, grup_ms: float = 50.0, fsync: bool = True):
+        self.yol = yol
+        self.grup_boyutu = grup_boyutu
+        self.grup_sn = grup_ms / 1000.0
+        self.fsync = fsync
+        self._lock = threading.Lock()
+        self._kosul = threading.Condition(self._lock)
+        self._fsync_lock = threading.Lock()
+        # id -> (belge, sıraya alınma zamanı); yazılana kadar (yazım sürerken de) burada kalır
+        self._bekleyen: "OrderedDict[str, Tuple[Dict[str, Any], float]]" = OrderedDict()
+        # (user_email, yil, ay) -> henüz depolamaya yazılmamış gider toplamı (limit kontrolü için)
+        self._bekleyen_gider: Dict[Tuple[Optional[str], int, int], float] = {}
+        # Commit'i denenmiş ama _yazildi'ya ulaşmamış giderler: depolamanın aylık özetinde olup
+        # olmadıkları belirsizdir. Anahtar başına adet ve her denemede artan sürüm (aylik_gider için;
+        # sürüm hiç sıfırlanmaz, anahtar başına bir tamsayıdır)
+        self._yaziliyor: set = set()
+        self._yaziliyor_adet: Dict[Tuple[Optional[str], int, int], int] = {}
+        self._gider_surumu: Dict[Tuple[Optional[str], int, int], int] = {}
+        self._eklenen_sira = 0
+        self._fsync_sira = 0
+        self._isci: Optional[threading.Thread] = None
+        self.eklenen = 0
+        self.yazilan = 0
+        self.grup_sayisi = 0
+        self.basarisiz_deneme = 0
+        self.yeniden_oynatilan = 0
+        self._yeniden_oynat()
+        self._dosya = open(self.yol, "ab")
+        if self._bekleyen:
+            self._baslat()
+
+    # --- Kurtarma ---
+    def _yeniden_oynat(self) -> None:
+        """WAL'daki yazılmamış belgeleri sıraya alır ve günlüğü yalnızca onlarla yeniden yazar."""
+        if not os.path.exists(self.yol):
+            return
+        eklenenler: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        with open(self.yol, "rb") as dosya:
+            for satir in dosya:
+                try:
+                    kayit = json.loads(satir)
+                except ValueError:
+                    # Çökme anında yarım kalan son satır
+                    print(f"⚠️ WAL'da okunamayan satır atlandı: {satir[:80]!r}")
+                    continue
+                if kayit.get("t") == "ekle":
+                    eklenenler[kayit["id"]] = kayit["data"]
+                elif kayit.get("t") == "yazildi":
+                    for transaction_id in kayit.get("ids", []):
+                        eklenenler.pop(transaction_id, None)
+
+        repo = get_repository()
+        simdi = time.monotonic()
+        for transaction_id, data in eklenenler.items():
+            if repo.get(transaction_id) is not None:
+                continue
+            self._siraya_al(transaction_id, _coz(data), simdi)
+            self.yeniden_oynatilan += 1
+
+        gecici = self.yol + ".tmp"
+        with open(gecici, "wb") as dosya:
+            for transaction_id, (data, _) in self._bekleyen.items():
+                dosya.write(_kodla({"t": "ekle", "id": transaction_id, "data": data}))
+            dosya.flush()
+            os.fsync(dosya.fileno())
+        os.replace(gecici, self.yol)
+        if self.yeniden_oynatilan:
+            print(f"♻️ WAL: {self.yeniden_oynatilan} yazılmamış işlem yeniden sıraya alındı")
+
+    # --- Ekleme ---
+    def _siraya_al(self, transaction_id: str, data: Dict[str, Any], zaman: float) -> None:
+        self._bekleyen[transaction_id] = (data, zaman)
+        anahtar = self._gider_anahtari(data)
+        if anahtar is not None:
+            self._bekleyen_gider[anahtar] = self._bekleyen_gider.get(anahtar, 0.0) + float(data.get("Tutar", 0) or 0)
+
+    @staticmethod
+    def _gider_anahtari(data: Dict[str, Any]) -> Optional[Tuple[Optional[str], int, int]]:
+        tarih = data.get("Tarih")
+        if data.get("Islem_Tipi") != "Gider" or not isinstance(tarih, datetime):
+            return None
+        return data.get("User_Email"), tarih.year, tarih.month
+
+    def ekle(self, transaction_id: str, data: Dict[str, Any]) -> None:
+        """Belgeyi WAL'a ekler ve diske indirir (fsync); dönüşte işlem kalıcıdır, depolamaya sonra yazılır."""
+        satir = _kodla({"t": "ekle", "id": transaction_id, "data": data})
+        self._baslat()
+        with self._kosul:
+            self._dosya.write(satir)
+            self._eklenen_sira += 1
+            sira = self._eklenen_sira
+            self._siraya_al(transaction_id, data, time.monotonic())
+            self.eklenen += 1
+            self._kosul.notify_all()
+        self._diske_indir(sira)
+
+    def _diske_indir(self, sira: int) -> None:
+        """Grup fsync: fsync sırasını bekleyen yazar, kendisinden önce gelen herkesin satırlarını da indirir."""
+        with self._fsync_lock:
+            if self._fsync_sira >= sira:
+                return
+            with self._lock:
+                hedef = self._eklenen_sira
+                self._dosya.flush()
+            if self.fsync:
+                os.fsync(self._dosya.fileno())
+            self._fsync_sira = hedef
+
+    # --- Grup commit ---
+    def _baslat(self) -> None:
+        if self._isci is not None and self._isci.is_alive():
+            return
+        with self._lock:
+            if self._isci is None or not self._isci.is_alive():
+                self._isci = threading.Thread(target=self._calis, name="yazim-gunlugu", daemon=True)
+                self._isci.start()
+
+    def _parti_al(self) -> List[Tuple[str, Dict[str, Any]]]:
+        with self._kosul:
+            while not self._bekleyen:
+                self._kosul.wait()
+            # Grup dolana ya da en eski belge grup süresini doldurana kadar bekle
+            while len(self._bekleyen) < self.grup_boyutu:
+                kalan = next(iter(self._bekleyen.values()))[1] + self.grup_sn - time.monotonic()
+                if kalan <= 0:
+                    break
+                self._kosul.wait(kalan)
+            parti = []
+            for transaction_id, (data, _) in self._bekleyen.items():
+                parti.append((transaction_id, data))
+                if len(parti) >= self.grup_boyutu:
+                    break
+            return parti
+
+    def _yazilmislari_ayikla(self, parti: List[Tuple[str, Dict[str, Any]]]) -> List[Tuple[str, Dict[str, Any]]]:
+        """
+        Başarısız bir grup yazımından sonra: depolamada zaten bulunan belgeleri yazılmış sayar ve
+        partiden çıkarır. Firestore add_many bir grubu birden çok batch'te commit eder; sonraki bir
+        batch hata verirse öncekiler kalıcıdır ve yeniden yazılırlarsa aylık özet ve dönem özeti
+        artışları iki kez uygulanır. Kontrol, yeniden oynatmadaki repo.get ile aynıdır.
+        """
+        repo = get_repository()
+        yazilmis: List[Tuple[str, Dict[str, Any]]] = []
+        kalan: List[Tuple[str, Dict[str, Any]]] = []
+        for transaction_id, data in parti:
+            (yazilmis if repo.get(transaction_id) is not None else kalan).append((transaction_id, data))
+        if yazilmis:
+            self._yazildi([i for i, _ in yazilmis], [d for _, d in yazilmis])
+        return kalan
+
+    def _calis(self) -> None:
+        hata_sayisi = 0
+        while True:
+            parti = self._parti_al()
+            hata: Optional[Exception] = None
+            # Commit ve analiz motoru bildirimi aynı yazım bloğunda (backend.analiz_motoru)
+            with get_analiz_motoru().yazim():
+                try:
+                    if hata_sayisi:
+                        parti = self._yazilmislari_ayikla(parti)
+                    ids = [transaction_id for transaction_id, _ in parti]
+                    datas = [data for _, data in parti]
+                    if parti:
+                        self._yaziliyor_isaretle(parti)
+                        get_repository().add_many(datas, ids=ids)
+                except Exception as exc:
+                    hata = exc
+                if hata is None and parti:
+                    self._yazildi(ids, datas)
+            if hata is not None:
+                hata_sayisi += 1
+                with self._lock:
+                    self.basarisiz_deneme += 1
+                bekleme = min(self.EN_UZUN_BEKLEME_SN, 0.1 * 2 ** min(hata_sayisi, 6))
+                print(f"❌ WAL grup yazımı başarısız ({len(parti)} işlem), {bekleme:.1f} sn sonra yeniden denenecek: {hata}")
+                time.sleep(bekleme)
+                continue
+            hata_sayisi = 0
+
+    def _yaziliyor_isaretle(self, parti: List[Tuple[str, Dict[str, Any]]]) -> None:
+        """Commit'ten önce: partinin giderleri _yazildi'ya kadar (hata olsa da) belirsiz sayılır."""
+        with self._kosul:
+            for transaction_id, data in parti:
+                anahtar = self._gider_anahtari(data)
+                if anahtar is None:
+                    continue
+                self._gider_surumu[anahtar] = self._gider_surumu.get(anahtar, 0) + 1
+                if transaction_id not in self._yaziliyor:
+                    self._yaziliyor.add(transaction_id)
+                    self._yaziliyor_adet[anahtar] = self._yaziliyor_adet.get(anahtar, 0) + 1
+
+    def _yazildi(self, ids: List[str], datas: List[Dict[str, Any]]) -> None:
+        motor = get_analiz_motoru()
+        for transaction_id, data in zip(ids, datas):
+            motor.islem_eklendi(data, transaction_id)
+        onbellek = get_ozet_onbellegi()
+        for user_email in {d.get("User_Email") for d in datas}:
+            onbellek.gecersiz_kil(user_email)
+
+        with self._kosul:
+            # 'yazildi' kaydı fsync edilmez: kaybolursa yeniden oynatma depolamada varlığını kontrol eder
+            self._dosya.write(_kodla({"t": "yazildi", "ids": ids}))
+            self._dosya.flush()
+            for transaction_id, data in zip(ids, datas):
+                self._bekleyen.pop(transaction_id, None)
+                anahtar = self._gider_anahtari(data)
+                if anahtar is not None:
+                    if transaction_id in self._yaziliyor:
+                        self._yaziliyor.discard(transaction_id)
+                        adet = self._yaziliyor_adet.pop(anahtar, 1) - 1
+                        if adet > 0:
+                            self._yaziliyor_adet[anahtar] = adet
+                    kalan = self._bekleyen_gider.get(anahtar, 0.0) - float(data.get("Tutar", 0) or 0)
+                    if kalan < 0.005:
+                        self._bekleyen_gider.pop(anahtar, None)
+                    else:
+                        self._bekleyen_gider[anahtar] = kalan
+            self.yazilan += len(ids)
+            self.grup_sayisi += 1
+            if not self._bekleyen and self._dosya.tell() > self.SIFIRLAMA_BOYUTU:
+                self._dosya.truncate(0)
+                self._dosya.seek(0)
+            self._kosul.notify_all()
+
+    # --- Sorgular ---
+    def bekliyor_mu(self, transaction_id: str) -> bool:
+        with self._lock:
+            return transaction_id in self._bekleyen
+
+    def bekleyen_gider(self, user_email: Optional[str], yil: int, ay: int) -> float:
+        """Kullanıcının o ayına ait, WAL'da bekleyen (depolamanın aylık özetinde henüz olmayan) gider toplamı."""
+        with self._lock:
+            return self._bekleyen_gider.get((user_email, yil, ay), 0.0)
+
+    def aylik_gider(
+        self, user_email: Optional[str], yil: int, ay: int, depolama_toplami: Callable[[], float], zaman_asimi: float = 1.0
+    ) -> float:
+        """
+        Depolamanın aylık gider özeti (depolama_toplami()) ile WAL'da bekleyen giderlerin toplamı.
+        O ayın bir gideri commit ile _yazildi arasındaysa özet onu içeriyor olabilir; bu durumda
+        belirsizlik kalkana kadar beklenir ve özet okunurken yeni bir commit başlarsa okuma tekrarlanır.
+        zaman_asimi dolarsa (ör. depolama hata veriyor) son okuma olduğu gibi döner.
+        """
+        anahtar = (user_email, yil, ay)
+        son = time.monotonic() + zaman_asimi
+        while True:
+            with self._kosul:
+                self._kosul.wait_for(
+                    lambda: not self._yaziliyor_adet.get(anahtar), timeout=max(0.0, son - time.monotonic())
+                )
+                surum = self._gider_surumu.get(anahtar, 0)
+                bekleyen = self._bekleyen_gider.get(anahtar, 0.0)
+            toplam = depolama_toplami()
+            with self._lock:
+                tutarli = not self._yaziliyor_adet.get(anahtar) and self._gider_surumu.get(anahtar, 0) == surum
+            if tutarli or time.monotonic() >= son:
+                return toplam + bekleyen
+
+    def bosalt(self, zaman_asimi: Optional[float] = None) -> bool:
+        """Bekleyen tüm belgeler depolamaya yazılana kadar bekler. Dönüş: süre dolmadan boşaldıysa True."""
+        with self._kosul:
+            return self._kosul.wait_for(lambda: not self._bekleyen, timeout=zaman_asimi)
+
+    def istatistik(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "bekleyen": len(self._bekleyen),
+                "eklenen": self.eklenen,
+                "yazilan": self.yazilan,
+                "grup_sayisi": self.grup_sayisi,
+                "basarisiz_deneme": self.basarisiz_deneme,
+                "yeniden_oynatilan": self.yeniden_oynatilan,
+            }
+
+
+_gunluk_lock = threading.Lock()
+_gunluk: Optional[YazimGunlugu] = None
+
+
+def yazim_arkasi_acik() -> bool:
+    return os.getenv("WRITE_BEHIND", "").strip().lower() in ("1", "true", "yes", "on")
+
+
+def get_yazim_gunlugu() -> Optional[YazimGunlugu]:
+    """WRITE_BEHIND açıksa süreç genelinde tek yazım günlüğü (Singleton), kapalıysa None."""
+    global _gunluk
+    if not yazim_arkasi_acik():
+        return None
+    if _gunluk is None:
+        with _gunluk_lock:
+            if _gunluk is None:
+                _gunluk = YazimGunlugu(
+                    os.getenv("WAL_PATH", "cebimdekiveri.wal"),
+                    grup_boyutu=int(os.getenv("WAL_GROUP_SIZE", "500")),
+                    grup_ms=float(os.getenv("WAL_GROUP_MS", "50")),
+                    fsync=os.getenv("WAL_FSYNC", "1").strip().lower() not in ("0", "false", "no", "off"),
+                )
+    return _gunluk
@@ -0,0 +1,57 @@
+"""
+Harcama anomalisi dedektörü benchmark'ı.
+
+- Ekleme yolu: gider başına puanlama + EWMA güncellemesi (µs)
+- Geçmişin yüklenmesi: giderleri tek tek gözlemleme (döngü) vs kapalı biçim EWMA ile vektörel
+  yükleme (np.bincount); iki yolun istatistiklerinin aynı olduğu da denetlenir
+
+Çalıştırma (proje kökünden):
+    python -m benchmarks.bench_anomali
+    python -m benchmarks.bench_anomali --rows 1000000 --users 200
+"""
+import argparse
+import random
+import time
+
+import numpy as np
+
+from backend.anomali import AnomaliDedektoru
+
+KATEGORI_SAYISI = 12
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=300_000)
+    parser.add_argument("--users", type=int, default=100)
+    args = parser.parse_args()
+
+    rnd = random.Random(5)
+    kullanicilar = [f"kullanici{rnd.randrange(args.users)}@example.com" for _ in range(args.rows)]
+    kategori = np.array([rnd.randrange(KATEGORI_SAYISI) for _ in range(args.rows)], dtype=np.int64)
+    tutar = np.round(np.random.default_rng(5).lognormal(5, 0.6, args.rows), 2)
+    print(f"gider: {args.rows:,}, kullanıcı: {args.users}, kategori: {KATEGORI_SAYISI}")
+
+    dongu = AnomaliDedektoru()
+    t0 = time.perf_counter()
+    for u, k, x in zip(kullanicilar, kategori.tolist(), tutar.tolist()):
+        dongu.gozlemle(u, k, x)
+    eski = (time.perf_counter() - t0) * 1000
+    print(f"{'ekleme yolu (gider başına)':<32} {eski * 1000 / args.rows:>10.2f} µs")
+    print(f"{'yükleme: tek tek gözlemleme':<32} {eski:>10.1f} ms")
+
+    vektorel = AnomaliDedektoru()
+    t0 = time.perf_counter()
+    istatistikler = vektorel._vektorel_istatistikler(kullanicilar, kategori, tutar)
+    yeni = (time.perf_counter() - t0) * 1000
+    fark = max(
+        max(abs(a.ortalama - dongu._istatistikler[k].ortalama), abs(a.varyans - dongu._istatistikler[k].varyans))
+        for k, a in istatistikler.items()
+    )
+    ayni = istatistikler.keys() == dongu._istatistikler.keys() and fark < 1e-9
+    print(f"{'yükleme: vektörel (bincount)':<32} {yeni:>10.1f} ms  ({eski / yeni:.1f}x)  aynı mı: {'evet' if ayni else 'HAYIR'}")
+    print(f"anomali (tek tek yolda): {dongu.anomali:,}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+API verim (istek/sn) benchmark'ı: 50 ve 500 eşzamanlı istemci.
+
+Varsayılan olarak uygulama süreç içinde (httpx ASGITransport) ve bellek içi depolama ile çalışır;
+--latency-ms ile her depolama çağrısına yapay ağ gecikmesi eklenerek yavaş Firestore taklit edilir.
+--base-url verilirse çalışan bir sunucu (ör. uvicorn backend.main:app) ölçülür.
+
+Çalıştırma (proje kökünden):
+    python -m benchmarks.bench_async_api
+    python -m benchmarks.bench_async_api --clients 50 500 --requests 5000 --latency-ms 20
+    python -m benchmarks.bench_async_api --base-url http://localhost:8000
+"""
+import argparse
+import asyncio
+import os
+import random
+import time
+from datetime import datetime, timedelta
+
+import httpx
+
+os.environ.setdefault("STORAGE_BACKEND", "memory")
+
+from backend.storage import SQLiteTransactionRepository, set_repository  # noqa: E402
+
+ENDPOINTLER = ["/dashboard-data", "/transactions?limit=50", "/health"]
+
+
+class _GecikmeliRepository(SQLiteTransactionRepository):
+    """Her çağrıya sabit gecikme ekleyen bellek içi depolama (uzak veritabanı taklidi)."""
+
+    def __init__(self, gecikme_sn: float):
+        super().__init__(":memory:")
+        self.gecikme_sn = gecikme_sn
+
+    def _bekle(self):
+        if self.gecikme_sn:
+            time.sleep(self.gecikme_sn)
+
+    def query_range(self, *args, **kwargs):
+        self._bekle()
+        return super().query_range(*args, **kwargs)
+
+    def ping(self):
+        self._bekle()
+        return super().ping()
+
+
+def _veri_yukle(repo, n: int) -> None:
+    random.seed(7)
+    baslangic = datetime(2023, 1, 1)
+    repo.add_many([
+        {
+            "User_Email": f"user{i % 20}@example.com",
+            "Tarih": baslangic + timedelta(hours=3 * i),
+            "Kategori": random.choice(["Market", "Fatura", "Ulaşım"]),
+            "Tutar": round(random.uniform(10, 2000), 2),
+            "Islem_Tipi": "Gider" if i % 4 else "Gelir",
+            "Aciklama": f"islem {i}",
+        }
+        for i in range(n)
+    ])
+
+
+async def _calistir(client: httpx.AsyncClient, istemci: int, toplam_istek: int) -> float:
+    kalan = toplam_istek
+    hatalar = 0
+
+    async def calisan():
+        nonlocal kalan, hatalar
+        while kalan > 0:
+            kalan -= 1
+            r = await client.get(random.choice(ENDPOINTLER))
+            if r.status_code >= 400:
+                hatalar += 1
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(calisan() for _ in range(istemci)))
+    sure = time.perf_counter() - t0
+    if hatalar:
+        print(f"  ⚠️ {hatalar} hatalı yanıt")
+    return toplam_istek / sure
+
+
+async def main_async(args) -> None:
+    if args.base_url:
+        client = httpx.AsyncClient(base_url=args.base_url, timeout=60)
+    else:
+        repo = _GecikmeliRepository(args.latency_ms / 1000.0)
+        _veri_yukle(repo, args.rows)
+        set_repository(repo)
+        from backend.main import app
+
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench", timeout=60)
+
+    async with client:
+        await client.get("/dashboard-data")  # ısınma (analiz motoru kurulumu)
+        print(f"{'istemci':>8} {'istek':>8} {'istek/sn':>12}")
+        for istemci in args.clients:
+            rps = await _calistir(client, istemci, args.requests)
+            print(f"{istemci:>8} {args.requests:>8} {rps:>12,.0f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--clients", type=int, nargs="+", default=[50, 500])
+    parser.add_argument("--requests", type=int, default=3000)
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--base-url", default=None)
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
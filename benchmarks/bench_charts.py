@@ -0,0 +1,104 @@
+"""
+Sunucu tarafı grafik çizimi benchmark'ı.
+
+Sentetik bir analiz özetinden (36 ay, ~1000 gün, 8 kategori) grafikler çizilir:
+
+- Aynı süreçte thread havuzunda çizim (GIL'i sunucuyla paylaşır) vs süreç havuzunda çizim;
+  çizimler sürerken ana süreçteki kısa bir Python işinin (istek işleme yerine) gecikmesi de ölçülür
+- Önbellek isabeti (aynı veri + seçenekler)
+
+Çalıştırma (proje kökünden; matplotlib gerekir):
+    python -m benchmarks.bench_charts
+    python -m benchmarks.bench_charts --renders 32 --workers 4
+"""
+import argparse
+import random
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from datetime import date, timedelta
+
+from backend.grafik_cizici import GrafikCizici, cizim_verisi, grafik_ciz
+
+KATEGORILER = ["Market", "Fatura", "Kira", "Ulaşım", "Eğlence", "Sağlık", "Eğitim", "Giyim"]
+
+
+def _ozet(rnd: random.Random, kayma: float = 0.0):
+    bas = date(2022, 1, 1)
+    return {
+        "kategori_dagilimi": {k: rnd.uniform(1000, 50000) + kayma for k in KATEGORILER},
+        "aylik_ozet": [
+            {"ay": date(2022 + i // 12, i % 12 + 1, 1).isoformat(), "gelir": rnd.uniform(20000, 30000) + kayma,
+             "gider": rnd.uniform(15000, 32000)}
+            for i in range(36)
+        ],
+        "tahmin": {"gelir": 25000.0, "gider": 24000.0},
+        "gunluk_ozet": [
+            {"gun": (bas + timedelta(days=i)).isoformat(), "gelir": rnd.uniform(0, 2000) + kayma,
+             "gider": rnd.uniform(0, 2000)}
+            for i in range(1000)
+        ],
+    }
+
+
+def _ana_surec_gecikmesi(dur: threading.Event, olcumler: list) -> None:
+    # İstek işlemenin yerine geçen kısa saf Python işi: 1 ms bekleyip uyanır, biraz çalışır. Uyanan
+    # thread GIL'i bekledikçe (1 ms'nin üstündeki) gecikme büyür
+    while not dur.is_set():
+        t0 = time.perf_counter()
+        time.sleep(0.001)
+        sum(range(2000))
+        olcumler.append((time.perf_counter() - t0) * 1000 - 1.0)
+
+
+def _calistir(gorevler, gonder) -> tuple:
+    dur, olcumler = threading.Event(), []
+    izleyici = threading.Thread(target=_ana_surec_gecikmesi, args=(dur, olcumler))
+    izleyici.start()
+    t0 = time.perf_counter()
+    wait([gonder(g) for g in gorevler])
+    sure = (time.perf_counter() - t0) * 1000
+    dur.set()
+    izleyici.join()
+    olcumler.sort()
+    return sure, olcumler[int(len(olcumler) * 0.99)] if olcumler else 0.0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--renders", type=int, default=16)
+    parser.add_argument("--workers", type=int, default=2)
+    args = parser.parse_args()
+
+    rnd = random.Random(7)
+    turler = ["categories", "monthly", "daily"]
+    gorevler = [(turler[i % 3], _ozet(rnd, kayma=i)) for i in range(args.renders)]
+    secenekler = {"bicim": "png", "genislik": 1200, "yukseklik": 600}
+
+    grafik_ciz("categories", cizim_verisi("categories", gorevler[0][1]), secenekler)  # matplotlib'i ısıt
+    with ThreadPoolExecutor(args.workers) as thread_havuzu:
+        sure, p99 = _calistir(
+            gorevler, lambda g: thread_havuzu.submit(grafik_ciz, g[0], cizim_verisi(g[0], g[1]), secenekler)
+        )
+    print(f"{'thread havuzu':<24} {args.renders} çizim {sure:>8.0f} ms   ana süreç p99 {p99:>6.2f} ms")
+
+    cizici = GrafikCizici(isci=args.workers)
+    try:
+        cizici.ciz("categories", _ozet(rnd, kayma=-1))[1].result()  # işçileri başlat
+        sure, p99 = _calistir(gorevler, lambda g: cizici.ciz(g[0], g[1])[1])
+        print(f"{'süreç havuzu':<24} {args.renders} çizim {sure:>8.0f} ms   ana süreç p99 {p99:>6.2f} ms")
+
+        isabet = []
+        for tur, ozet in gorevler:
+            t0 = time.perf_counter()
+            cizici.ciz(tur, ozet)[1].result()
+            isabet.append((time.perf_counter() - t0) * 1000)
+        print(f"{'önbellek isabeti':<24} medyan {statistics.median(isabet):.3f} ms / çizim")
+        print(cizici.istatistik())
+    finally:
+        cizici.kapat()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""
+Panel (gunluk_ozet) yük boyutu benchmark'ı.
+
+Farklı geçmiş uzunluklarında tüm günleri içeren gunluk_ozet ile seyreltilmiş (min/max, varsayılan
+nokta sınırı) ve hafta/ay kovalı çıktının JSON boyutu ve hesaplama süresi karşılaştırılır.
+
+Çalıştırma (proje kökünden):
+    python -m benchmarks.bench_dashboard_payload
+    python -m benchmarks.bench_dashboard_payload --years 1 5 20 --points 500
+"""
+import argparse
+import time
+
+import numpy as np
+
+from backend.grafik_analiz import VARSAYILAN_NOKTA, gunluk_seyrelt
+from backend.serializer import dumps
+
+
+def _gunluk(yil: int):
+    rnd = np.random.default_rng(yil)
+    gunler = np.arange(np.datetime64("2000-01-01"), np.datetime64("2000-01-01") + 365 * yil)
+    gelir = np.where(rnd.random(len(gunler)) < 0.05, rnd.uniform(5_000, 40_000, len(gunler)), 0.0).round(2)
+    gider = rnd.gamma(2.0, 300.0, len(gunler)).round(2)
+    return [
+        {"gun": g, "gelir": a, "gider": b}
+        for g, a, b in zip(np.datetime_as_string(gunler, unit="D").tolist(), gelir.tolist(), gider.tolist())
+    ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--years", type=int, nargs="+", default=[1, 5, 20])
+    parser.add_argument("--points", type=int, default=VARSAYILAN_NOKTA)
+    args = parser.parse_args()
+
+    print(f"{'yıl':>4} {'çıktı':<22} {'nokta':>7} {'KB':>9} {'ms':>8}")
+    for yil in args.years:
+        gunluk = _gunluk(yil)
+        print(f"{yil:>4} {'tüm günler':<22} {len(gunluk):>7,} {len(dumps(gunluk)) / 1024:>9.1f} {'':>8}")
+        for kova in ("day", "week", "month"):
+            t0 = time.perf_counter()
+            sonuc = gunluk_seyrelt(gunluk, kova, args.points)
+            ms = (time.perf_counter() - t0) * 1000
+            print(f"{yil:>4} {f'{kova}, <= {args.points} nokta':<22} {len(sonuc):>7,} {len(dumps(sonuc)) / 1024:>9.1f} {ms:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+_fetch_transactions_df ingestion benchmark: satır bazlı (eski) ve sütunlu/vektörel (yeni) yol.
+
+Belgeler bellekte üretilir; depolama maliyeti ölçüme katılmaz, yalnızca DataFrame'e dönüşüm ölçülür.
+
+Çalıştırma (proje kökünden):
+    python -m benchmarks.bench_fetch_df                    # 10k, 100k, 1M
+    python -m benchmarks.bench_fetch_df --sizes 10000 100000
+"""
+import argparse
+import random
+import time
+from datetime import datetime, timedelta, timezone
+
+import pandas as pd
+
+from backend.grafik_analiz import _belgelerden_df
+
+
+def _eski_belgelerden_df(docs) -> pd.DataFrame:
+    """Satır başına dict + pd.to_datetime yapan önceki uygulama (karşılaştırma için birebir kopya)."""
+    rows = []
+    for _, data in docs:
+        tarih = data.get("Tarih")
+        islem_tipi = data.get("Islem_Tipi")
+        aciklama = data.get("Aciklama")
+        kaynak = data.get("Kaynak")
+        tutar = data.get("Tutar")
+        kategori_raw = data.get("Kategori") or data.get("kategori")
+        if (not kategori_raw) and islem_tipi == "Gider" and aciklama:
+            kategori_raw = aciklama
+        kategori = (kategori_raw or "Bilinmiyor")
+        rows.append({
+            "Tarih": pd.to_datetime(tarih) if tarih is not None else pd.NaT,
+            "Kategori": kategori,
+            "Tutar": float(tutar) if tutar is not None else 0.0,
+            "Islem_Tipi": islem_tipi,
+            "Aciklama": aciklama,
+            "Kaynak": kaynak,
+        })
+    if not rows:
+        return pd.DataFrame(columns=["Tarih", "Kategori", "Tutar", "Islem_Tipi", "Aciklama", "Kaynak"])
+    df = pd.DataFrame(rows)
+    df = df.dropna(subset=["Tarih"]).copy()
+    df["Tarih"] = pd.to_datetime(df["Tarih"])
+    return df
+
+
+def _belgeler(n: int):
+    random.seed(n)
+    baslangic = datetime(2020, 1, 1, tzinfo=timezone.utc)  # Firestore UTC'li datetime döndürür
+    kategoriler = ["Market", "Fatura", "Ulaşım", "Eğlence", "Kira", None]
+    docs = []
+    for i in range(n):
+        gider = random.random() < 0.7
+        docs.append((f"doc{i}", {
+            "User_Email": f"user{i % 50}@example.com",
+            "Tarih": baslangic + timedelta(minutes=13 * i),
+            "Kategori": random.choice(kategoriler) if gider else None,
+            "Tutar": round(random.uniform(10, 5000), 2),
+            "Islem_Tipi": "Gider" if gider else "Gelir",
+            "Aciklama": f"islem {i % 100}",
+            "Kaynak": None if gider else "Şirket",
+        }))
+    return docs
+
+
+def _olc(fn, docs) -> float:
+    t0 = time.perf_counter()
+    fn(docs)
+    return time.perf_counter() - t0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    args = parser.parse_args()
+
+    print(f"{'n':>10} {'eski (satır/sn)':>18} {'yeni (satır/sn)':>18} {'hızlanma':>10}")
+    for n in args.sizes:
+        docs = _belgeler(n)
+        eski = _olc(_eski_belgelerden_df, docs)
+        yeni = _olc(_belgelerden_df, docs)
+        print(f"{n:>10} {n / eski:>18,.0f} {n / yeni:>18,.0f} {eski / yeni:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+İşlem hidrasyonu benchmark'ı: depolama belgelerinden Gelir/Gider nesnesi üretme hızı (satır/sn).
+
+Satır başına TransactionFactory.create ile TransactionFactory.create_many (parti başına bir kez
+çözülen alan eşlemesi, satır başına yazım denemesi yok) karşılaştırılır. Belgeler depolamanın döndürdüğü biçimdedir
+(büyük harfli alan adları, Tarih datetime).
+
+Çalıştırma (proje kökünden):
+    python -m benchmarks.bench_hydration
+    python -m benchmarks.bench_hydration --sizes 100000 1000000 --chunk 5000
+"""
+import argparse
+import random
+import time
+from datetime import datetime, timedelta
+
+from backend.sistem_modelleri import TransactionFactory
+
+KATEGORILER = ["Market", "Fatura", "Ulaşım", "Kira", "Eğlence", "Sağlık"]
+
+
+def _belgeler(n: int):
+    random.seed(5)
+    baslangic = datetime(2022, 1, 1)
+    belgeler = []
+    for i in range(n):
+        gelir = i % 4 == 0
+        data = {
+            "id": f"{i:032x}",
+            "User_Email": f"user{i % 50}@example.com",
+            "Tarih": baslangic + timedelta(minutes=7 * i),
+            "Kategori": None if gelir else random.choice(KATEGORILER),
+            "Tutar": round(random.uniform(10, 2000), 2),
+            "Islem_Tipi": "Gelir" if gelir else "Gider",
+            "Aciklama": f"islem {i}",
+        }
+        if gelir:
+            data.update(Kaynak="Şirket", DuzenliMi=True)
+        else:
+            data["ZorunluMu"] = False
+        belgeler.append(data)
+    return belgeler
+
+
+def _tekil(belgeler, _parca):
+    return [TransactionFactory.create(d) for d in belgeler]
+
+
+def _toplu(belgeler, parca):
+    sonuc = []
+    for bas in range(0, len(belgeler), parca):
+        sonuc.extend(TransactionFactory.create_many(belgeler[bas:bas + parca]))
+    return sonuc
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100_000, 1_000_000])
+    parser.add_argument("--chunk", type=int, default=5000, help="create_many parça boyutu (gecmisi_yukle ile aynı)")
+    args = parser.parse_args()
+
+    print(f"{'satır':>10} {'yöntem':>12} {'süre (sn)':>10} {'satır/sn':>12}")
+    for n in args.sizes:
+        belgeler = _belgeler(n)
+        sureler = {}
+        for ad, fn in (("create", _tekil), ("create_many", _toplu)):
+            t0 = time.perf_counter()
+            islemler = fn(belgeler, args.chunk)
+            sureler[ad] = time.perf_counter() - t0
+            assert len(islemler) == n and islemler[-1].tarih == belgeler[-1]["Tarih"]
+            del islemler
+            print(f"{n:>10,} {ad:>12} {sureler[ad]:>10.2f} {n / sureler[ad]:>12,.0f}")
+        print(f"{'':>10} {'hızlanma':>12} {sureler['create'] / sureler['create_many']:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+ButceYonetici.islemler bellek benchmark'ı: Gelir/Gider nesne listesi vs IslemDeposu.
+
+Her boyut için tracemalloc ile ayrılan bellek ölçülür ve 1M işlem başına MB olarak raporlanır;
+ayrıca tek bir işlemin silinme süresi (liste yeniden kurma vs mezar taşı) karşılaştırılır.
+
+Çalıştırma (proje kökünden):
+    python -m benchmarks.bench_islem_deposu
+    python -m benchmarks.bench_islem_deposu --sizes 100000 1000000
+"""
+import argparse
+import gc
+import random
+import time
+import tracemalloc
+import uuid
+from datetime import datetime, timedelta
+
+from backend.islem_deposu import IslemDeposu
+from backend.sistem_modelleri import Gelir, Gider
+
+KATEGORILER = ["Market", "Fatura", "Ulaşım", "Kira", "Eğlence", "Sağlık"]
+# Gerçek verideki gibi açıklamalar tekrar eder; ID'ler (uuid hex) her satırda farklıdır
+ACIKLAMALAR = [f"{k} {j}" for k in KATEGORILER for j in range(500)]
+
+
+def _islemler(n: int):
+    random.seed(11)
+    baslangic = datetime(2022, 1, 1)
+    for i in range(n):
+        if i % 4:
+            islem = Gider(round(random.uniform(10, 2000), 2), random.choice(ACIKLAMALAR), random.choice(KATEGORILER), None, f"user{i % 50}@example.com", id=uuid.UUID(int=random.getrandbits(128)).hex)
+        else:
+            islem = Gelir(round(random.uniform(1000, 30000), 2), "Maaş", "Şirket", None, f"user{i % 50}@example.com", id=uuid.UUID(int=random.getrandbits(128)).hex)
+        islem.tarih = baslangic + timedelta(minutes=7 * i)
+        yield islem
+
+
+def _olc(olustur):
+    gc.collect()
+    tracemalloc.start()
+    nesne = olustur()
+    boyut, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return nesne, boyut
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100_000, 1_000_000])
+    args = parser.parse_args()
+
+    print(f"{'satır':>10} {'liste MB/1M':>12} {'depo MB/1M':>12} {'oran':>6} {'liste sil ms':>13} {'depo sil ms':>12}")
+    for n in args.sizes:
+        liste, liste_b = _olc(lambda: list(_islemler(n)))
+        hedef = liste[n // 2].id
+        t0 = time.perf_counter()
+        liste = [i for i in liste if i.id != hedef]
+        liste_sil = (time.perf_counter() - t0) * 1000
+        del liste
+        gc.collect()
+
+        depo, depo_b = _olc(lambda: IslemDeposu(_islemler(n)))
+        t0 = time.perf_counter()
+        depo.sil(hedef)
+        depo_sil = (time.perf_counter() - t0) * 1000
+        assert len(depo) == n - 1
+        del depo
+
+        olcek = 1_000_000 / n / (1024 * 1024)
+        print(
+            f"{n:>10,} {liste_b * olcek:>12.1f} {depo_b * olcek:>12.1f} {liste_b / depo_b:>5.1f}x "
+            f"{liste_sil:>13.2f} {depo_sil:>12.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Kategori kanonikleştirme benchmark'ı.
+
+- Kategori dağılımı: her istekte metin normalizasyonu (fillna/astype(str)/strip/replace/title) +
+  metinle gruplama (eski) vs yazımda atanmış Kategori_Id ile tamsayı gruplama (yeni)
+- Taksit bayrağı: her çağrıda upper() + alt metin taraması (eski) vs tablodaki hazır bayrak (yeni)
+
+Çalıştırma (proje kökünden):
+    python -m benchmarks.bench_kategori
+    python -m benchmarks.bench_kategori --rows 100000 1000000
+"""
+import argparse
+import random
+import time
+
+import numpy as np
+import pandas as pd
+
+from backend.kategori import get_kategori_tablosu, taksitli_kategori_mi
+
+HAM_KATEGORILER = ["market", " Market", "MARKET", "fatura", "Kredi Kartı", "ulaşım", "kira", "eğlence", None, ""]
+_ESKI_TAKSIT = ("FATURA", "KREDI", "TAKSIT", "KREDİ", "ÖDEME")
+
+
+def _eski_taksitli(kategori):
+    kategori_upper = (kategori or "").upper()
+    return any(k in kategori_upper for k in _ESKI_TAKSIT)
+
+
+def _sure(fn, tekrar: int = 3) -> float:
+    en_iyi = float("inf")
+    for _ in range(tekrar):
+        t0 = time.perf_counter()
+        fn()
+        en_iyi = min(en_iyi, time.perf_counter() - t0)
+    return en_iyi * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, nargs="+", default=[100_000, 1_000_000])
+    args = parser.parse_args()
+    tablo = get_kategori_tablosu()
+
+    print(f"{'satır':>10} {'ölçüm':<36} {'ms':>10}")
+    for n in args.rows:
+        rnd = random.Random(n)
+        ham = [rnd.choice(HAM_KATEGORILER) for _ in range(n)]
+        tutar = np.round(np.random.default_rng(n).uniform(10, 5000, n), 2)
+        eski_df = pd.DataFrame({"Kategori": pd.Series(ham, dtype=object), "Tutar": tutar})
+        yeni_df = pd.DataFrame({"Kategori_Id": tablo.kimlikler(ham), "Tutar": tutar})
+
+        def eski():
+            kategori = (
+                eski_df["Kategori"].fillna("Bilinmiyor").astype(str).str.strip()
+                .replace({"": "Bilinmiyor"}).str.title()
+            )
+            toplam = eski_df.assign(Kategori=kategori).groupby("Kategori")["Tutar"].sum()
+            return {str(k): float(v) for k, v in toplam.to_dict().items()}
+
+        def yeni():
+            toplam = yeni_df.groupby("Kategori_Id")["Tutar"].sum()
+            return dict(zip(tablo.adlar(toplam.index.tolist()), toplam.to_numpy().tolist()))
+
+        a, b = _sure(eski), _sure(yeni)
+        print(f"{n:>10,} {'dağılım: metin normalizasyonu':<36} {a:>10.1f}")
+        print(f"{n:>10,} {'dağılım: Kategori_Id gruplama':<36} {b:>10.1f}  ({a / b:.1f}x)")
+
+        a = _sure(lambda: [_eski_taksitli(k) for k in ham])
+        b = _sure(lambda: [taksitli_kategori_mi(k) for k in ham])
+        print(f"{n:>10,} {'taksit: upper + tarama':<36} {a:>10.1f}")
+        print(f"{n:>10,} {'taksit: tablo bayrağı':<36} {b:>10.1f}  ({a / b:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+Bildirim dağıtıcısı benchmark'ı: limit ayarlı bir kullanıcıya art arda gider eklenir.
+
+Her islem_ekle eşik ve bakiye kontrolü yapar; dağıtıcı yalnızca eşik/seviye yükseldiğinde bildirim
+üretir ve gözlemcilere arka planda iletir. Rapor: eklenen gider, iletilen bildirim, birleştirilen
+(bastırılan) tekrar ve ekleme başına gecikme.
+
+Çalıştırma (proje kökünden):
+    python -m benchmarks.bench_notifications
+    python -m benchmarks.bench_notifications --inserts 1000 --limit 50000
+"""
+import argparse
+import os
+import time
+from datetime import datetime, timedelta
+
+os.environ.setdefault("STORAGE_BACKEND", "memory")
+
+from backend.bildirim import get_bildirim_dagitici  # noqa: E402
+from backend.sistem_modelleri import ButceYonetici, Gelir, Gider, Gozlemci  # noqa: E402
+
+
+class _Sayac(Gozlemci):
+    def __init__(self):
+        self.mesajlar = []
+
+    def update(self, bildirim):
+        self.mesajlar.append(bildirim.mesaj)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--inserts", type=int, default=1000)
+    parser.add_argument("--limit", type=float, default=50_000.0)
+    args = parser.parse_args()
+
+    yonetici = ButceYonetici("bench@example.com")
+    sayac = _Sayac()
+    yonetici.gozlemci_ekle(sayac)
+    yonetici.aylikLimit = args.limit
+    yonetici.islem_ekle(Gelir(60_000, "Maaş", "Şirket", datetime(2024, 5, 1), "bench@example.com"))
+
+    baslangic = datetime(2024, 5, 1)
+    t0 = time.perf_counter()
+    for i in range(args.inserts):
+        # Ay boyunca eşit dağılmış, toplamı limitin ~1.2 katı olan giderler
+        tutar = round(args.limit * 1.2 / args.inserts, 2)
+        yonetici.islem_ekle(Gider(tutar, f"gider {i}", "Market", baslangic + timedelta(minutes=40 * i), "bench@example.com"))
+    sure = time.perf_counter() - t0
+    dagitici = get_bildirim_dagitici()
+    dagitici.bosalt()
+
+    istatistik = dagitici.istatistik()
+    print(f"eklenen gider        : {args.inserts}")
+    print(f"iletilen bildirim    : {len(sayac.mesajlar)}")
+    print(f"birleştirilen tekrar : {istatistik['birlestirilen']}")
+    print(f"kaydedilen bildirim  : {istatistik['kaydedilen']}")
+    print(f"ekleme başına        : {sure / args.inserts * 1000:.3f} ms")
+    for mesaj in sayac.mesajlar:
+        print(f"  - {mesaj}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Rapor dışa aktarma benchmark'ı: 1M işlemlik geçmişin CSV (ve kuruluysa XLSX) olarak akış halinde
+üretilme hızı (satır/sn, MB/sn).
+
+Belgeler bellek içi SQLite deposuna yüklenir ve rapor, endpoint'in yaptığı gibi
+query_range -> Rapor.akit zinciriyle üretilir; parçalar yalnızca sayılır, biriktirilmez.
+
+Çalıştırma (proje kökünden):
+    python -m benchmarks.bench_report_export
+    python -m benchmarks.bench_report_export --rows 1000000 --tip csv xlsx
+"""
+import argparse
+import random
+import time
+from datetime import datetime, timedelta
+
+from backend.sistem_modelleri import RaporFactory
+from backend.storage import SQLiteTransactionRepository
+
+KATEGORILER = ["Market", "Fatura", "Ulaşım", "Kira", "Eğlence", "Sağlık"]
+YUKLEME_PARCASI = 10_000
+
+
+def _yukle(repo: SQLiteTransactionRepository, n: int) -> None:
+    random.seed(9)
+    baslangic = datetime(2020, 1, 1)
+    for bas in range(0, n, YUKLEME_PARCASI):
+        parca = []
+        for i in range(bas, min(n, bas + YUKLEME_PARCASI)):
+            gelir = i % 4 == 0
+            parca.append({
+                "User_Email": "user@example.com",
+                "Tarih": baslangic + timedelta(minutes=3 * i),
+                "Kategori": None if gelir else random.choice(KATEGORILER),
+                "Tutar": round(random.uniform(10, 2000), 2),
+                "Islem_Tipi": "Gelir" if gelir else "Gider",
+                "Aciklama": f"islem {i}",
+                "Kaynak": "Şirket" if gelir else None,
+            })
+        repo.add_many(parca)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--tip", nargs="+", default=["csv", "xlsx"])
+    args = parser.parse_args()
+
+    repo = SQLiteTransactionRepository(":memory:")
+    t0 = time.perf_counter()
+    _yukle(repo, args.rows)
+    print(f"yükleme: {args.rows:,} satır, {time.perf_counter() - t0:.1f} sn")
+
+    print(f"{'tip':>6} {'süre (sn)':>10} {'satır/sn':>12} {'MB':>8} {'MB/sn':>8} {'parça':>7}")
+    for tip in args.tip:
+        rapor = RaporFactory.rapor_uret(tip)
+        boyut = parca_sayisi = 0
+        t0 = time.perf_counter()
+        try:
+            for parca in rapor.akit(repo.query_range(user_email="user@example.com")):
+                boyut += len(parca)
+                parca_sayisi += 1
+        except (NotImplementedError, RuntimeError) as exc:
+            print(f"{tip:>6} atlandı: {exc}")
+            continue
+        sure = time.perf_counter() - t0
+        mb = boyut / 1e6
+        print(f"{tip:>6} {sure:>10.2f} {args.rows / sure:>12,.0f} {mb:>8.1f} {mb / sure:>8.1f} {parca_sayisi:>7,}")
+
+
+if __name__ == "__main__":
+    main()
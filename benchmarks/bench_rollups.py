@@ -0,0 +1,108 @@
+"""
+Dönem özetleri (rollups) benchmark'ı.
+
+Bellek içi SQLite'a yıllara yayılmış sentetik işlemler yazılır (özetler yazımla birlikte güncellenir):
+
+- Tarih aralıklı özet (gunluk_ozet gün / ay kovalı): aralığın ham işlemlerini tarayıp pandas ile
+  hesaplama ve kovalama (eski) vs yalnızca gereken seviyelerin dönem özetlerini okuma (yeni); iki
+  sonucun aynı olduğu da denetlenir
+- Analiz motorunun kurulumu: tüm işlemleri okuma vs gün özetlerini okuma
+- Dönem özetlerinin ham işlemlerden yeniden derlenmesi (sıkıştırma) süresi
+
+Çalıştırma (proje kökünden):
+    python -m benchmarks.bench_rollups
+    python -m benchmarks.bench_rollups --rows 200000 --years 10
+"""
+import argparse
+import random
+import time
+from datetime import datetime, timedelta
+
+from backend.storage import SQLiteTransactionRepository
+from backend.analiz_motoru import AnalizMotoru
+from backend.donem_ozetleri import rollup_ozeti
+import backend.grafik_analiz as grafik_analiz
+
+KATEGORILER = ["market", "fatura", "kira", "ulaşım", "eğlence", "sağlık", "eğitim", "giyim"]
+
+
+def _sure(fn, tekrar: int = 3) -> float:
+    en_iyi = float("inf")
+    for _ in range(tekrar):
+        t0 = time.perf_counter()
+        fn()
+        en_iyi = min(en_iyi, time.perf_counter() - t0)
+    return en_iyi * 1000
+
+
+def _esit(a, b) -> bool:
+    if isinstance(a, dict) and isinstance(b, dict):
+        return a.keys() == b.keys() and all(_esit(a[k], b[k]) for k in a)
+    if isinstance(a, list) and isinstance(b, list):
+        return len(a) == len(b) and all(_esit(x, y) for x, y in zip(a, b))
+    if isinstance(a, (int, float)) and isinstance(b, (int, float)):
+        return abs(a - b) <= 1e-6 * max(1.0, abs(a))
+    return a == b
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--years", type=int, default=5)
+    parser.add_argument("--users", type=int, default=20)
+    args = parser.parse_args()
+
+    rnd = random.Random(42)
+    bas = datetime(2025 - args.years, 1, 1)
+    gun_sayisi = 365 * args.years
+    repo = SQLiteTransactionRepository(":memory:")
+    datas = []
+    for _ in range(args.rows):
+        tip = "Gelir" if rnd.random() < 0.2 else "Gider"
+        datas.append({
+            "User_Email": f"kullanici{rnd.randrange(args.users)}@example.com",
+            "Tarih": bas + timedelta(days=rnd.randrange(gun_sayisi), minutes=rnd.randrange(1440)),
+            "Islem_Tipi": tip,
+            "Tutar": round(rnd.uniform(10, 5000), 2),
+            "Kategori": rnd.choice(KATEGORILER) if tip == "Gider" else "Maaş",
+            "Aciklama": "bench",
+        })
+    t0 = time.perf_counter()
+    for i in range(0, len(datas), 5000):
+        repo.add_many(datas[i:i + 5000])
+    yazim = (time.perf_counter() - t0) * 1000
+    print(f"işlem: {args.rows:,}, yıl: {args.years}, kullanıcı: {args.users}; yazım (özetlerle): {yazim:,.0f} ms")
+
+    grafik_analiz.get_repository = lambda: repo  # pandas yolu aynı depoyu okusun
+    kullanici = "kullanici0@example.com"
+    araliklar = [
+        ("son 1 yıl, tümü", None, datetime(2024, 1, 1), datetime(2025, 1, 1)),
+        (f"{args.years} yıl (kenarlı), tümü", None, bas + timedelta(days=17), datetime(2024, 12, 20)),
+        (f"{args.years} yıl (kenarlı), tek kullanıcı", kullanici, bas + timedelta(days=17), datetime(2024, 12, 20)),
+    ]
+
+    def pandas_ozeti(user, start, end, kova):
+        ozet = grafik_analiz.get_analysis_summary_pandas(user, start, end)
+        return {**ozet, "gunluk_ozet": grafik_analiz.gunluk_seyrelt(ozet["gunluk_ozet"], kova, None)}
+
+    print(f"{'aralık':<34} {'kova':<6} {'pandas ms':>10} {'özet ms':>9} {'hız':>7}  aynı mı")
+    for ad, user, start, end in araliklar:
+        for kova in ("day", "month"):
+            eski = _sure(lambda: pandas_ozeti(user, start, end, kova))
+            yeni = _sure(lambda: rollup_ozeti(user, start, end, kova, repository=repo))
+            ayni = _esit(pandas_ozeti(user, start, end, kova), rollup_ozeti(user, start, end, kova, repository=repo))
+            print(f"{ad:<34} {kova:<6} {eski:>10.1f} {yeni:>9.1f} {eski / yeni:>6.1f}x  {'evet' if ayni else 'HAYIR'}")
+
+    def akistan():
+        motor = AnalizMotoru(repo)
+        for _, data in repo.stream():
+            motor._uygula(motor._kapsamlar, data, +1)
+
+    eski = _sure(akistan, tekrar=1)
+    yeni = _sure(lambda: AnalizMotoru(repo)._kur(), tekrar=1)
+    print(f"{'motor kurulumu':<34} {'':<6} {eski:>10.1f} {yeni:>9.1f} {eski / yeni:>6.1f}x")
+    print(f"{'yeniden derleme (sıkıştırma)':<34} {'':<6} {_sure(repo.rebuild_rollups, tekrar=1):>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Serileştirme benchmark'ı (varsayılan 50k işlem).
+
+- Liste endpoint gövdesi: Starlette JSONResponse.render vs FastJSONResponse.render
+- Bellekteki işlemler: nesne başına Islem.toJSON vs IslemDeposu.kayitlar + dumps (tek gövde;
+  /budget-manager/transactions'ın yolu)
+
+Çalıştırma (proje kökünden):
+    python -m benchmarks.bench_serialization
+    python -m benchmarks.bench_serialization --rows 50000 200000
+"""
+import argparse
+import random
+import time
+from datetime import datetime, timedelta
+
+from fastapi.responses import JSONResponse
+
+from backend.islem_deposu import IslemDeposu
+from backend.serializer import FastJSONResponse, dumps, orjson
+from backend.sistem_modelleri import TransactionFactory
+
+KATEGORILER = ["Market", "Fatura", "Ulaşım", "Kira", "Eğlence", "Kredi Kartı"]
+
+
+def _belgeler(n: int):
+    random.seed(3)
+    baslangic = datetime(2023, 1, 1)
+    belgeler = []
+    for i in range(n):
+        gelir = i % 4 == 0
+        belgeler.append({
+            "id": f"{i:032x}",
+            "User_Email": f"user{i % 50}@example.com",
+            "Tarih": baslangic + timedelta(minutes=11 * i),
+            "Kategori": None if gelir else random.choice(KATEGORILER),
+            "Tutar": round(random.uniform(10, 250_000 if gelir else 3000), 2),
+            "Islem_Tipi": "Gelir" if gelir else "Gider",
+            "Aciklama": random.choice(["Maaş", "Market alışverişi", "Elektrik", "Kira"]),
+            "Kaynak": "Şirket" if gelir else None,
+        })
+    return belgeler
+
+
+def _sure(fn, tekrar: int = 3) -> float:
+    en_iyi = float("inf")
+    for _ in range(tekrar):
+        t0 = time.perf_counter()
+        fn()
+        en_iyi = min(en_iyi, time.perf_counter() - t0)
+    return en_iyi * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, nargs="+", default=[50_000])
+    args = parser.parse_args()
+
+    print(f"kodlayıcı: {'orjson' if orjson is not None else 'stdlib json'}")
+    print(f"{'satır':>8} {'ölçüm':<34} {'ms':>10}")
+    for n in args.rows:
+        belgeler = _belgeler(n)
+        # GET /transactions gövdesi (Tarih ISO metin olarak)
+        govde = {"items": [{**d, "Tarih": d["Tarih"].isoformat()} for d in belgeler], "next_cursor": None}
+        eski = _sure(lambda: JSONResponse(govde))
+        yeni = _sure(lambda: FastJSONResponse(govde))
+        print(f"{n:>8,} {'liste: JSONResponse':<34} {eski:>10.1f}")
+        print(f"{n:>8,} {'liste: FastJSONResponse':<34} {yeni:>10.1f}  ({eski / yeni:.1f}x)")
+
+        islemler = TransactionFactory.create_many(belgeler)
+        depo = IslemDeposu(islemler)
+        eski = _sure(lambda: [i.toJSON() for i in islemler])
+        yeni = _sure(lambda: dumps(depo.kayitlar()))
+        print(f"{n:>8,} {'işlemler: Islem.toJSON (nesne başına)':<34} {eski:>10.1f}")
+        print(f"{n:>8,} {'işlemler: dumps(depo.kayitlar())':<34} {yeni:>10.1f}  ({eski / yeni:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Yerel anlık görüntü (Arrow IPC) benchmark'ı.
+
+SQLite dosyasına sentetik işlemler yazılır; soğuk açılışta (yeni süreç gibi, boş bellekle)
+analiz DataFrame'inin elde edilme süresi karşılaştırılır:
+
+- depolamadan tam çekme + _belgelerden_df (eski; Firestore'da buna ağ gecikmesi eklenir)
+- anlık görüntüden okuma (mmap + yalnızca özet sütunları), değişiklik yokken
+- birkaç delta dosyası birikmişken okuma ve sıkıştırma sonrası okuma
+
+Çalıştırma (proje kökünden; pyarrow gerekir):
+    python -m benchmarks.bench_snapshot
+    python -m benchmarks.bench_snapshot --rows 1000000 --deltas 5
+"""
+import argparse
+import os
+import random
+import shutil
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from backend.storage import SQLiteTransactionRepository
+from backend.anlik_goruntu import AnlikGoruntuOnbellegi
+from backend.grafik_analiz import _OZET_SUTUNLARI, _belgelerden_df
+
+KATEGORILER = ["market", "fatura", "kira", "ulaşım", "eğlence", "sağlık"]
+
+
+def _belgeler(rnd: random.Random, n: int):
+    bas = datetime(2020, 1, 1)
+    for _ in range(n):
+        tip = "Gelir" if rnd.random() < 0.2 else "Gider"
+        yield {
+            "User_Email": "bench@example.com",
+            "Tarih": bas + timedelta(minutes=rnd.randrange(5 * 365 * 1440)),
+            "Islem_Tipi": tip,
+            "Tutar": round(rnd.uniform(10, 5000), 2),
+            "Kategori": rnd.choice(KATEGORILER) if tip == "Gider" else "Maaş",
+            "Aciklama": "bench",
+            "Kaynak": None,
+        }
+
+
+def _olc(fn) -> float:
+    t0 = time.perf_counter()
+    fn()
+    return (time.perf_counter() - t0) * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--deltas", type=int, default=5)
+    parser.add_argument("--delta-rows", type=int, default=200)
+    args = parser.parse_args()
+
+    dizin = tempfile.mkdtemp(prefix="bench_snapshot_")
+    try:
+        rnd = random.Random(1)
+        repo = SQLiteTransactionRepository(os.path.join(dizin, "bench.db"))
+        belgeler = list(_belgeler(rnd, args.rows))
+        for i in range(0, len(belgeler), 10_000):
+            repo.add_many(belgeler[i:i + 10_000])
+        goruntu_dizini = os.path.join(dizin, "snapshots")
+        print(f"işlem: {args.rows:,}")
+
+        eski = _olc(lambda: _belgelerden_df(repo.query_range(user_email="bench@example.com")))
+        print(f"{'depolamadan çekme':<36} {eski:>10.1f} ms")
+        kurulum = _olc(lambda: AnlikGoruntuOnbellegi(goruntu_dizini, repository=repo).df("bench@example.com"))
+        print(f"{'görüntü ilk kurulum (tek sefer)':<36} {kurulum:>10.1f} ms")
+
+        def soguk_okuma():
+            AnlikGoruntuOnbellegi(goruntu_dizini, max_delta=args.deltas + 1, repository=repo).df(
+                "bench@example.com", sutunlar=_OZET_SUTUNLARI
+            )
+
+        yeni = _olc(soguk_okuma)
+        print(f"{'görüntüden soğuk okuma':<36} {yeni:>10.1f} ms  ({eski / yeni:.1f}x)")
+
+        for _ in range(args.deltas):
+            repo.add_many(list(_belgeler(rnd, args.delta_rows)))
+            soguk_okuma()
+        deltali = _olc(soguk_okuma)
+        print(f"{f'görüntüden okuma, {args.deltas} delta':<36} {deltali:>10.1f} ms  ({eski / deltali:.1f}x)")
+        goruntu = AnlikGoruntuOnbellegi(goruntu_dizini, repository=repo)
+        sikistirma = _olc(lambda: goruntu.sikistir("bench@example.com"))
+        print(f"{'sıkıştırma':<36} {sikistirma:>10.1f} ms")
+        sonra = _olc(soguk_okuma)
+        print(f"{'görüntüden okuma, sıkıştırma sonrası':<36} {sonra:>10.1f} ms  ({eski / sonra:.1f}x)")
+    finally:
+        shutil.rmtree(dizin, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
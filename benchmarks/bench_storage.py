@@ -0,0 +1,69 @@
+"""
+Depolama arka uçlarının gecikme karşılaştırması (add / get / monthly_aggregate / stream / delete).
+
+Çalıştırma (proje kökünden):
+    python -m benchmarks.bench_storage                 # memory + sqlite
+    python -m benchmarks.bench_storage --n 20000 --firestore   # canlı Firestore dahil (dikkat: gerçek yazım yapar)
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from backend.storage import (
+    FirestoreTransactionRepository,
+    SQLiteTransactionRepository,
+    TransactionRepository,
+)
+
+
+def _ornek_islem(i: int) -> dict:
+    gider = random.random() < 0.7
+    return {
+        "User_Email": f"user{i % 10}@example.com",
+        "Tarih": datetime(2024, 1, 1) + timedelta(minutes=37 * i),
+        "Kategori": random.choice(["Market", "Fatura", "Ulaşım", "Eğlence"]) if gider else None,
+        "Tutar": round(random.uniform(10, 5000), 2),
+        "Islem_Tipi": "Gider" if gider else "Gelir",
+        "Aciklama": f"islem {i}",
+    }
+
+
+def _olc(ad: str, n: int, fn) -> None:
+    t0 = time.perf_counter()
+    fn()
+    sure = time.perf_counter() - t0
+    print(f"  {ad:<20} {sure * 1000:10.1f} ms  ({sure / max(n, 1) * 1e6:8.1f} µs/op)")
+
+
+def calistir(repo: TransactionRepository, n: int) -> None:
+    print(f"\n[{repo.name}] n={n}")
+    veriler = [_ornek_islem(i) for i in range(n)]
+    ids = []
+    _olc("add", n, lambda: ids.extend(repo.add(v) for v in veriler))
+    ornek = random.sample(ids, min(n, 1000))
+    _olc("get", len(ornek), lambda: [repo.get(i) for i in ornek])
+    _olc("monthly_aggregate", 1000, lambda: [repo.monthly_aggregate("user1@example.com", 2024, 1 + k % 12) for k in range(1000)])
+    _olc("stream", n, lambda: sum(1 for _ in repo.stream()))
+    _olc("query_range (1 ay)", 1, lambda: sum(1 for _ in repo.query_range(datetime(2024, 2, 1), datetime(2024, 3, 1))))
+    _olc("delete", len(ornek), lambda: [repo.delete(i) for i in ornek])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--n", type=int, default=10000)
+    parser.add_argument("--firestore", action="store_true", help="Canlı Firestore'u da ölç")
+    args = parser.parse_args()
+
+    random.seed(42)
+    calistir(SQLiteTransactionRepository(":memory:"), args.n)
+    with tempfile.TemporaryDirectory() as tmp:
+        calistir(SQLiteTransactionRepository(os.path.join(tmp, "bench.db")), args.n)
+    if args.firestore:
+        calistir(FirestoreTransactionRepository(), args.n)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Tahmin motoru benchmark'ı.
+
+Sentetik kullanıcı serileri (düz, trendli, mevsimsel; kategori başına gürültülü) üzerinde:
+
+- Seçilen modelin geriye dönük test hatası (MAE) ile eski davranışın (son 3 ay ortalaması, ``ma3``)
+  hatası karşılaştırılır
+- Soğuk hesaplama (backtest + seçim) ve önbellekten dönüş süreleri ölçülür
+
+Çalıştırma (proje kökünden):
+    python -m benchmarks.bench_tahmin
+    python -m benchmarks.bench_tahmin --users 500 --months 36 --categories 8
+"""
+import argparse
+import time
+from collections import Counter
+from datetime import datetime
+
+import numpy as np
+
+from backend.tahmin import TahminMotoru
+
+SIMDI = datetime(2025, 1, 15)
+
+
+def _kullanici(rnd: np.random.Generator, ay_sayisi: int, kategori_sayisi: int, bicim: str):
+    aylar = [((2025 * 12 - ay_sayisi + i) // 12, (2025 * 12 - ay_sayisi + i) % 12 + 1) for i in range(ay_sayisi)]
+    t = np.arange(ay_sayisi)
+    kategori_aylik = {}
+    for k in range(kategori_sayisi):
+        taban = rnd.uniform(200, 3000)
+        if bicim == "trend":
+            seri = taban + rnd.uniform(-40, 120) * t
+        elif bicim == "mevsimsel":
+            seri = taban * (1 + 0.5 * np.sin(2 * np.pi * (t + k) / 12))
+        else:
+            seri = np.full(ay_sayisi, taban)
+        seri = np.maximum(seri * rnd.normal(1, 0.08, ay_sayisi), 0)
+        kategori_aylik[f"Kategori {k}"] = {a: float(v) for a, v in zip(aylar, seri)}
+    gelir = rnd.uniform(20_000, 80_000) * rnd.normal(1, 0.03, ay_sayisi)
+    aylik = {a: (float(g), sum(kategori_aylik[k][a] for k in kategori_aylik)) for a, g in zip(aylar, gelir)}
+    return aylik, kategori_aylik
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=300)
+    parser.add_argument("--months", type=int, default=30)
+    parser.add_argument("--categories", type=int, default=6)
+    args = parser.parse_args()
+
+    rnd = np.random.default_rng(7)
+    bicimler = ["duz", "trend", "mevsimsel"]
+    kullanicilar = [
+        (bicimler[i % 3], *_kullanici(rnd, args.months, args.categories, bicimler[i % 3])) for i in range(args.users)
+    ]
+    motor = TahminMotoru(max_kayit=args.users)
+
+    t0 = time.perf_counter()
+    sonuclar = [
+        (bicim, motor.tahmin(aylik, kategori_aylik, anahtar=i, surum=1, simdi=SIMDI))
+        for i, (bicim, aylik, kategori_aylik) in enumerate(kullanicilar)
+    ]
+    soguk = (time.perf_counter() - t0) / args.users * 1000
+    t0 = time.perf_counter()
+    for i, (_, aylik, kategori_aylik) in enumerate(kullanicilar):
+        motor.tahmin(aylik, kategori_aylik, anahtar=i, surum=1, simdi=SIMDI)
+    sicak = (time.perf_counter() - t0) / args.users * 1000
+
+    print(f"kullanıcı: {args.users}, ay: {args.months}, kategori: {args.categories}")
+    print(f"soğuk (backtest + seçim): {soguk:.3f} ms/kullanıcı, önbellekten: {sicak * 1000:.1f} µs/kullanıcı")
+    print(f"{'seri':<10} {'ma3 MAE':>10} {'seçilen MAE':>12} {'iyileşme':>9}  seçilen modeller")
+    for bicim in bicimler:
+        grup = [s for b, s in sonuclar if b == bicim]
+        eski = np.mean([s["hatalar"]["gider"]["ma3"] for s in grup])
+        yeni = np.mean([s["hata"]["gider"] for s in grup])
+        modeller = Counter(s["model"]["gider"] for s in grup).most_common(3)
+        print(f"{bicim:<10} {eski:>10,.1f} {yeni:>12,.1f} {1 - yeni / eski:>8.0%}  {dict(modeller)}")
+
+
+if __name__ == "__main__":
+    main()
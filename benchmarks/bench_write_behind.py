@@ -0,0 +1,111 @@
+"""
+POST /transactions ekleme gecikmesi: eşzamanlı yazım (csv_ye_yaz -> add) ile yazım-arkası WAL
+(WRITE_BEHIND=1, grup commit) karşılaştırması.
+
+Depolama, her çağrıya sabit gecikme eklenen bellek içi SQLite ile uzak Firestore gibi davranır.
+Her modda --threads iş parçacığı ButceYonetici.islem_ekle çağırır; ekleme başına p50/p99 gecikme,
+toplam verim ve (WAL modunda) grup sayısı raporlanır. WAL geçici bir dizine yazılır ve fsync edilir.
+
+Çalıştırma (proje kökünden):
+    python -m benchmarks.bench_write_behind
+    python -m benchmarks.bench_write_behind --inserts 5000 --threads 32 --latency-ms 20
+"""
+import argparse
+import contextlib
+import io
+import os
+import statistics
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+
+os.environ.setdefault("STORAGE_BACKEND", "memory")
+os.environ.pop("WRITE_BEHIND", None)
+
+from backend.sistem_modelleri import ButceYonetici, Gider  # noqa: E402
+from backend.storage import SQLiteTransactionRepository, set_repository  # noqa: E402
+from backend.yazim_gunlugu import get_yazim_gunlugu  # noqa: E402
+
+
+class _GecikmeliRepository(SQLiteTransactionRepository):
+    """Yazım ve okumalara sabit gecikme ekleyen bellek içi depolama (uzak veritabanı taklidi)."""
+
+    def __init__(self, gecikme_sn: float):
+        super().__init__(":memory:")
+        self.gecikme_sn = gecikme_sn
+
+    def add(self, data):
+        time.sleep(self.gecikme_sn)
+        return super().add(data)
+
+    def add_many(self, datas, ids=None):
+        time.sleep(self.gecikme_sn)
+        return super().add_many(datas, ids=ids)
+
+    def get(self, doc_id):
+        time.sleep(self.gecikme_sn)
+        return super().get(doc_id)
+
+    def monthly_aggregate(self, user_email, yil, ay):
+        time.sleep(self.gecikme_sn)
+        return super().monthly_aggregate(user_email, yil, ay)
+
+
+def _calistir(ad: str, args) -> None:
+    repo = _GecikmeliRepository(args.latency_ms / 1000)
+    set_repository(repo)
+    user_email = f"{ad}@example.com"
+    yonetici = ButceYonetici(user_email)
+    gecikmeler = []
+    gecikme_lock = threading.Lock()
+    baslangic = datetime(2024, 1, 1)
+
+    def calisan(no: int) -> None:
+        yerel = []
+        for i in range(no, args.inserts, args.threads):
+            islem = Gider(25.0, f"gider {i}", "Market", baslangic + timedelta(minutes=i), user_email)
+            t0 = time.perf_counter()
+            yonetici.islem_ekle(islem)
+            yerel.append(time.perf_counter() - t0)
+        with gecikme_lock:
+            gecikmeler.extend(yerel)
+
+    t0 = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        isciler = [threading.Thread(target=calisan, args=(no,)) for no in range(args.threads)]
+        for t in isciler:
+            t.start()
+        for t in isciler:
+            t.join()
+        gunluk = get_yazim_gunlugu()
+        if gunluk is not None:
+            gunluk.bosalt()
+    sure = time.perf_counter() - t0
+
+    gecikmeler.sort()
+    p50 = statistics.median(gecikmeler) * 1000
+    p99 = gecikmeler[int(len(gecikmeler) * 0.99) - 1] * 1000
+    ek = f"  grup: {gunluk.istatistik()['grup_sayisi']}" if gunluk is not None else ""
+    yazilan = repo.balance_aggregate(user_email)["Islem_Sayisi"]
+    print(f"{ad:>12} {p50:>9.2f} {p99:>9.2f} {len(gecikmeler) / sure:>12,.0f} {yazilan:>9,}{ek}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--inserts", type=int, default=2000)
+    parser.add_argument("--threads", type=int, default=32)
+    parser.add_argument("--latency-ms", type=float, default=20.0, help="depolama çağrısı başına yapay gecikme")
+    args = parser.parse_args()
+
+    print(f"ekleme: {args.inserts:,}, iş parçacığı: {args.threads}, depolama gecikmesi: {args.latency_ms} ms")
+    print(f"{'mod':>12} {'p50 (ms)':>9} {'p99 (ms)':>9} {'ekleme/sn':>12} {'yazılan':>9}")
+    _calistir("eszamanli", args)
+
+    with tempfile.TemporaryDirectory() as dizin:
+        os.environ.update(WRITE_BEHIND="1", WAL_PATH=os.path.join(dizin, "bench.wal"))
+        _calistir("yazim_arkasi", args)
+
+
+if __name__ == "__main__":
+    main()
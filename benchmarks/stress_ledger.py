@@ -0,0 +1,165 @@
+"""
+Defter (bakiye) eşzamanlılık stres testi.
+
+Yüzlerce iş parçacığı aynı anda birkaç kullanıcının ButceYonetici örneğine gelir/gider ekler,
+toplu ekleme yapar, kendi eklediği işlemlerin bir kısmını siler; okuyucu iş parçacıkları da bu
+sırada senkronize_et çağırır. Sonunda her kullanıcı için:
+
+- bakiye == iş parçacıklarının tuttuğu beklenen toplam
+- bakiye == IslemDeposu.net_toplam() (defter değişmezi)
+- mutabakat() farkı 0 ve düzeltme gerekmemiş olmalı (depolamadaki aylık özetlerle uyum)
+
+kontrol edilir; uyumsuzlukta çıkış kodu 1'dir. Genel görünüm (ButceYonetici()) de senkronize
+edilip tüm kullanıcıların toplamıyla karşılaştırılır.
+
+Çalıştırma (proje kökünden):
+    python -m benchmarks.stress_ledger
+    python -m benchmarks.stress_ledger --writers 400 --ops 50 --users 4
+"""
+import argparse
+import contextlib
+import io
+import os
+import random
+import sys
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List, Tuple
+
+os.environ.setdefault("STORAGE_BACKEND", "memory")
+
+from backend.sistem_modelleri import ButceYonetici, Gelir, Gider  # noqa: E402
+
+KATEGORILER = ["Market", "Fatura", "Ulaşım", "Kira"]
+
+
+def _islem(rnd: random.Random, user_email: str, i: int):
+    tarih = datetime(2024, 1, 1) + timedelta(hours=rnd.randrange(24 * 365))
+    # Kuruş hassasiyetinde tutarlar; beklenen toplam kuruş cinsinden tam sayıyla tutulur
+    kurus = rnd.randrange(100, 500_000)
+    if rnd.random() < 0.4:
+        return Gelir(kurus / 100, f"gelir {i}", "Şirket", tarih, user_email), kurus
+    return Gider(kurus / 100, f"gider {i}", rnd.choice(KATEGORILER), tarih, user_email), -kurus
+
+
+def _yazici(no: int, args, kullanicilar, beklenen, beklenen_lock, hatalar, baslat) -> None:
+    rnd = random.Random(no)
+    user_email = kullanicilar[no % len(kullanicilar)]
+    yonetici = ButceYonetici(user_email)
+    net = 0
+    eklenenler = []
+    baslat.wait()
+    try:
+        for i in range(args.ops):
+            secim = rnd.random()
+            if secim < 0.1:
+                parti = [_islem(rnd, user_email, i) for _ in range(5)]
+                yonetici.toplu_islem_ekle([islem for islem, _ in parti])
+                for islem, kurus in parti:
+                    net += kurus
+                    eklenenler.append((islem.id, kurus))
+            elif secim < 0.25 and eklenenler:
+                transaction_id, kurus = eklenenler.pop(rnd.randrange(len(eklenenler)))
+                # Silme, genel görünümden de yapılabilir; sahibin örneği yine güncellenmeli
+                silen = ButceYonetici() if rnd.random() < 0.3 else yonetici
+                if silen.islem_sil(transaction_id):
+                    net -= kurus
+            else:
+                islem, kurus = _islem(rnd, user_email, i)
+                yonetici.islem_ekle(islem)
+                net += kurus
+                eklenenler.append((islem.id, kurus))
+    except Exception as exc:  # pragma: no cover - stres altında beklenmeyen hata
+        hatalar.append(f"yazıcı {no}: {exc!r}")
+    with beklenen_lock:
+        beklenen[user_email] = beklenen.get(user_email, 0) + net
+
+
+def _okuyucu(kullanicilar, dur: threading.Event, baslat) -> None:
+    baslat.wait()
+    while not dur.is_set():
+        for user_email in kullanicilar:
+            ButceYonetici(user_email).senkronize_et()
+        time.sleep(0.005)
+
+
+def calistir(args) -> Tuple[List[str], Dict[str, int], List[str], float]:
+    """
+    Stresi çalıştırır (args: writers, ops, users, readers). Dönüş: (kullanıcılar, kullanıcı başına
+    beklenen net toplam (kuruş), hatalar, süre sn). tests/test_stress_ledger.py küçük boyutla çağırır.
+    """
+    kullanicilar = [f"stres{i}@example.com" for i in range(args.users)]
+    # Örnekler ve işaretler yazımlar başlamadan hazırlanır (boş depolamadan tam yükleme)
+    with contextlib.redirect_stdout(io.StringIO()):
+        for user_email in kullanicilar + [None]:
+            ButceYonetici(user_email).senkronize_et()
+
+    beklenen, beklenen_lock, hatalar = {}, threading.Lock(), []
+    baslat = threading.Barrier(args.writers + args.readers)
+    dur = threading.Event()
+    yazicilar = [
+        threading.Thread(target=_yazici, args=(no, args, kullanicilar, beklenen, beklenen_lock, hatalar, baslat))
+        for no in range(args.writers)
+    ]
+    okuyucular = [threading.Thread(target=_okuyucu, args=(kullanicilar, dur, baslat)) for _ in range(args.readers)]
+
+    t0 = time.perf_counter()
+    # islem_ekle her adımda konsola yazar; stres sırasında çıktı bastırılır
+    with contextlib.redirect_stdout(io.StringIO()):
+        for t in yazicilar + okuyucular:
+            t.start()
+        for t in yazicilar:
+            t.join()
+        dur.set()
+        for t in okuyucular:
+            t.join()
+    return kullanicilar, beklenen, hatalar, time.perf_counter() - t0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--writers", type=int, default=200)
+    parser.add_argument("--ops", type=int, default=30, help="yazıcı başına işlem")
+    parser.add_argument("--users", type=int, default=8)
+    parser.add_argument("--readers", type=int, default=4)
+    args = parser.parse_args()
+
+    kullanicilar, beklenen, hatalar, sure = calistir(args)
+    toplam_islem = args.writers * args.ops
+    print(f"yazıcı: {args.writers}, okuyucu: {args.readers}, kullanıcı: {args.users}, işlem: {toplam_islem:,}")
+    print(f"süre: {sure:.2f} sn ({toplam_islem / sure:,.0f} işlem/sn)")
+
+    basarili = not hatalar
+    for hata in hatalar[:10]:
+        print(f"❌ {hata}")
+    print(f"{'kullanıcı':<22} {'beklenen':>14} {'bakiye':>14} {'depo':>14} {'mutabakat farkı':>16}")
+    with contextlib.redirect_stdout(io.StringIO()):
+        sonuclar = {u: ButceYonetici(u).mutabakat(duzelt=False) for u in kullanicilar}
+    for user_email in kullanicilar:
+        yonetici = ButceYonetici(user_email)
+        hedef = beklenen.get(user_email, 0) / 100
+        sonuc = sonuclar[user_email]
+        depo = yonetici.islemler.net_toplam()
+        tamam = (
+            abs(yonetici.bakiye - hedef) < 0.005
+            and abs(depo - hedef) < 0.005
+            and abs(sonuc["fark"]) < 0.005
+            and sonuc["islem_sayisi"] == sonuc["depolama_islem_sayisi"]
+        )
+        basarili &= tamam
+        print(f"{user_email:<22} {hedef:>14,.2f} {yonetici.bakiye:>14,.2f} {depo:>14,.2f} {sonuc['fark']:>16,.2f} {'✅' if tamam else '❌'}")
+
+    genel = ButceYonetici()
+    with contextlib.redirect_stdout(io.StringIO()):
+        genel.senkronize_et()
+    hedef = sum(beklenen.values()) / 100
+    tamam = abs(genel.bakiye - hedef) < 0.005
+    basarili &= tamam
+    print(f"{'(genel görünüm)':<22} {hedef:>14,.2f} {genel.bakiye:>14,.2f} {genel.islemler.net_toplam():>14,.2f} {'':>16} {'✅' if tamam else '❌'}")
+
+    sys.exit(0 if basarili else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -12,8 +12,15 @@ export default function Transactions() {
     setLoading(true)
     setError(null)
     try {
-      const { data } = await api.get('/transactions')
-      setItems(data?.items || [])
+      // Sunucu sayfalı döner; next_cursor bitene kadar sayfaları topla
+      const all = []
+      let cursor = null
+      do {
+        const { data } = await api.get('/transactions', { params: cursor ? { cursor } : {} })
+        all.push(...(data?.items || []))
+        cursor = data?.next_cursor || null
+      } while (cursor)
+      setItems(all)
     } catch (e) {
       setError(e?.response?.data?.detail || e.message)
     } finally {
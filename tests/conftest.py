@@ -0,0 +1,5 @@
+import os
+
+# Testler Firebase kimlik bilgisi olmadan, bellek içi depolamayla çalışır
+os.environ.setdefault("STORAGE_BACKEND", "memory")
+os.environ.setdefault("ANOMALY_DETECTION", "0")
@@ -0,0 +1,120 @@
+import threading
+from datetime import datetime
+
+import pytest
+
+from backend.analiz_motoru import AnalizMotoru
+from backend.storage import SQLiteTransactionRepository, set_repository
+
+
+def _belge(gun: int, tip: str, tutar: float, kategori=None, user_email="a@example.com"):
+    # Kategori_Id'siz eski belgeler: kategori motorda ham metinden çözülür
+    return {
+        "User_Email": user_email,
+        "Tarih": datetime(2025, 1 + gun // 28, 1 + gun % 28),
+        "Islem_Tipi": tip,
+        "Tutar": tutar,
+        "Kategori": kategori,
+    }
+
+
+KARISIK = [
+    _belge(0, "Gelir", 1000.0),
+    _belge(1, "Gider", 120.0, "Market"),
+    _belge(2, "Gider", 80.0, "market"),
+    _belge(3, "Gider", 45.5, " MARKET "),
+    _belge(4, "Gider", 300.0, "Fatura", user_email="b@example.com"),
+    _belge(30, "Gider", 60.0, "fatura"),
+    _belge(31, "Gelir", 250.0, user_email="b@example.com"),
+    _belge(45, "Gider", 15.0, None),
+]
+
+
+@pytest.fixture(params=["rollups", "ham"])
+def repo(request, monkeypatch):
+    repo = SQLiteTransactionRepository(":memory:")
+    if request.param == "ham":
+        monkeypatch.setattr(repo, "rollups_hazir", lambda: False)
+    set_repository(repo)
+    yield repo
+    set_repository(None)
+
+
+def _yaz(motor, repo, data):
+    with motor.yazim():
+        transaction_id = repo.add(data)
+        motor.islem_eklendi(data, transaction_id)
+    return transaction_id
+
+
+def _sil(motor, repo, transaction_id):
+    with motor.yazim():
+        data = repo.delete(transaction_id)
+        motor.islem_silindi(data, transaction_id)
+
+
+def test_karisik_veri_ve_artimli_yazimlar_tutarli(repo):
+    ids = [repo.add(dict(d)) for d in KARISIK]
+    motor = AnalizMotoru(repo)
+    assert motor.dogrula()["farklar"] == []
+
+    _yaz(motor, repo, _belge(50, "Gider", 99.0, "MaRkEt"))
+    _yaz(motor, repo, _belge(51, "Gelir", 10.0, user_email="b@example.com"))
+    _sil(motor, repo, ids[2])
+    sonuc = motor.dogrula()
+    assert sonuc["tutarli"], sonuc["farklar"]
+    assert motor.ozet("b@example.com")["toplam_gelir"] == 260.0
+
+
+def test_tarama_sirasindaki_yazimlar_bir_kez_sayilir(repo, monkeypatch):
+    ids = [repo.add(dict(d)) for d in KARISIK]
+    motor = AnalizMotoru(repo)
+    motor.ozet()
+    akis = repo.stream
+
+    def yazarak_akit():
+        for i, belge in enumerate(akis()):
+            yield belge
+            if i == 1:
+                # Taranmış bir belge silinir, taranmamış biri silinir, yenisi eklenir
+                _sil(motor, repo, ids[0])
+                _sil(motor, repo, ids[-1])
+                _yaz(motor, repo, _belge(40, "Gider", 7.25, "market"))
+
+    monkeypatch.setattr(repo, "stream", yazarak_akit)
+    # Küçük sayfalar: silinen son belge ve yeni belge taramanın henüz okumadığı sayfalarda kalır
+    monkeypatch.setattr(repo, "SAYFA_BOYUTU", 2)
+    motor.yeniden_olustur()
+    sonuc = motor.dogrula()
+    assert sonuc["tutarli"], sonuc["farklar"]
+
+
+def test_commit_ile_bildirim_arasindaki_kurulum_cift_saymaz(repo):
+    for d in KARISIK:
+        repo.add(dict(d))
+    motor = AnalizMotoru(repo)
+    motor.ozet()
+    commit_edildi, devam = threading.Event(), threading.Event()
+
+    def yazan():
+        data = _belge(60, "Gider", 500.0, "Market")
+        with motor.yazim():
+            transaction_id = repo.add(data)
+            commit_edildi.set()
+            devam.wait(5)
+            motor.islem_eklendi(data, transaction_id)
+
+    yazici = threading.Thread(target=yazan)
+    yazici.start()
+    assert commit_edildi.wait(5)
+    kurucu = threading.Thread(target=motor.yeniden_olustur)
+    kurucu.start()
+    kurucu.join(0.2)
+    # Kurulum, commit edip henüz bildirmemiş yazımı bekler
+    assert kurucu.is_alive()
+    devam.set()
+    yazici.join(5)
+    kurucu.join(5)
+    assert not kurucu.is_alive()
+    sonuc = motor.dogrula()
+    assert sonuc["tutarli"], sonuc["farklar"]
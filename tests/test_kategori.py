@@ -0,0 +1,37 @@
+import zlib
+
+from backend.kategori import KategoriTablosu
+
+# CRC32'si (31 bit) aynı iki farklı anahtar
+CAKISAN = ("kategori 3985819", "kategori 4420602")
+
+
+def _crc(anahtar: str) -> int:
+    return zlib.crc32(anahtar.encode("utf-8")) & 0x7FFFFFFF
+
+
+def test_crc_cakismasinda_farkli_anahtarlar_ayni_kimligi_paylasmaz():
+    assert _crc(CAKISAN[0]) == _crc(CAKISAN[1])
+    tablo = KategoriTablosu()
+    ilk, ikinci = (tablo.cozumle(a) for a in CAKISAN)
+    assert ilk.id == _crc(CAKISAN[0])
+    assert ikinci.id == ilk.id + 1
+    assert (ilk.anahtar, ikinci.anahtar) == CAKISAN
+    assert tablo.ad(ikinci.id) == "Kategori 4420602"
+    # Aynı anahtar (farklı boşluk / büyük harfle) hep aynı kategoriye çözülür
+    assert tablo.cozumle(" Kategori  4420602") is ikinci
+    assert tablo.istatistik()["cakisma"] == 1
+
+
+def test_kaydirilmis_kimlik_baska_surecte_belgeden_ogrenilir():
+    yazan = KategoriTablosu()
+    yazan.cozumle(CAKISAN[0])
+    kaydirilmis = yazan.cozumle(CAKISAN[1])
+
+    # Okuyan süreç ikinci anahtarı ilk kez belgeden görür (ilkini hiç görmemiştir)
+    okuyan = KategoriTablosu()
+    belge = {"Islem_Tipi": "Gider", "Kategori_Id": kaydirilmis.id, "Kategori": kaydirilmis.ad}
+    assert okuyan.belge_kategorisi(belge).id == kaydirilmis.id
+    assert okuyan.ad(kaydirilmis.id) == kaydirilmis.ad
+    # Sonradan gelen ilk anahtar kendi CRC kimliğini alır
+    assert okuyan.cozumle(CAKISAN[0]).id == _crc(CAKISAN[0])
@@ -0,0 +1,56 @@
+import threading
+
+import pytest
+
+from backend.ozet_onbellegi import OzetOnbellegi, ozet_anahtari
+
+
+def test_hesaplama_hatasi_anahtari_birakir():
+    onbellek = OzetOnbellegi()
+    anahtar = ozet_anahtari("a@example.com")
+
+    def hatali():
+        raise RuntimeError("depolama erişilemedi")
+
+    with pytest.raises(RuntimeError):
+        onbellek.al(anahtar, hatali)
+    assert anahtar not in onbellek._hesaplanan
+    assert onbellek.bak(anahtar) is None
+
+    # Sonraki çağrı bloklanmadan yeniden hesaplar ve sonucu saklar
+    assert onbellek.al(anahtar, lambda: {"toplam_gider": 1.0}) == {"toplam_gider": 1.0}
+    assert onbellek.bak(anahtar) == {"toplam_gider": 1.0}
+    assert anahtar not in onbellek._hesaplanan
+
+
+def test_hata_sirasinda_bekleyen_istek_kendi_hesaplar():
+    onbellek = OzetOnbellegi()
+    anahtar = ozet_anahtari("a@example.com")
+    basladi, devam = threading.Event(), threading.Event()
+
+    def hatali():
+        basladi.set()
+        devam.wait(5)
+        raise RuntimeError("depolama erişilemedi")
+
+    hatalar = []
+
+    def ilk_istek():
+        try:
+            onbellek.al(anahtar, hatali)
+        except RuntimeError as e:
+            hatalar.append(e)
+
+    ilk = threading.Thread(target=ilk_istek)
+    ilk.start()
+    assert basladi.wait(5)
+    sonuc = []
+    ikinci = threading.Thread(target=lambda: sonuc.append(onbellek.al(anahtar, lambda: {"toplam_gider": 2.0})))
+    ikinci.start()
+    devam.set()
+    ilk.join(5)
+    ikinci.join(5)
+    assert not ikinci.is_alive()
+    assert len(hatalar) == 1
+    assert sonuc == [{"toplam_gider": 2.0}]
+    assert anahtar not in onbellek._hesaplanan
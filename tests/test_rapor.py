@@ -0,0 +1,23 @@
+from datetime import datetime
+
+import pytest
+
+from backend.sistem_modelleri import CSVRapor, Rapor, RaporFactory
+
+
+def test_akit_uygulamayan_rapor_orneklenemez():
+    class PDFRapor(Rapor):
+        uzanti = "pdf"
+
+        def olustur(self): return "PDF"
+
+    with pytest.raises(TypeError):
+        PDFRapor()
+    assert RaporFactory.rapor_uret("pdf") is None
+
+
+def test_csv_raporu_akar():
+    belgeler = [("t1", {"Tarih": datetime(2025, 3, 1), "Islem_Tipi": "Gider", "Kategori": "Market", "Tutar": 12.5})]
+    cikti = b"".join(CSVRapor().akit(belgeler)).decode("utf-8-sig").splitlines()
+    assert cikti[0] == ",".join(Rapor.SUTUNLAR)
+    assert cikti[1] == "2025-03-01T00:00:00,Gider,Market,,12.5,,,t1"
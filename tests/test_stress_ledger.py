@@ -0,0 +1,41 @@
+import contextlib
+import io
+from types import SimpleNamespace
+
+import pytest
+
+from benchmarks import stress_ledger
+from backend.sistem_modelleri import ButceYonetici, _YoneticiKayitDefteri
+from backend.storage import SQLiteTransactionRepository, set_repository
+
+
+@pytest.fixture
+def bos_depo(monkeypatch):
+    # Boş depolama ve boş yönetici kayıt defteri: genel görünüm yalnızca bu testin işlemlerini görür
+    monkeypatch.setattr(ButceYonetici, "_kayit", _YoneticiKayitDefteri(256))
+    set_repository(SQLiteTransactionRepository(":memory:"))
+    yield
+    set_repository(None)
+
+
+def test_eszamanli_yazimlarda_defter_tutarli(bos_depo):
+    args = SimpleNamespace(writers=40, ops=12, users=3, readers=2)
+    kullanicilar, beklenen, hatalar, _ = stress_ledger.calistir(args)
+    assert hatalar == []
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        sonuclar = {u: ButceYonetici(u).mutabakat(duzelt=False) for u in kullanicilar}
+    for user_email in kullanicilar:
+        yonetici = ButceYonetici(user_email)
+        hedef = beklenen.get(user_email, 0) / 100
+        assert yonetici.bakiye == pytest.approx(hedef, abs=0.005)
+        assert yonetici.islemler.net_toplam() == pytest.approx(hedef, abs=0.005)
+        sonuc = sonuclar[user_email]
+        assert sonuc["fark"] == pytest.approx(0.0, abs=0.005)
+        assert sonuc["islem_sayisi"] == sonuc["depolama_islem_sayisi"]
+        assert not sonuc["duzeltildi"]
+
+    genel = ButceYonetici()
+    with contextlib.redirect_stdout(io.StringIO()):
+        genel.senkronize_et()
+    assert genel.bakiye == pytest.approx(sum(beklenen.values()) / 100, abs=0.005)
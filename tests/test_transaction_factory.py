@@ -0,0 +1,33 @@
+from datetime import datetime
+
+from backend.sistem_modelleri import Gelir, Gider, TransactionFactory
+
+
+def test_ilk_satir_gider_olan_api_partisinde_gelir_alanlari_korunur():
+    datas = [
+        {"islem_tipi": "Gider", "tutar": 300, "aciklama": "Market", "kategori": "Market",
+         "tarih": datetime(2025, 3, 1)},
+        {"islem_tipi": "Gelir", "tutar": 1000, "aciklama": "Maaş", "kaynak": "Şirket", "duzenliMi": "evet",
+         "tarih": datetime(2025, 3, 2)},
+    ]
+    gider, gelir = TransactionFactory.create_many(datas)
+    assert isinstance(gider, Gider) and gider.kategori == "Market"
+    assert isinstance(gelir, Gelir)
+    assert gelir.kaynak == "Şirket"
+    assert gelir.duzenliMi is True
+    assert gelir.tarih == datetime(2025, 3, 2)
+
+
+def test_depolama_belgeleri_tekil_create_ile_ayni():
+    datas = [
+        {"id": "g1", "Islem_Tipi": "Gelir", "Tutar": 50.0, "Aciklama": "Faiz", "Kaynak": "Banka",
+         "DuzenliMi": True, "Tarih": datetime(2025, 1, 5), "User_Email": "a@example.com"},
+        {"id": "x1", "Islem_Tipi": "Gider", "Tutar": 12.5, "Aciklama": "Otobüs", "Kategori": "Ulaşım",
+         "ZorunluMu": False, "Tarih": datetime(2025, 1, 6), "User_Email": "a@example.com"},
+        # Aynı alanın iki yazımı bir arada: satır satır create() yoluna düşer
+        {"id": "x2", "islem_tipi": "Gider", "tutar": 3, "kategori": "Market", "tarih": "2025-01-07"},
+    ]
+    for datas_ in (datas[:2], datas):
+        toplu = [i.to_dict() for i in TransactionFactory.create_many(datas_)]
+        tekil = [TransactionFactory.create(d).to_dict() for d in datas_]
+        assert toplu == tekil
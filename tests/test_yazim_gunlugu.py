@@ -0,0 +1,120 @@
+import threading
+from datetime import datetime
+
+import pytest
+
+import backend.sistem_modelleri as sistem_modelleri
+import backend.yazim_gunlugu as yazim_gunlugu
+from backend.sistem_modelleri import ButceYonetici
+from backend.yazim_gunlugu import YazimGunlugu
+
+
+class _BatchliDepo:
+    """
+    Firestore add_many gibi: grup BATCH'lik parçalar halinde commit edilir ve her batch kendi
+    özet artışını (Increment) uygular. Verilen çağrıdaki verilen batch bir kez hata verir.
+    """
+    BATCH = 2
+
+    def __init__(self, hatali_cagri: int = 0, hatali_batch: int = 1):
+        self.belgeler = {}
+        self.gider_toplam = 0.0
+        self.islem_sayisi = 0
+        self.cagri = 0
+        self._hata = (hatali_cagri, hatali_batch)
+
+    def add_many(self, datas, ids):
+        cagri = self.cagri
+        self.cagri += 1
+        for no, bas in enumerate(range(0, len(datas), self.BATCH)):
+            if (cagri, no) == self._hata:
+                raise ConnectionError("batch commit failed")
+            for transaction_id, data in zip(ids[bas:bas + self.BATCH], datas[bas:bas + self.BATCH]):
+                self.belgeler[transaction_id] = data
+                self.gider_toplam += data["Tutar"]
+                self.islem_sayisi += 1
+        return list(ids)
+
+    def get(self, doc_id):
+        return self.belgeler.get(doc_id)
+
+
+def test_ikinci_batch_hatasinda_yazilmis_batch_yeniden_yazilmaz(tmp_path, monkeypatch):
+    depo = _BatchliDepo()
+    monkeypatch.setattr(yazim_gunlugu, "get_repository", lambda: depo)
+    gunluk = YazimGunlugu(str(tmp_path / "test.wal"), grup_boyutu=6, grup_ms=500.0, fsync=False)
+    tutarlar = [10.0, 20.0, 30.0, 40.0, 50.0, 60.0]
+    for i, tutar in enumerate(tutarlar):
+        gunluk.ekle(f"id{i}", {
+            "User_Email": "a@example.com",
+            "Tarih": datetime(2025, 3, 1 + i),
+            "Islem_Tipi": "Gider",
+            "Tutar": tutar,
+            "Kategori": "Market",
+        })
+
+    assert gunluk.bosalt(10.0)
+    istatistik = gunluk.istatistik()
+    assert istatistik["basarisiz_deneme"] == 1
+    assert istatistik["yazilan"] == len(tutarlar)
+    assert set(depo.belgeler) == {f"id{i}" for i in range(len(tutarlar))}
+    # İlk batch (id0, id1) hatadan önce commit edilmişti; artışları yalnızca bir kez uygulanmalı
+    assert depo.islem_sayisi == len(tutarlar)
+    assert depo.gider_toplam == sum(tutarlar)
+    assert gunluk.bekleyen_gider("a@example.com", 2025, 3) == 0.0
+
+
+class _DolmayanGunluk:
+    """Belge WAL'da bekler ve süre içinde depolamaya aktarılamaz."""
+
+    def bekliyor_mu(self, transaction_id):
+        return True
+
+    def bosalt(self, zaman_asimi=None):
+        return False
+
+
+def test_wal_bosalmazsa_silme_bulunamadi_yerine_yeniden_denenir(monkeypatch):
+    depo = _BatchliDepo()
+    monkeypatch.setattr(sistem_modelleri, "get_yazim_gunlugu", lambda: _DolmayanGunluk())
+    monkeypatch.setattr(sistem_modelleri, "get_repository", lambda: depo)
+    # Depolamaya hiç gidilmez (_BatchliDepo'da delete yok); 404 yerine 503 + Retry-After dönülür
+    with pytest.raises(TimeoutError):
+        ButceYonetici("wal@example.com").islem_sil("bekleyen-id")
+
+
+class _YavasDepo(_BatchliDepo):
+    """Grubu commit eder ama add_many'den dönmeden önce devam sinyalini bekler."""
+
+    def __init__(self):
+        super().__init__(hatali_cagri=-1)
+        self.commit_edildi = threading.Event()
+        self.devam = threading.Event()
+
+    def add_many(self, datas, ids):
+        sonuc = super().add_many(datas, ids)
+        self.commit_edildi.set()
+        self.devam.wait(5)
+        return sonuc
+
+
+def test_commit_ile_yazildi_arasinda_aylik_gider_iki_kez_sayilmaz(tmp_path, monkeypatch):
+    depo = _YavasDepo()
+    monkeypatch.setattr(yazim_gunlugu, "get_repository", lambda: depo)
+    gunluk = YazimGunlugu(str(tmp_path / "test.wal"), grup_boyutu=2, grup_ms=1.0, fsync=False)
+    for i, tutar in enumerate((100.0, 50.0)):
+        gunluk.ekle(f"id{i}", {
+            "User_Email": "a@example.com",
+            "Tarih": datetime(2025, 3, 1 + i),
+            "Islem_Tipi": "Gider",
+            "Tutar": tutar,
+            "Kategori": "Market",
+        })
+
+    assert depo.commit_edildi.wait(5)
+    # Özet artık gideri içeriyor, WAL'daki bekleyen tutar henüz düşülmedi
+    threading.Timer(0.1, depo.devam.set).start()
+    toplam = gunluk.aylik_gider("a@example.com", 2025, 3, lambda: depo.gider_toplam, zaman_asimi=5.0)
+    assert toplam == 150.0
+    assert gunluk.bosalt(5.0)
+    assert gunluk.aylik_gider("a@example.com", 2025, 3, lambda: depo.gider_toplam) == 150.0